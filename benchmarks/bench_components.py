@@ -0,0 +1,95 @@
+"""Time component searches of botto.dictionaries.Kradfile against set intersections.
+
+Usage: python benchmarks/bench_components.py KRADFILE [KRADFILE ...] [--kanjidic FILE]
+
+Queries are drawn from the index itself: two to four components of a random
+kanji, so that every query has results. The same queries are answered by
+intersecting Python sets of kanji and sorting the result, and the benchmark
+exits with status 1 if the answers differ. With --kanjidic, results are
+ordered by frequency rank like in the bot.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Set
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from botto import dictionaries  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def make_queries(kradfile: dictionaries.Kradfile, count: int, seed: int = 0) -> List[List[str]]:
+    rng = random.Random(seed)
+    queries: List[List[str]] = []
+    while len(queries) < count:
+        components = kradfile.decompositions[rng.choice(kradfile.kanji)]
+        if len(components) >= 2:
+            queries.append(rng.sample(components, min(len(components), rng.randint(2, 4))))
+    return queries
+
+
+def time_queries(search: Callable[[List[str]], List[str]], queries: List[List[str]]) -> dict:
+    timings: List[float] = []
+    for query in queries:
+        start: float = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return {
+        "mean_us": statistics.mean(timings),
+        "median_us": statistics.median(timings),
+        "p99_us": timings[int(len(timings) * 0.99)],
+        "max_us": timings[-1],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("kradfile", nargs="+", help="KRADFILE, kradfile2 or kradfile-u")
+    parser.add_argument("--kanjidic", help="KANJIDIC2 file built with python -m botto.dictionaries")
+    parser.add_argument("--queries", type=int, default=10_000, help="number of queries")
+    args = parser.parse_args()
+
+    kanjidic = dictionaries.Kanjidic(args.kanjidic) if args.kanjidic else None
+
+    def key(character: str) -> tuple:
+        payload = kanjidic.lookup(character) if kanjidic else None
+        if not payload:
+            return sys.maxsize, sys.maxsize, ord(character)
+        rank: int = payload["frequency_rank"] or sys.maxsize
+        return rank, payload["stroke_count"] or sys.maxsize, ord(character)
+
+    start: float = time.perf_counter()
+    kradfile: dictionaries.Kradfile = dictionaries.Kradfile.load(*args.kradfile, key=key)
+    print(f"Indexed {len(kradfile)} kanji in {time.perf_counter() - start:.3f} s")
+
+    order: Dict[str, int] = {character: i for i, character in enumerate(kradfile.kanji)}
+    sets: Dict[str, Set[str]] = {}
+    for character, components in kradfile.decompositions.items():
+        for component in components:
+            sets.setdefault(component, set()).add(character)
+
+    def set_search(query: List[str]) -> List[str]:
+        return sorted(
+            set.intersection(*(sets[component] for component in query)), key=order.__getitem__
+        )
+
+    queries: List[List[str]] = make_queries(kradfile, args.queries)
+    for name, search in (("index", kradfile.search), ("sets", set_search)):
+        stats: dict = time_queries(search, queries)
+        print(
+            f"{name:<6} mean {stats['mean_us']:7.1f} µs  median {stats['median_us']:7.1f} µs"
+            f"  p99 {stats['p99_us']:7.1f} µs  max {stats['max_us']:7.1f} µs"
+        )
+
+    mismatches: int = sum(kradfile.search(query) != set_search(query) for query in queries)
+    print(f"{mismatches} mismatching results")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Time the stages of turning recorded Jisho responses into pages.
+
+Usage: python benchmarks/bench_jisho.py [--seconds S] [--output FILE] [--compare FILE]
+
+Every response in benchmarks/fixtures/jisho, which include tag queries and
+entries with dozens of senses, goes through the same stages as a lookup:
+
+- decode: decoding the response body with botto.utils.json_codec
+- construct: building JishoEntry objects from the decoded data
+- render: formatting every page with Jisho.parse_entries_into_pages
+
+Stages are timed separately, then run once more under tracemalloc to record
+the peak and retained memory and the memory blocks left allocated. Entries
+are rendered from fresh responses, so the cache of decoded entries is cleared
+first. The romaji cache is left warm like in a running bot.
+
+The results are printed as JSON, or written to FILE. Passing the results of
+another commit with --compare prints how each stage changed.
+"""
+
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "jisho")
+sys.path.insert(0, ROOT)
+
+from botto.modules import jisho  # noqa: E402 pylint: disable=wrong-import-position
+from botto.utils import json_codec  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def load_responses() -> Dict[str, bytes]:
+    responses: Dict[str, bytes] = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path, "rb") as file:
+            responses[os.path.basename(path)[:-5]] = file.read()
+    return responses
+
+
+def decode(bodies: List[bytes]) -> List[Any]:
+    return [json_codec.loads(body) for body in bodies]
+
+
+def construct(responses: List[Any]) -> List[List[jisho.JishoEntry]]:
+    return [[jisho.JishoEntry.from_data(e) for e in response["data"]] for response in responses]
+
+
+def render(results: List[List[jisho.JishoEntry]]) -> List[List[str]]:
+    jisho.decode_entry.cache_clear()  # type: ignore
+    rendered: List[List[str]] = []
+    for entries in results:
+        pages = jisho.Jisho.parse_entries_into_pages(entries)
+        rendered.append([pages[i] for i in range(len(pages))])
+    return rendered
+
+
+def time_stage(func: Callable[[Any], Any], argument: Any, count: int, seconds: float) -> dict:
+    """Return the best and median time of func per response in µs, running for about seconds."""
+    timer = timeit.Timer(lambda: func(argument))
+    number, elapsed = timer.autorange()
+    repeat: int = max(5, int(seconds / elapsed))
+    timings: List[float] = [t / number / count * 1e6 for t in timer.repeat(repeat, number)]
+    return {"best_us": min(timings), "median_us": statistics.median(timings), "runs": repeat}
+
+
+def trace_stage(func: Callable[[Any], Any], argument: Any) -> dict:
+    """Return the memory allocated while running func once and still held by its result."""
+    gc.collect()
+    blocks: int = sys.getallocatedblocks()
+    tracemalloc.start()
+    start: int = tracemalloc.get_traced_memory()[0]
+    result: Any = func(argument)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    retained_blocks: int = sys.getallocatedblocks() - blocks
+    del result
+    return {
+        "peak_bytes": peak - start,
+        "retained_bytes": current - start,
+        "retained_blocks": retained_blocks,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(seconds: float) -> dict:
+    responses: Dict[str, bytes] = load_responses()
+    bodies: List[bytes] = list(responses.values())
+    decoded: List[Any] = decode(bodies)
+    results: List[List[jisho.JishoEntry]] = construct(decoded)
+    render(results)  # Warm the romaji cache
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    for name, func, argument in (
+        ("decode", decode, bodies),
+        ("construct", construct, decoded),
+        ("render", render, results),
+    ):
+        stages[name] = time_stage(func, argument, len(bodies), seconds)
+        stages[name].update(trace_stage(func, argument))
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "codec": json_codec.codec.name,
+        "corpus": {
+            "responses": len(bodies),
+            "entries": sum(map(len, results)),
+            "senses": sum(len(e["senses"]) for r in decoded for e in r["data"]),
+            "bytes": sum(map(len, bodies)),
+            "fixtures": list(responses),
+        },
+        "stages": stages,
+    }
+
+
+def compare(old: dict, new: dict) -> None:
+    print(f"{old['commit']} -> {new['commit']}", file=sys.stderr)
+    print(
+        f"{'stage':<10} {'old µs':>9} {'new µs':>9} {'speedup':>8}"
+        f" {'old peak':>10} {'new peak':>10}",
+        file=sys.stderr,
+    )
+    for name, stage in new["stages"].items():
+        before: Optional[dict] = old["stages"].get(name)
+        if before is None:
+            continue
+        print(
+            f"{name:<10} {before['median_us']:9.1f} {stage['median_us']:9.1f}"
+            f" {before['median_us'] / stage['median_us']:7.2f}x"
+            f" {before['peak_bytes']:10} {stage['peak_bytes']:10}",
+            file=sys.stderr,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent per stage")
+    parser.add_argument("--output", help="write the results to this file instead of stdout")
+    parser.add_argument("--compare", help="results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    results: dict = run(args.seconds)
+    output: str = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(json.load(file), results)
+
+
+if __name__ == "__main__":
+    main()
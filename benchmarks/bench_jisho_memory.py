@@ -0,0 +1,144 @@
+"""Measure the memory held by Jisho entries built from recorded responses.
+
+Usage: python benchmarks/bench_jisho_memory.py [--copies N]
+
+Every response in benchmarks/fixtures/jisho is decoded and turned into
+entries, the way the jisho command keeps them alive in its cache and in
+paginator sessions. The lazy views of botto.modules.jisho are compared with
+the eagerly built classes they replaced, with no page, the first page and
+every page rendered. tracemalloc reports the memory still held afterwards
+and the peak during construction, which is timed separately without it.
+
+With the 360 fixture responses held 20 times each, CPython 3.11 and orjson,
+the views hold 43% less memory than the eager classes with no page rendered,
+42% less with the first page and 36% less with every page, in 24 to 44
+times fewer blocks.
+"""
+
+import argparse
+import gc
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "jisho")
+sys.path.insert(0, ROOT)
+
+from botto.modules.jisho import (  # noqa: E402 pylint: disable=wrong-import-position
+    Jisho,
+    JishoEntry,
+)
+
+
+# The entry model before it became lazy, kept as the baseline.
+# pylint: disable=too-few-public-methods,too-many-instance-attributes
+class EagerJishoEntry:
+    def __init__(self, data):
+        self.is_common = data.get("is_common", None)
+        self.tags = data.get("tags", [])
+        self.japanese = [EagerJapanese(jp) for jp in data.get("japanese", [])]
+        self.senses = [EagerSense(sense) for sense in data.get("senses", [])]
+        self.attribution = data.get("attribution", {})
+
+
+class EagerJapanese:
+    def __init__(self, data):
+        self.word = data.get("word", None)
+        self.reading = data.get("reading", None)
+
+
+class EagerSense:
+    def __init__(self, data):
+        self.english_definitions = data.get("english_definitions", [])
+        self.parts_of_speech = data.get("parts_of_speech", [])
+        self.links = [EagerLink(link) for link in data.get("links", [])]
+        self.tags = data.get("tags", [])
+        self.restrictions = data.get("restrictions", [])
+        self.see_also = data.get("see_also", [])
+        self.antonyms = data.get("antonyms", [])
+        self.source = data.get("source", [])
+        self.info = data.get("info", [])
+
+
+class EagerLink:
+    def __init__(self, data):
+        self.text = data.get("text", None)
+        self.url = data.get("url", None)
+
+
+# pylint: enable=too-few-public-methods,too-many-instance-attributes
+
+
+def load_fixtures() -> List[bytes]:
+    responses: List[bytes] = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path, "rb") as file:
+            responses.append(file.read())
+    return responses
+
+
+def build(responses: List[bytes], entry_class: Callable, pages_viewed: int) -> List[Any]:
+    """Decode responses into entries and render up to pages_viewed pages of each."""
+    sessions: List[Any] = []
+    for response in responses:
+        entries = [entry_class(data) for data in json.loads(response)["data"]]
+        pages = Jisho.parse_entries_into_pages(entries)
+        for i in range(min(pages_viewed, len(pages))):
+            pages[i]  # pylint: disable=pointless-statement
+        sessions.append(pages)
+    return sessions
+
+
+def measure(func: Callable[[], Any]) -> Tuple[float, int, int, int]:
+    """Return the time taken by func, memory held by its result, peak memory and blocks."""
+    gc.collect()
+    start: float = time.perf_counter()
+    func()
+    delta: float = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        blocks: int = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    del result
+    return delta, current, peak, blocks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--copies", type=int, default=20, help="times each response is held at once"
+    )
+    args = parser.parse_args()
+
+    responses: List[bytes] = load_fixtures() * args.copies
+    entry_count: int = sum(len(json.loads(response)["data"]) for response in responses)
+    print(f"{len(responses)} responses, {entry_count} entries")
+    print(
+        f"{'model':<6} {'pages':<6} {'time ms':>8} {'held KiB':>10} {'peak KiB':>10} {'blocks':>9}"
+    )
+
+    for pages_viewed, label in ((0, "none"), (1, "first"), (len(responses), "all")):
+        results = {}
+        for name, entry_class in (("eager", EagerJishoEntry), ("lazy", JishoEntry.from_data)):
+            results[name] = measure(lambda cls=entry_class: build(responses, cls, pages_viewed))
+            delta, current, peak, blocks = results[name]
+            print(
+                f"{name:<6} {label:<6} {delta * 1000:8.1f} {current / 1024:10.1f}"
+                f" {peak / 1024:10.1f} {blocks:9}"
+            )
+        saved: float = 1 - results["lazy"][1] / results["eager"][1]
+        print(f"{'':<22} {saved:10.1%} less held")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare the JSON codecs of botto.utils.json_codec on recorded payloads.
+
+Usage: python benchmarks/bench_json.py [--seconds S]
+
+Decoding and encoding are timed with every available codec on the Jisho
+responses in benchmarks/fixtures/jisho and the restricted API frames in
+benchmarks/fixtures/restricted_api. Speedups are relative to the standard
+library as it was used before: decoding a str, which is what
+ClientResponse.json does, and encoding with the default settings.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+sys.path.insert(0, ROOT)
+
+from botto.utils import json_codec  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def load_payloads() -> Dict[str, List[bytes]]:
+    responses: List[bytes] = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "jisho", "*.json"))):
+        with open(path, "rb") as file:
+            responses.append(file.read())
+    with open(os.path.join(FIXTURES, "restricted_api", "frames.jsonl"), "rb") as file:
+        frames: List[bytes] = [line for line in file.read().splitlines() if line]
+    return {"jisho response": responses, "websocket frame": frames}
+
+
+def time_per_item(func: Callable[[Any], Any], items: List[Any], seconds: float) -> float:
+    """Return the mean time of func on an item, running for about seconds."""
+
+    def run() -> None:
+        for item in items:
+            func(item)
+
+    timer = timeit.Timer(run)
+    number, elapsed = timer.autorange()
+    repeat: int = max(3, int(seconds / elapsed))
+    best: float = min(timer.repeat(repeat=repeat, number=number)) / number
+    return best / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent per measurement")
+    args = parser.parse_args()
+
+    print(f"codecs: {', '.join(json_codec.CODECS)} (using {json_codec.codec.name})")
+    print(
+        f"{'payload':<16} {'operation':<12} {'codec':<12} {'µs/item':>9} {'MB/s':>8} {'speedup':>8}"
+    )
+    for payload, items in load_payloads().items():
+        size: int = sum(map(len, items)) // len(items)
+        texts: List[str] = [item.decode() for item in items]
+        objects: List[Any] = [json.loads(item) for item in items]
+        baselines: Dict[str, float] = {
+            "decode": time_per_item(lambda item: json.loads(item.decode()), items, args.seconds),
+            "encode": time_per_item(json.dumps, objects, args.seconds),
+        }
+        for operation, baseline in baselines.items():
+            print(
+                f"{payload:<16} {operation:<12} {'baseline':<12} {baseline * 1e6:9.1f}"
+                f" {size / baseline / 1e6:8.1f} {1:8.1f}x"
+            )
+        for codec in json_codec.CODECS.values():
+            timings: Dict[str, float] = {
+                "decode": time_per_item(codec.loads, items, args.seconds),
+                "decode str": time_per_item(codec.loads, texts, args.seconds),
+                "encode": time_per_item(codec.dumps, objects, args.seconds),
+                "encode bytes": time_per_item(codec.dumps_bytes, objects, args.seconds),
+            }
+            for operation, delta in timings.items():
+                baseline = baselines[operation.split()[0]]
+                print(
+                    f"{payload:<16} {operation:<12} {codec.name:<12} {delta * 1e6:9.1f}"
+                    f" {size / delta / 1e6:8.1f} {baseline / delta:8.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
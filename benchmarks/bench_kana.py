@@ -0,0 +1,128 @@
+"""Compare botto.utils.kana.to_romaji against kanaconv's KanaConv.
+
+Usage: python benchmarks/bench_kana.py [corpus ...]
+
+Each corpus is a text file with one reading per line, or a JMdict database
+built with python -m botto.dictionaries, whose readings are used. Without a
+corpus, readings are generated from every combination of up to three kana.
+Two workloads are timed: passes over every reading, and lookups drawn with
+a Zipf-like skew as page renders see them, which is where the memo pays off.
+The outputs of both converters are compared for every reading and the
+benchmark exits with status 1 if any of them differ. Readings which kanaconv
+itself fails on are left out.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from kanaconv import KanaConv  # noqa: E402 pylint: disable=wrong-import-position
+
+from botto.utils import kana  # noqa: E402 pylint: disable=wrong-import-position
+
+SYNTHETIC_KANA = (
+    "あいうえおかきくけこがぎぐげごさしすせそざじずぜぞたちつてとだぢづでどなにぬねの"
+    "はひふへほばびぶべぼぱぴぷぺぽまみむめもやゆよらりるれろわをんゃゅょぁぃぅぇぉっー"
+    "アイウエオカキクシチツテトハヒフマミムヤユヨラリルワヲンヴャュョァィゥェォッヵヶ"
+)
+
+
+def synthetic_readings(count: int, seed: int = 0) -> List[str]:
+    """Every kana pair plus count random readings of two to eight kana."""
+    rng = random.Random(seed)
+    readings: List[str] = ["".join(pair) for pair in itertools.product(SYNTHETIC_KANA, repeat=2)]
+    readings.extend("".join(rng.choices(SYNTHETIC_KANA, k=rng.randint(2, 8))) for _ in range(count))
+    return readings
+
+
+def load_corpus(path: str) -> List[str]:
+    if path.endswith((".sqlite3", ".sqlite", ".db")):
+        connection = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            return [
+                japanese["reading"]
+                for (data,) in connection.execute("SELECT data FROM entries")
+                for japanese in json.loads(data)["japanese"]
+                if japanese["reading"]
+            ]
+        finally:
+            connection.close()
+    with open(path, encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def time_calls(func: Callable[[str], str], readings: Iterable[str]) -> Tuple[float, List[str]]:
+    start: float = time.perf_counter()
+    results: List[str] = [func(reading) for reading in readings]
+    return time.perf_counter() - start, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("corpus", nargs="*", help="reading list or JMdict database")
+    parser.add_argument("--synthetic", type=int, default=100_000, help="random readings to add")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus")
+    args = parser.parse_args()
+
+    readings: List[str] = []
+    for path in args.corpus:
+        readings.extend(load_corpus(path))
+    if not args.corpus:
+        readings.extend(synthetic_readings(args.synthetic))
+
+    converter = KanaConv()
+    expected: List[str] = []
+    supported: List[str] = []
+    for reading in readings:
+        try:
+            expected.append(converter.to_romaji(reading))
+        except Exception:  # pylint: disable=broad-except
+            continue
+        supported.append(reading)
+    print(f"{len(supported)} readings ({len(readings) - len(supported)} unsupported by kanaconv)")
+
+    rng = random.Random(0)
+    weights: List[float] = [1 / rank for rank in range(1, len(supported) + 1)]
+    workloads: Dict[str, List[str]] = {
+        f"{args.repeat} passes": supported * args.repeat,
+        "skewed": rng.choices(supported, weights, k=len(supported) * args.repeat),
+    }
+    for workload, lookups in workloads.items():
+        print(f"\n{workload}: {len(lookups)} lookups")
+        kanaconv_time, _ = time_calls(converter.to_romaji, lookups)
+        cold_time, _ = time_calls(kana.to_romaji.__wrapped__, lookups)
+        kana.to_romaji.cache_clear()
+        memo_time, _ = time_calls(kana.to_romaji, lookups)
+        for name, delta in (
+            ("kanaconv", kanaconv_time),
+            ("kana (no memo)", cold_time),
+            ("kana (memoized)", memo_time),
+        ):
+            print(
+                f"  {name:<16} {delta:8.3f} s {len(lookups) / delta:12,.0f} readings/s"
+                f" {kanaconv_time / delta:6.1f}x"
+            )
+        print(f"  memo: {kana.to_romaji.cache_info()}")
+
+    actual: List[str] = [kana.to_romaji(reading) for reading in supported]
+    mismatches: List[Tuple[str, str, str]] = [
+        (reading, want, got)
+        for reading, want, got in zip(supported, expected, actual)
+        if want != got
+    ]
+    print(f"\n{len(mismatches)} mismatches")
+    for reading, want, got in mismatches[:20]:
+        print(f"  {reading}: kanaconv {want!r}, kana {got!r}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Simulate Jisho lookups against a throttling upstream with and without pacing.
+
+Usage: python benchmarks/bench_rate_limit.py [--capacity RPS] [--duration S]
+
+The simulated upstream tolerates capacity requests per second. A request
+beyond that is answered with 429 and throttles every request for a while
+after, like jisho.org does. Lookups are offered at increasing multiples of
+the capacity, sent either straight away or through the RateLimiter the jisho
+command uses, which backs off when throttled. Goodput should level off at
+the capacity with the limiter and collapse without it.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from botto.utils import (  # noqa: E402 pylint: disable=wrong-import-position
+    RateLimiter,
+    RateLimitExceeded,
+)
+
+LATENCY = 0.05
+THROTTLE_PENALTY = 2.0
+
+
+class Throttled(Exception):
+    pass
+
+
+class Upstream:
+    """A server allowing capacity requests per second with bursts of a second's worth."""
+
+    def __init__(self, capacity: float) -> None:
+        self.capacity: float = capacity
+        self.tokens: float = capacity
+        self.updated: float = time.monotonic()
+        self.throttled_until: float = 0
+
+    async def request(self) -> None:
+        now: float = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity)
+        self.updated = now
+        if now < self.throttled_until or self.tokens < 1:
+            self.throttled_until = max(self.throttled_until, now + THROTTLE_PENALTY)
+            await asyncio.sleep(LATENCY / 5)
+            raise Throttled
+        self.tokens -= 1
+        await asyncio.sleep(LATENCY)
+
+
+async def lookup(
+    upstream: Upstream, limiter: Optional[RateLimiter], results: Dict[str, List[float]]
+) -> None:
+    start: float = time.monotonic()
+    try:
+        if limiter is not None:
+            await limiter.acquire()
+        await upstream.request()
+    except RateLimitExceeded:
+        results["busy"].append(time.monotonic() - start)
+    except Throttled:
+        if limiter is not None:
+            limiter.pause(THROTTLE_PENALTY)
+        results["throttled"].append(time.monotonic() - start)
+    else:
+        results["ok"].append(time.monotonic() - start)
+
+
+async def run(capacity: float, load: float, duration: float, paced: bool) -> Dict[str, float]:
+    upstream: Upstream = Upstream(capacity)
+    limiter: Optional[RateLimiter] = None
+    if paced:
+        limiter = RateLimiter(capacity * 0.9, int(capacity // 2), queue_size=int(capacity * 2))
+    results: Dict[str, List[float]] = {"ok": [], "busy": [], "throttled": []}
+    rng = random.Random(0)
+    tasks: List[asyncio.Task] = []
+    start: float = time.monotonic()
+    while time.monotonic() < start + duration:
+        tasks.append(asyncio.ensure_future(lookup(upstream, limiter, results)))
+        await asyncio.sleep(rng.expovariate(load))
+    await asyncio.gather(*tasks)
+    return {
+        "goodput": len(results["ok"]) / (time.monotonic() - start),
+        "busy": len(results["busy"]),
+        "throttled": len(results["throttled"]),
+        "latency": statistics.median(results["ok"]) if results["ok"] else 0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--capacity", type=float, default=40, help="upstream requests/s")
+    parser.add_argument("--duration", type=float, default=3, help="seconds per run")
+    args = parser.parse_args()
+
+    print(
+        f"{'offered/s':>9} {'paced':>6} {'goodput/s':>10} {'busy':>6} {'throttled':>9}"
+        f" {'p50 ms':>7}"
+    )
+    for multiple in (0.5, 1, 2, 4, 8):
+        load: float = args.capacity * multiple
+        for paced in (False, True):
+            result = await run(args.capacity, load, args.duration, paced)
+            print(
+                f"{load:9.0f} {'yes' if paced else 'no':>6} {result['goodput']:10.1f}"
+                f" {result['busy']:6} {result['throttled']:9} {result['latency'] * 1000:7.0f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.get_event_loop().run_until_complete(main())
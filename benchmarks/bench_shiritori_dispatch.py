@@ -0,0 +1,152 @@
+"""Time how much routing a message to Shiritori games costs per game in progress.
+
+Usage: python benchmarks/bench_shiritori_dispatch.py [--messages N]
+
+With 1, 100 and 10,000 simulated games waiting for their player's word, each
+incoming message is dispatched the way a discord.py Client does. With one
+wait_for per game, like the shiritori command used to do, the dispatch runs the
+check of every game. With the WaiterRegistry the command uses now, the client
+has no wait_for listeners and the message is handed to its game by key. Most
+messages are chat from people not playing, and one in ten is a player's word.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+
+import discord  # type: ignore
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from botto.utils import WaiterRegistry  # noqa: E402 pylint: disable=wrong-import-position
+
+GAME_COUNTS = (1, 100, 10_000)
+TURN_TIMEOUT = 60
+PLAYER_MESSAGE_RATIO = 0.1
+
+
+def make_message(channel_id: int, author_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        channel=SimpleNamespace(id=channel_id),
+        author=SimpleNamespace(id=author_id),
+        content="りんご",
+    )
+
+
+def make_messages(games: int, count: int, seed: int = 0) -> List[SimpleNamespace]:
+    rng = random.Random(seed)
+    messages: List[SimpleNamespace] = []
+    for _ in range(count):
+        if rng.random() < PLAYER_MESSAGE_RATIO:
+            game: int = rng.randrange(games)
+            messages.append(make_message(game, game))
+        else:
+            messages.append(make_message(rng.randrange(games), games + rng.randrange(1000)))
+    return messages
+
+
+def time_routing(
+    loop: asyncio.AbstractEventLoop,
+    games: int,
+    messages: List[SimpleNamespace],
+    route: Callable[[SimpleNamespace], None],
+    wait_for_word: Callable[[int], None],
+) -> List[float]:
+    """Time routing each message, starting the next turn of a game after its player's word."""
+    for game in range(games):
+        wait_for_word(game)
+    loop.run_until_complete(asyncio.sleep(0))
+    timings: List[float] = []
+    for message in messages:
+        start: float = time.perf_counter()
+        route(message)
+        timings.append((time.perf_counter() - start) * 1e6)
+        if message.author.id < games:
+            wait_for_word(message.author.id)
+            loop.run_until_complete(asyncio.sleep(0))
+    return timings
+
+
+def bench_wait_for(
+    loop: asyncio.AbstractEventLoop, games: int, messages: List[SimpleNamespace]
+) -> List[float]:
+    client: discord.Client = discord.Client(loop=loop)
+    tasks: List[asyncio.Future] = []
+
+    def wait_for_word(game: int) -> None:
+        channel, author = SimpleNamespace(id=game), SimpleNamespace(id=game)
+
+        def check(message: SimpleNamespace) -> bool:
+            return (
+                author.id == message.author.id
+                and channel.id == message.channel.id
+                and message.content is not None
+                and not message.content.startswith("\\")
+            )
+
+        tasks.append(
+            asyncio.ensure_future(client.wait_for("message", check=check, timeout=TURN_TIMEOUT))
+        )
+
+    def route(message: SimpleNamespace) -> None:
+        client.dispatch("message", message)
+
+    timings: List[float] = time_routing(loop, games, messages, route, wait_for_word)
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    return timings
+
+
+def bench_registry(
+    loop: asyncio.AbstractEventLoop, games: int, messages: List[SimpleNamespace]
+) -> List[float]:
+    client: discord.Client = discord.Client(loop=loop)
+    registry: WaiterRegistry = WaiterRegistry()
+    tasks: List[asyncio.Future] = []
+
+    def wait_for_word(game: int) -> None:
+        tasks.append(asyncio.ensure_future(registry.wait((game, game), TURN_TIMEOUT)))
+
+    def route(message: SimpleNamespace) -> None:
+        # The body of the cog's on_message listener, called directly so that
+        # scheduling it, which every listener costs alike, is not timed
+        client.dispatch("message", message)
+        if message.content is not None and not message.content.startswith("\\"):
+            registry.deliver((message.channel.id, message.author.id), message)
+
+    timings: List[float] = time_routing(loop, games, messages, route, wait_for_word)
+    registry.cancel_all()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    return timings
+
+
+def summarize(timings: List[float]) -> Tuple[float, float, float]:
+    timings = sorted(timings)
+    return statistics.mean(timings), statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--messages", type=int, default=2000, help="messages per run")
+    args = parser.parse_args()
+
+    loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    print(f"{'games':>6} {'routing':>9} {'mean µs':>9} {'median µs':>10} {'p99 µs':>9}")
+    for games in GAME_COUNTS:
+        messages: List[SimpleNamespace] = make_messages(games, args.messages)
+        for name, bench in (("wait_for", bench_wait_for), ("registry", bench_registry)):
+            mean, median, p99 = summarize(bench(loop, games, messages))
+            print(f"{games:6} {name:>9} {mean:9.2f} {median:10.2f} {p99:9.2f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
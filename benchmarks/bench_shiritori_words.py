@@ -0,0 +1,145 @@
+"""Time checking Shiritori words with botto.utils.kana against the regex checks.
+
+Usage: python benchmarks/bench_shiritori_words.py [corpus ...]
+
+Each corpus is a text file with a word per line, such as a wordbase built with
+python -m botto.dictionaries, whose readings are used. Without a corpus, words
+are generated from random kana, a fifth of them in katakana and some with
+halfwidth katakana, spaces or other characters, like players type them. Every
+word is normalized, split into its first and last morae and checked for the
+rules that need no dictionary, first with the translation tables of
+botto.utils.kana and then with NFKC, the character classes of
+botto.utils.charclass and the mora regexes below, which the shiritori command
+and the wordbase checked words with before. The results of both are compared
+for every word and the benchmark exits with status 1 if any of them differ.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+from typing import Callable, List, Optional, Pattern, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from botto.utils import charclass, kana  # noqa: E402 pylint: disable=wrong-import-position
+
+SYNTHETIC_KANA = (
+    "あいうえおかきくけこがぎぐげごさしすせそざじずぜぞたちつてとだぢづでどなにぬねの"
+    "はひふへほばびぶべぼぱぴぷぺぽまみむめもやゆよらりるれろわをんゃゅょぁぃぅぇぉっー"
+)
+NOISE = " 　aA1漢、"
+# Fullwidth katakana and combining voicing marks to halfwidth katakana
+HALFWIDTH = str.maketrans(
+    {
+        **{full: half for half, full in kana.WIDTH_FOLDING.items() if full is not None},
+        "\u3099": "ﾞ",
+        "\u309a": "ﾟ",
+    }
+)
+
+# The regexes botto.dictionaries.wordbase split readings into morae with
+SMALL_KANA = "ぁぃぅぇぉゃゅょゎゕゖ"
+MORA_PATTERN: Pattern[str] = re.compile(f".[{SMALL_KANA}]?")
+LAST_MORA_PATTERN: Pattern[str] = re.compile(f"(.[{SMALL_KANA}]?)[っー]*$")
+
+# (Key, first mora, last mora, mora count) of a word, and why it breaks the rules
+Result = Tuple[Optional[Tuple[str, str, str, int]], Optional[str]]
+
+
+def synthetic_words(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    words: List[str] = []
+    for _ in range(count):
+        word: str = "".join(rng.choices(SYNTHETIC_KANA, k=rng.randint(1, 8)))
+        roll: float = rng.random()
+        if roll < 0.2:
+            word = kana.fold_to_katakana(word)
+        elif roll < 0.25:
+            word = unicodedata.normalize("NFD", kana.fold_to_katakana(word)).translate(HALFWIDTH)
+        elif roll < 0.3:
+            position: int = rng.randrange(len(word) + 1)
+            word = word[:position] + rng.choice(NOISE) + word[position:]
+        words.append(word)
+    return words
+
+
+def load_corpus(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as file:
+        return [line.split("\t", 1)[0].strip() for line in file if line.strip()]
+
+
+def check_with_tables(text: str) -> Result:
+    word: Optional[kana.KanaWord] = kana.parse_word(text)
+    end_type: Optional[str] = kana.check_word(word)
+    if word is None or end_type == "bad_word":
+        return None, "bad_word"
+    return (word.key, word.first_mora, word.last_mora, word.mora_count), end_type
+
+
+def check_with_regexes(text: str) -> Result:
+    text = unicodedata.normalize("NFKC", text).replace(" ", "")
+    if not text or not charclass.all_of(text.replace("ー", ""), charclass.KANA):
+        return None, "bad_word"
+    key: str = kana.fold_to_hiragana(text)
+    count: int = len(MORA_PATTERN.findall(key.rstrip("っー")))
+    if count < kana.SHIRITORI_MIN_MORAE:
+        return None, "bad_word"
+    first = MORA_PATTERN.match(key)
+    last = LAST_MORA_PATTERN.search(key)
+    assert first is not None and last is not None
+    end_type: Optional[str] = "n_ending" if last.group(1) == "ん" else None
+    return (key, first.group(), last.group(1), count), end_type
+
+
+def time_checks(check: Callable[[str], Result], words: List[str]) -> Tuple[float, List[Result]]:
+    start: float = time.perf_counter()
+    results: List[Result] = [check(word) for word in words]
+    return time.perf_counter() - start, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("corpus", nargs="*", help="word list or wordbase file")
+    parser.add_argument("--synthetic", type=int, default=200_000, help="random words to check")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the words")
+    args = parser.parse_args()
+
+    words: List[str] = []
+    for path in args.corpus:
+        words.extend(load_corpus(path))
+    if not args.corpus:
+        words.extend(synthetic_words(args.synthetic))
+    print(f"{len(words)} words, {args.repeat} passes")
+
+    checks: List[Tuple[str, Callable[[str], Result]]] = [
+        ("regexes", check_with_regexes),
+        ("tables", check_with_tables),
+    ]
+    baseline: Optional[float] = None
+    for name, check in checks:
+        delta: float = min(time_checks(check, words)[0] for _ in range(args.repeat))
+        baseline = baseline or delta
+        rate: float = len(words) / delta
+        print(f"  {name:<8} {delta:8.3f} s {rate:12,.0f} words/s {baseline / delta:5.1f}x")
+
+    mismatches: List[Tuple[str, Result, Result]] = [
+        (word, want, got)
+        for word, want, got in zip(
+            words,
+            time_checks(check_with_regexes, words)[1],
+            time_checks(check_with_tables, words)[1],
+        )
+        if want != got
+    ]
+    print(f"\n{len(mismatches)} mismatches")
+    for word, want, got in mismatches[:20]:
+        print(f"  {word!r}: regexes {want}, tables {got}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,10 @@
 from .bot import Botto
-from .checks import require_restricted_api
+from .checks import is_connected_to_restricted_api, require_restricted_api
 from .command import command, group, Command, Group
 from .context import Context
 from .errors import (
     BotMissingFundamentalPermissions,
     SubcommandRequired,
     NotConnectedToRestrictedApi,
+    ServiceBusy,
 )
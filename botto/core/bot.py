@@ -19,11 +19,6 @@ from botto import config, utils  # pylint: disable=cyclic-import
 from .context import Context
 from .errors import BotMissingFundamentalPermissions
 
-try:
-    import ujson as json
-except ImportError:
-    import json  # type: ignore
-
 try:
     import uvloop
 except ImportError:
@@ -53,7 +48,7 @@ class Botto(commands.AutoShardedBot):
         self.process: psutil.Process = psutil.Process()
 
         self.session: aiohttp.ClientSession = aiohttp.ClientSession(
-            loop=self.loop, json_serialize=json.dumps, raise_for_status=True
+            loop=self.loop, json_serialize=utils.json_codec.dumps, raise_for_status=True
         )
 
         self.add_check(self._check_fundamental_permissions)
@@ -289,7 +284,8 @@ class Botto(commands.AutoShardedBot):
     async def on_error(self, event_method: str, *args: Any, **kwargs: Any) -> None:
         _, error, _ = sys.exc_info()
         assert isinstance(error, Exception)
-        if event_method.startswith("on_restricted_api"):
+        # Handlers of events with a payload, unlike on_restricted_api_connect
+        if event_method.startswith("on_restricted_api") and args:
             payload: Dict[str, Any] = args[0]
             self.dispatch("restricted_api_event_handler_error", event_method[18:], payload, error)
             return
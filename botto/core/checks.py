@@ -1,13 +1,26 @@
+from typing import Any, Callable, Optional
+
 from discord.ext import commands
 
 from .context import Context
 from .errors import NotConnectedToRestrictedApi
 
 
-def require_restricted_api():
+def is_connected_to_restricted_api(bot: Any) -> bool:
+    cog = bot.get_cog("RestrictedApi")
+    return bool(cog and cog.websocket)
+
+
+def require_restricted_api(*, unless: Optional[Callable[[Context], bool]] = None):
+    """Require the restricted API to be connected, unless unless(ctx) is true.
+
+    unless lets commands with a local fallback run while the API is down.
+    """
+
     def predicate(ctx: Context) -> bool:
-        cog = ctx.bot.get_cog("RestrictedApi")
-        if not cog or not cog.websocket:
+        if unless is not None and unless(ctx):
+            return True
+        if not is_connected_to_restricted_api(ctx.bot):
             raise NotConnectedToRestrictedApi
         return True
 
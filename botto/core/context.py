@@ -5,10 +5,7 @@ import aiohttp
 
 from discord.ext import commands
 
-try:
-    import ujson as json
-except ImportError:
-    import json  # type: ignore
+from botto.utils import json_codec
 
 
 class Context(commands.Context):
@@ -56,13 +53,15 @@ class Context(commands.Context):
         url: Any,
         *,
         encoding: Optional[str] = None,
-        loads: Callable[[str], Any] = json.loads,
+        loads: Callable[[Any], Any] = json_codec.loads,
         content_type: Optional[str] = "application/json",
         **kwargs: Any,
     ) -> Any:
         """Send a GET request and return the response as json."""
         async with self.session.get(str(url), **kwargs) as resp:
-            return await resp.json(encoding=encoding, loads=loads, content_type=content_type)
+            return await json_codec.read_json(
+                resp, encoding=encoding, loads=loads, content_type=content_type
+            )
 
 
 CoroType = Callable[..., Coroutine[Any, Any, Any]]
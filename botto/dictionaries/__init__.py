@@ -0,0 +1,5 @@
+from .jmdict import JMdict
+from .kanjidic import Kanjidic, KanjidicIndex
+from .kanjivg import KanjiVG
+from .kradfile import Kradfile
+from .wordbase import Wordbase
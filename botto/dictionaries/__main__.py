@@ -0,0 +1,43 @@
+"""Build the offline dictionary files used by the bot.
+
+Usage: python -m botto.dictionaries <dictionary> <source> <destination>
+"""
+
+import argparse
+import time
+
+from . import jmdict, kanjidic, wordbase
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m botto.dictionaries", description="Build offline dictionary files."
+    )
+    subparsers = parser.add_subparsers(dest="dictionary", required=True)
+
+    jmdict_parser = subparsers.add_parser("jmdict", help="build the jisho command's database")
+    jmdict_parser.add_argument("source", help="path to the JMdict XML file")
+    jmdict_parser.add_argument("destination", help="path of the SQLite database to write")
+
+    kanjidic_parser = subparsers.add_parser("kanjidic", help="build the kanji command's file")
+    kanjidic_parser.add_argument("source", help="path to the KANJIDIC2 XML file")
+    kanjidic_parser.add_argument("destination", help="path of the binary file to write")
+
+    wordbase_parser = subparsers.add_parser("wordbase", help="build the shiritori command's file")
+    wordbase_parser.add_argument("source", help="path to the JMdict XML file")
+    wordbase_parser.add_argument("destination", help="path of the word list to write")
+
+    args = parser.parse_args()
+    start: float = time.perf_counter()
+    if args.dictionary == "jmdict":
+        count: int = jmdict.build(args.source, args.destination)
+    elif args.dictionary == "kanjidic":
+        count = kanjidic.build(args.source, args.destination)
+    elif args.dictionary == "wordbase":
+        count = wordbase.build(args.source, args.destination)
+    delta: float = time.perf_counter() - start
+    print(f"Wrote {count} entries to {args.destination} in {delta:.1f} s.")
+
+
+if __name__ == "__main__":
+    main()
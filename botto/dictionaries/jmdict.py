@@ -0,0 +1,225 @@
+"""Offline JMdict lookups shaped like Jisho API search results.
+
+The database is built once from a JMdict XML dump (such as JMdict_e.xml from
+https://www.edrdg.org/jmdict/j_jmdict.html) with:
+
+    python -m botto.dictionaries jmdict JMdict_e.xml jmdict.sqlite3
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..utils import charclass
+from ..utils.kana import fold_to_hiragana
+
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+# Priority tags JMdict (and Jisho) consider as marking a common word
+COMMON_PRIORITY_TAGS = {"news1", "ichi1", "spec1", "spec2", "gai1"}
+
+# Characters with special meaning in Jisho's search syntax
+JISHO_SYNTAX_CHARACTERS = set('#*?"')
+
+ENGLISH_QUERY_PATTERN = re.compile(r"[a-z0-9][a-z0-9' .\-]*")
+GLOSS_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+SCHEMA = """
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    priority INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE forms (
+    form TEXT NOT NULL,
+    entry_id INTEGER NOT NULL,
+    PRIMARY KEY (form, entry_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE glosses USING fts5(text, content='', tokenize='porter unicode61');
+"""
+
+FORM_QUERY = """
+SELECT entries.data FROM forms
+JOIN entries ON entries.id = forms.entry_id
+WHERE forms.form = ?
+ORDER BY entries.priority, entries.id
+LIMIT ? OFFSET ?
+"""
+
+GLOSS_QUERY = """
+SELECT entries.data FROM (
+    SELECT rowid, bm25(glosses) AS score FROM glosses WHERE glosses MATCH ?
+) AS matches
+JOIN entries ON entries.id = matches.rowid
+ORDER BY entries.priority >= 100, matches.score, entries.priority
+LIMIT ? OFFSET ?
+"""
+
+
+class JMdict:
+    """Read-only access to a JMdict database built by :func:`build`.
+
+    Lookups are synchronous but only take a few milliseconds. The connection
+    may be shared with executor threads.
+    """
+
+    def __init__(self, path: str, *, limit: int = 20) -> None:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"JMdict database {path!r} does not exist.")
+        self.path: str = path
+        self.limit: int = limit
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            f"file:{os.path.abspath(path)}?mode=ro", uri=True, check_same_thread=False
+        )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def search(self, keyword: str, page: int = 1) -> Optional[List[str]]:
+        """Search for a normalized keyword.
+
+        Return the JSON of a page of up to limit entries in the shape of the
+        Jisho API's data array, or None if the keyword uses search features only
+        Jisho can handle.
+        """
+        if not keyword or any(char in JISHO_SYNTAX_CHARACTERS for char in keyword):
+            return None
+        if charclass.is_japanese(keyword):
+            return self._query(FORM_QUERY, fold_to_hiragana(keyword), page)
+        if ENGLISH_QUERY_PATTERN.fullmatch(keyword):
+            tokens: List[str] = GLOSS_TOKEN_PATTERN.findall(keyword)
+            return self._query(GLOSS_QUERY, " ".join(f'"{token}"' for token in tokens), page)
+        return None
+
+    def _query(self, query: str, parameter: str, page: int) -> List[str]:
+        with self._lock:
+            rows: List[Tuple[str]] = self._connection.execute(
+                query, (parameter, self.limit, (page - 1) * self.limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+# ------ Building ------
+
+
+def _texts(element: ET.Element, tag: str) -> List[str]:
+    return [child.text or "" for child in element.iter(tag)]
+
+
+def _priority(tags: List[str]) -> int:
+    """Return a sort key where lower values are more frequent words."""
+    frequency_ranks: List[int] = [int(tag[2:]) for tag in tags if tag.startswith("nf")]
+    rank: int = min(frequency_ranks) if frequency_ranks else 49
+    if COMMON_PRIORITY_TAGS.intersection(tags):
+        return rank
+    return 100 + rank
+
+
+def _parse_japanese(entry: ET.Element) -> List[Dict[str, Optional[str]]]:
+    words: List[str] = _texts(entry, "keb")
+    readings: List[ET.Element] = entry.findall("r_ele")
+    japanese: List[Dict[str, Optional[str]]] = []
+    for word in words:
+        for reading in readings:
+            if reading.find("re_nokanji") is not None:
+                continue
+            restrictions: List[str] = _texts(reading, "re_restr")
+            if not restrictions or word in restrictions:
+                japanese.append({"word": word, "reading": reading.findtext("reb")})
+    for reading in readings:
+        if not words or reading.find("re_nokanji") is not None:
+            japanese.append({"word": None, "reading": reading.findtext("reb")})
+    return japanese
+
+
+def _parse_sense(sense: ET.Element) -> Dict[str, Any]:
+    return {
+        "english_definitions": [
+            gloss.text or "" for gloss in sense.iter("gloss") if gloss.get(XML_LANG, "eng") == "eng"
+        ],
+        "parts_of_speech": _texts(sense, "pos"),
+        "links": [],
+        "tags": _texts(sense, "misc") + _texts(sense, "field") + _texts(sense, "dial"),
+        "restrictions": _texts(sense, "stagk") + _texts(sense, "stagr"),
+        "see_also": [xref.replace("・", " ") for xref in _texts(sense, "xref")],
+        "antonyms": [ant.replace("・", " ") for ant in _texts(sense, "ant")],
+        "source": [
+            {"language": source.get(XML_LANG, "eng"), "word": source.text or ""}
+            for source in sense.iter("lsource")
+        ],
+        "info": _texts(sense, "s_inf"),
+    }
+
+
+def parse_entry(entry: ET.Element) -> Tuple[int, int, Dict[str, Any], List[str]]:
+    """Convert a JMdict entry element into its ID, priority, Jisho-like data and forms."""
+    priority_tags: List[str] = _texts(entry, "ke_pri") + _texts(entry, "re_pri")
+    japanese: List[Dict[str, Optional[str]]] = _parse_japanese(entry)
+    forms: List[str] = _texts(entry, "keb") + _texts(entry, "reb")
+    data: Dict[str, Any] = {
+        "slug": forms[0],
+        "is_common": bool(COMMON_PRIORITY_TAGS.intersection(priority_tags)),
+        "tags": [],
+        "jlpt": [],
+        "japanese": japanese,
+        "senses": [
+            parsed
+            for parsed in map(_parse_sense, entry.iter("sense"))
+            if parsed["english_definitions"]
+        ],
+        "attribution": {"jmdict": True, "jmnedict": False, "dbpedia": False},
+    }
+    return int(entry.findtext("ent_seq", "0")), _priority(priority_tags), data, forms
+
+
+def iter_entries(xml_path: str) -> Iterator[ET.Element]:
+    """Iterate over entry elements of a JMdict XML file without loading it whole."""
+    for _, element in ET.iterparse(xml_path):
+        if element.tag == "entry":
+            yield element
+            element.clear()
+
+
+def build(xml_path: str, database_path: str) -> int:
+    """Build a JMdict database from a JMdict XML file and return the entry count."""
+    temporary_path: str = database_path + ".tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    connection: sqlite3.Connection = sqlite3.connect(temporary_path)
+    count: int = 0
+    try:
+        connection.executescript(SCHEMA)
+        for element in iter_entries(xml_path):
+            entry_id, priority, data, forms = parse_entry(element)
+            if not data["senses"]:
+                continue
+            connection.execute(
+                "INSERT INTO entries VALUES (?, ?, ?)",
+                (entry_id, priority, json.dumps(data, ensure_ascii=False, separators=(",", ":"))),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO forms VALUES (?, ?)",
+                ((fold_to_hiragana(form), entry_id) for form in forms),
+            )
+            glosses: str = " ; ".join(
+                "; ".join(sense["english_definitions"]) for sense in data["senses"]
+            )
+            connection.execute(
+                "INSERT INTO glosses (rowid, text) VALUES (?, ?)", (entry_id, glosses)
+            )
+            count += 1
+        connection.commit()
+        connection.execute("INSERT INTO glosses (glosses) VALUES ('optimize')")
+        connection.commit()
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+    os.replace(temporary_path, database_path)
+    return count
@@ -0,0 +1,303 @@
+"""Offline KANJIDIC2 lookups shaped like the restricted API's kanji_search payload.
+
+The file is built once from the KANJIDIC2 XML (kanjidic2.xml from
+https://www.edrdg.org/wiki/index.php/KANJIDIC_Project) with:
+
+    python -m botto.dictionaries kanjidic kanjidic2.xml kanjidic.bin
+
+It is a memory-mapped binary file laid out as:
+
+- a header of the magic bytes, the format version and the character count
+- the sorted code points of the characters as 32-bit integers
+- the offsets of their records from the start of the records, plus the end
+- the records, each the compact UTF-8 JSON of a kanji's payload
+
+Code points are found by binary search, so a lookup only reads a few pages of
+the file and decodes one record.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..utils.kana import fold_to_hiragana
+from .jmdict import ENGLISH_QUERY_PATTERN, GLOSS_TOKEN_PATTERN
+
+MAGIC = b"KDC2"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxI")
+INTEGER = struct.Struct("<I")
+
+# Weights of matching a query against each field of a kanji
+MEANING_WEIGHT = 4
+READING_WEIGHT = 3
+KUN_STEM_WEIGHT = 2  # The part of a kun reading before its okurigana
+NANORI_WEIGHT = 1
+# Multiplier of the weights of exact matches over prefix matches
+EXACT_MATCH_FACTOR = 2
+# Bonus of a query matching a whole meaning, such as "water" for 水
+WHOLE_MEANING_BONUS = 8
+# The most frequent kanji score up to this much more than unranked ones
+FREQUENCY_FACTOR = 1.0
+# Ranks of KANJIDIC2 go from 1 to 2500
+FREQUENCY_RANKS = 2500
+
+
+class Kanjidic:
+    """Read-only access to a KANJIDIC2 file built by :func:`build`.
+
+    Lookups take microseconds and do not block, so they are made directly on
+    the event loop.
+    """
+
+    def __init__(self, path: str) -> None:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"KANJIDIC2 file {path!r} does not exist.")
+        self.path: str = path
+        with open(path, "rb") as file:
+            self._mmap: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path!r} is not a version {VERSION} KANJIDIC2 file.")
+        self._count: int = count
+        self._offsets: int = HEADER.size + INTEGER.size * count
+        self._records: int = self._offsets + INTEGER.size * (count + 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, character: str) -> bool:
+        return self._find(ord(character)) is not None
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _code_point(self, index: int) -> int:
+        return INTEGER.unpack_from(self._mmap, HEADER.size + INTEGER.size * index)[0]
+
+    def _find(self, code_point: int) -> Optional[int]:
+        low: int = 0
+        high: int = self._count
+        while low < high:
+            middle: int = (low + high) // 2
+            if self._code_point(middle) < code_point:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._code_point(low) == code_point:
+            return low
+        return None
+
+    def lookup(self, character: str) -> Optional[Dict[str, Any]]:
+        """Return the payload of a kanji, or None if KANJIDIC2 does not have it."""
+        if len(character) != 1:
+            return None
+        index: Optional[int] = self._find(ord(character))
+        if index is None:
+            return None
+        start, end = struct.unpack_from("<II", self._mmap, self._offsets + INTEGER.size * index)
+        return json.loads(self._mmap[self._records + start : self._records + end])
+
+    def characters(self) -> Iterator[str]:
+        """Iterate over the characters of the file in code point order."""
+        for index in range(self._count):
+            yield chr(self._code_point(index))
+
+    def payloads(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the payloads of the file in code point order."""
+        for index in range(self._count):
+            start, end = struct.unpack_from("<II", self._mmap, self._offsets + INTEGER.size * index)
+            yield json.loads(self._mmap[self._records + start : self._records + end])
+
+
+def frequency_key(payload: Dict[str, Any]) -> Tuple[int, int, int]:
+    """Sort key of kanji by frequency rank, then stroke count, then code point."""
+    return (
+        payload["frequency_rank"] or sys.maxsize,
+        payload["stroke_count"] or sys.maxsize,
+        ord(payload["character"]),
+    )
+
+
+def _meaning_key(meaning: str) -> str:
+    return " ".join(GLOSS_TOKEN_PATTERN.findall(meaning.lower()))
+
+
+class KanjidicIndex:
+    """Finds kanji by their English meanings or their readings.
+
+    Every word of the meanings and every reading of a KANJIDIC2 file is a term
+    of a sorted list, with the kanji it belongs to and the weight of its field.
+    A query word matches the terms it is a prefix of, found by binary search,
+    and exact matches weigh more. Kanji must match every word of a query and
+    are ranked by their summed weights, scaled up for frequent kanji.
+
+    The index is built in memory from the file in about half a second. Most
+    queries take well under a millisecond and single letters a few, so they are
+    answered on the event loop.
+    """
+
+    def __init__(self, kanjidic: Kanjidic) -> None:
+        payloads: List[Dict[str, Any]] = sorted(kanjidic.payloads(), key=frequency_key)
+        self.kanji: List[str] = [payload["character"] for payload in payloads]
+        self._frequency_factors: List[float] = []
+        postings: Dict[str, Dict[int, int]] = {}
+        meanings: Dict[str, Dict[int, int]] = {}
+
+        def add(term: str, number: int, weight: int) -> None:
+            posting: Dict[int, int] = postings.setdefault(term, {})
+            posting[number] = max(posting.get(number, 0), weight)
+
+        for number, payload in enumerate(payloads):
+            rank: Optional[int] = payload["frequency_rank"]
+            self._frequency_factors.append(
+                1 + FREQUENCY_FACTOR * (FREQUENCY_RANKS + 1 - rank) / FREQUENCY_RANKS if rank else 1
+            )
+            for group in payload["meanings_readings"]:
+                for meaning in group["meanings"]:
+                    meanings.setdefault(_meaning_key(meaning), {})[number] = WHOLE_MEANING_BONUS
+                    for token in GLOSS_TOKEN_PATTERN.findall(meaning.lower()):
+                        add(token, number, MEANING_WEIGHT)
+                for reading in group["on_readings"]:
+                    add(fold_to_hiragana(reading.replace("-", "")), number, READING_WEIGHT)
+                for reading in group["kun_readings"]:
+                    stem, _, okurigana = reading.replace("-", "").partition(".")
+                    add(stem + okurigana, number, READING_WEIGHT)
+                    if okurigana:
+                        add(stem, number, KUN_STEM_WEIGHT)
+            for reading in payload["nanori"]:
+                add(fold_to_hiragana(reading), number, NANORI_WEIGHT)
+
+        self._terms: List[str] = sorted(postings)
+        self._postings: List[Tuple[Tuple[int, int], ...]] = [
+            tuple(postings[term].items()) for term in self._terms
+        ]
+        self._meanings: Dict[str, Dict[int, int]] = meanings
+
+    def __len__(self) -> int:
+        return len(self.kanji)
+
+    def _match(self, word: str) -> Dict[int, int]:
+        """Return the best weight of each kanji with a term starting with word."""
+        weights: Dict[int, int] = {}
+        index: int = bisect.bisect_left(self._terms, word)
+        while index < len(self._terms) and self._terms[index].startswith(word):
+            factor: int = EXACT_MATCH_FACTOR if self._terms[index] == word else 1
+            for number, weight in self._postings[index]:
+                if weights.get(number, 0) < weight * factor:
+                    weights[number] = weight * factor
+            index += 1
+        return weights
+
+    def search(self, query: str, *, reading: Optional[str] = None) -> List[str]:
+        """Return the kanji matching an English or kana query, the best match first.
+
+        reading is another spelling of the query in kana, such as the hiragana
+        of a query typed in romaji. Kanji matching either are returned.
+        """
+        scores: Dict[int, int] = {}
+        query = query.strip().lower()
+        if ENGLISH_QUERY_PATTERN.fullmatch(query):
+            words: List[str] = GLOSS_TOKEN_PATTERN.findall(query)
+            for i, word in enumerate(words):
+                weights: Dict[int, int] = self._match(word)
+                if i == 0:
+                    scores = weights
+                else:
+                    scores = {n: scores[n] + w for n, w in weights.items() if n in scores}
+            for number, bonus in self._meanings.get(" ".join(words), {}).items():
+                scores[number] = scores.get(number, 0) + bonus
+        else:
+            reading = query
+        if reading:
+            for number, weight in self._match(fold_to_hiragana(reading)).items():
+                scores[number] = max(scores.get(number, 0), weight)
+
+        ranked: List[Tuple[float, int]] = sorted(
+            (-score * self._frequency_factors[number], number) for number, score in scores.items()
+        )
+        return [self.kanji[number] for _, number in ranked]
+
+
+# ------ Building ------
+
+
+def _texts(element: Optional[ET.Element], tag: str, **attributes: Optional[str]) -> List[str]:
+    if element is None:
+        return []
+    return [
+        child.text or ""
+        for child in element.iter(tag)
+        if all(child.get(key) == value for key, value in attributes.items())
+    ]
+
+
+def _integer(element: Optional[ET.Element], tag: str) -> Optional[int]:
+    text: Optional[str] = element.findtext(tag) if element is not None else None
+    return int(text) if text else None
+
+
+def parse_character(character: ET.Element) -> Dict[str, Any]:
+    """Convert a KANJIDIC2 character element into its kanji_search payload."""
+    misc: Optional[ET.Element] = character.find("misc")
+    reading_meaning: Optional[ET.Element] = character.find("reading_meaning")
+    meanings_readings: List[Dict[str, List[str]]] = []
+    for group in reading_meaning.iter("rmgroup") if reading_meaning is not None else ():
+        meanings_reading: Dict[str, List[str]] = {
+            # Meanings without a language are English
+            "meanings": _texts(group, "meaning", m_lang=None),
+            "kun_readings": _texts(group, "reading", r_type="ja_kun"),
+            "on_readings": _texts(group, "reading", r_type="ja_on"),
+        }
+        if any(meanings_reading.values()):
+            meanings_readings.append(meanings_reading)
+    return {
+        "character": character.findtext("literal"),
+        "stroke_count": _integer(misc, "stroke_count"),
+        "grade": _integer(misc, "grade"),
+        "frequency_rank": _integer(misc, "freq"),
+        "old_jlpt_level": _integer(misc, "jlpt"),
+        "meanings_readings": meanings_readings,
+        "nanori": _texts(reading_meaning, "nanori"),
+        # Stroke order diagrams are only hosted by the restricted API
+        "stroke_order_gif_url": None,
+    }
+
+
+def iter_characters(xml_path: str) -> Iterator[ET.Element]:
+    """Iterate over character elements of a KANJIDIC2 XML file without loading it whole."""
+    for _, element in ET.iterparse(xml_path):
+        if element.tag == "character":
+            yield element
+            element.clear()
+
+
+def build(xml_path: str, path: str) -> int:
+    """Build a KANJIDIC2 file from a KANJIDIC2 XML file and return the character count."""
+    records: Dict[int, bytes] = {}
+    for element in iter_characters(xml_path):
+        payload: Dict[str, Any] = parse_character(element)
+        records[ord(payload["character"])] = json.dumps(
+            payload, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    code_points: List[int] = sorted(records)
+    offsets: List[int] = [0]
+    for code_point in code_points:
+        offsets.append(offsets[-1] + len(records[code_point]))
+
+    temporary_path: str = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(code_points)))
+        file.write(struct.pack(f"<{len(code_points)}I", *code_points))
+        file.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for code_point in code_points:
+            file.write(records[code_point])
+    os.replace(temporary_path, path)
+    return len(code_points)
@@ -0,0 +1,263 @@
+"""Animated stroke order diagrams drawn from KanjiVG.
+
+KanjiVG (https://kanjivg.tagaini.net/) has an SVG file per character, named
+after its code point such as 06c34.svg for 水, with a path per stroke in
+stroke order. Variants such as 06c34-Kaisho.svg are not used.
+
+Rendering a diagram takes up to tens of milliseconds of CPU time, so it is meant to
+run in a process pool: :func:`render_file` is a plain function taking and
+returning picklable values. Diagrams are GIF files named after a hash of the
+character, its SVG file and the render options, so a changed file or option
+never serves an outdated diagram.
+"""
+
+import hashlib
+import io
+import math
+import os
+import re
+from typing import List, NamedTuple, Optional, Pattern, Tuple
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = None  # type: ignore
+
+# Bumped when diagrams are drawn differently, so cached diagrams are redrawn
+RENDERER_VERSION = 1
+
+# Width and height of the KanjiVG coordinate space
+VIEWBOX_SIZE = 109
+
+STROKE_PATTERN: Pattern[str] = re.compile(r'<path\b[^>]*?\sd="([^"]+)"')
+PATH_TOKEN_PATTERN: Pattern[str] = re.compile(r"[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+# Straight segments a Bézier curve is drawn with
+CURVE_SEGMENTS = 12
+
+# Palette indexes of the diagrams and their RGB colors
+BACKGROUND, GRID, STROKE, CURRENT_STROKE = range(4)
+PALETTE = [255, 255, 255, 221, 221, 221, 0, 0, 0, 221, 34, 34]
+
+Point = Tuple[float, float]
+
+
+class RenderOptions(NamedTuple):
+    """How a stroke order diagram is drawn."""
+
+    size: int = 218  # Pixels, twice the KanjiVG coordinate space
+    stroke_width: float = 3.0  # In KanjiVG units like its own stroke width
+    frames_per_stroke: int = 8
+    frame_duration: int = 40  # Milliseconds
+    end_duration: int = 2000  # Milliseconds the finished character is shown
+    grid: bool = True
+
+
+def is_available() -> bool:
+    """Check if Pillow, which draws the diagrams, is installed."""
+    return Image is not None
+
+
+class KanjiVG:
+    """A directory of KanjiVG SVG files, such as the kanji directory of a release."""
+
+    def __init__(self, path: str) -> None:
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"KanjiVG directory {path!r} does not exist.")
+        self.path: str = path
+
+    def __contains__(self, character: str) -> bool:
+        return self.svg_path(character) is not None
+
+    def svg_path(self, character: str) -> Optional[str]:
+        """Return the path of the SVG file of a character, or None if there is none."""
+        if len(character) != 1:
+            return None
+        path: str = os.path.join(self.path, f"{ord(character):05x}.svg")
+        return path if os.path.isfile(path) else None
+
+
+def cache_name(character: str, svg: bytes, options: RenderOptions) -> str:
+    """Return the file name of the diagram of a character drawn from svg with options."""
+    digest = hashlib.sha256(f"{RENDERER_VERSION} {character} {tuple(options)} ".encode())
+    digest.update(svg)
+    return f"{ord(character):05x}-{digest.hexdigest()[:32]}.gif"
+
+
+# ------ Parsing ------
+
+
+def _cubic(start: Point, first: Point, second: Point, end: Point) -> List[Point]:
+    points: List[Point] = []
+    for step in range(1, CURVE_SEGMENTS + 1):
+        t: float = step / CURVE_SEGMENTS
+        u: float = 1 - t
+        points.append(
+            (
+                u**3 * start[0]
+                + 3 * u * u * t * first[0]
+                + 3 * u * t * t * second[0]
+                + t**3 * end[0],
+                u**3 * start[1]
+                + 3 * u * u * t * first[1]
+                + 3 * u * t * t * second[1]
+                + t**3 * end[1],
+            )
+        )
+    return points
+
+
+def _coordinates(command: str, values: List[float], position: Point, relative: bool) -> List[Point]:
+    """Return the absolute points of the values of an uppercase path command."""
+    if command == "H":
+        values = [values[0], 0.0 if relative else position[1]]
+    elif command == "V":
+        values = [0.0 if relative else position[0], values[0]]
+    offset_x, offset_y = position if relative else (0.0, 0.0)
+    return [(values[i] + offset_x, values[i + 1] + offset_y) for i in range(0, len(values), 2)]
+
+
+def parse_path(data: str) -> List[Point]:
+    """Flatten the d attribute of an SVG path into the points of a polyline.
+
+    Only the commands used by KanjiVG are supported: moves, lines, cubic
+    Bézier curves and their smooth shorthand, absolute or relative.
+    """
+    tokens: List[str] = PATH_TOKEN_PATTERN.findall(data)
+    points: List[Point] = []
+    position: Point = (0.0, 0.0)
+    start: Point = position
+    control: Optional[Point] = None  # The second control point of the last curve
+    command: str = ""
+    i: int = 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in "Zz":
+                points.append(start)
+                position, control = start, None
+                continue
+        arity: int = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4}.get(command.upper(), 0)
+        if not arity or i + arity > len(tokens):
+            raise ValueError(f"Unsupported SVG path data {data!r}.")
+        values: List[float] = [float(token) for token in tokens[i : i + arity]]
+        i += arity
+        relative: bool = command.islower()
+        upper: str = command.upper()
+        coordinates: List[Point] = _coordinates(upper, values, position, relative)
+
+        if upper == "M":
+            position = start = coordinates[0]
+            points.append(position)
+            # Further pairs after a move are lines
+            command = "l" if relative else "L"
+            control = None
+        elif upper in "LHV":
+            position = coordinates[0]
+            points.append(position)
+            control = None
+        else:
+            if upper == "S":
+                # The first control point mirrors the last one of the previous curve
+                mirror: Point = position
+                if control is not None:
+                    mirror = (2 * position[0] - control[0], 2 * position[1] - control[1])
+                coordinates.insert(0, mirror)
+            first, second, end = coordinates
+            points.extend(_cubic(position, first, second, end))
+            position, control = end, second
+    return points
+
+
+def parse_strokes(svg: str) -> List[List[Point]]:
+    """Return the polyline of every stroke of a KanjiVG SVG file, in stroke order."""
+    return [parse_path(data) for data in STROKE_PATTERN.findall(svg)]
+
+
+# ------ Drawing ------
+
+
+def _partial(points: List[Point], fraction: float) -> List[Point]:
+    """Return the start of a polyline covering fraction of its length."""
+    lengths: List[float] = [
+        math.hypot(end[0] - start[0], end[1] - start[1]) for start, end in zip(points, points[1:])
+    ]
+    remaining: float = sum(lengths) * fraction
+    partial: List[Point] = points[:1]
+    for i, length in enumerate(lengths):
+        if length >= remaining:
+            t: float = remaining / length if length else 1.0
+            start, end = points[i], points[i + 1]
+            partial.append((start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t))
+            break
+        partial.append(points[i + 1])
+        remaining -= length
+    return partial
+
+
+def _draw_stroke(draw: "ImageDraw.ImageDraw", points: List[Point], color: int, width: int) -> None:
+    draw.line(points, fill=color, width=width, joint="curve")
+    # Round caps, as KanjiVG strokes have
+    radius: float = width / 2
+    for x, y in (points[0], points[-1]):
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color)
+
+
+def render(svg: str, options: RenderOptions = RenderOptions()) -> bytes:
+    """Draw the animated stroke order diagram of a KanjiVG SVG file as a GIF."""
+    if Image is None:
+        raise RuntimeError("Pillow is required to draw stroke order diagrams.")
+    scale: float = options.size / VIEWBOX_SIZE
+    strokes: List[List[Point]] = [
+        [(x * scale, y * scale) for x, y in stroke] for stroke in parse_strokes(svg) if stroke
+    ]
+    if not strokes:
+        raise ValueError("The SVG file has no strokes.")
+    width: int = max(1, round(options.stroke_width * scale))
+
+    canvas = Image.new("P", (options.size, options.size), BACKGROUND)
+    canvas.putpalette(PALETTE)
+    draw = ImageDraw.Draw(canvas)
+    if options.grid:
+        middle: int = options.size // 2
+        for start in range(0, options.size, 8):
+            draw.line((start, middle, start + 3, middle), fill=GRID)
+            draw.line((middle, start, middle, start + 3), fill=GRID)
+
+    frames: list = []
+    for stroke in strokes:
+        for step in range(1, options.frames_per_stroke + 1):
+            frame = canvas.copy()
+            _draw_stroke(
+                ImageDraw.Draw(frame),
+                _partial(stroke, step / options.frames_per_stroke),
+                CURRENT_STROKE,
+                width,
+            )
+            frames.append(frame)
+        _draw_stroke(draw, stroke, STROKE, width)
+    frames.append(canvas)
+
+    output = io.BytesIO()
+    frames[0].save(
+        output,
+        format="GIF",
+        save_all=True,
+        append_images=frames[1:],
+        duration=[options.frame_duration] * (len(frames) - 1) + [options.end_duration],
+        loop=0,
+        # The palette is already minimal, and remapping it takes most of the time
+        optimize=False,
+    )
+    return output.getvalue()
+
+
+def render_file(svg_path: str, path: str, options: RenderOptions = RenderOptions()) -> None:
+    """Draw the diagram of a KanjiVG SVG file into path, which is replaced atomically."""
+    with open(svg_path, encoding="utf-8") as file:
+        gif: bytes = render(file.read(), options)
+    temporary_path: str = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(gif)
+    os.replace(temporary_path, path)
@@ -0,0 +1,139 @@
+"""Nouns of JMdict for playing Shiritori without the restricted API.
+
+The wordbase is built once from a JMdict XML dump (such as JMdict_e.xml from
+https://www.edrdg.org/jmdict/j_jmdict.html) with:
+
+    python -m botto.dictionaries wordbase JMdict_e.xml wordbase.tsv
+
+It lists a common noun (futsuumeishi) per line as its reading, its usual
+writing and whether JMdict marks it as common, separated by tabs. When loaded,
+words are keyed by their reading in hiragana and computer players' words are
+grouped by their first mora, so checking or answering a word takes constant
+time.
+"""
+
+import os
+import random
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..utils import kana
+from .jmdict import _priority, iter_entries
+
+NOUN_PART_OF_SPEECH = "noun (common) (futsuumeishi)"
+
+
+class Word(NamedTuple):
+    """A noun with the morae it starts and ends with.
+
+    The last mora leaves out a final っ or ー, e.g. it is ひ for コーヒー.
+    """
+
+    reading: str
+    writing: Optional[str]
+    key: str  # The reading in hiragana, which words are compared by
+    first_mora: str
+    last_mora: str
+
+    @classmethod
+    def from_kana_word(cls, word: kana.KanaWord, writing: Optional[str] = None) -> "Word":
+        return cls(word.text, writing, word.key, word.first_mora, word.last_mora)
+
+    @classmethod
+    def from_reading(cls, reading: str, writing: Optional[str] = None) -> "Word":
+        """Parse a reading with botto.utils.kana.parse_word, raising ValueError if not kana."""
+        word: Optional[kana.KanaWord] = kana.parse_word(reading)
+        if word is None:
+            raise ValueError(f"{reading!r} is not a word in kana.")
+        return cls.from_kana_word(word, writing)
+
+
+class Wordbase:
+    """The nouns of a wordbase file built by :func:`build`.
+
+    Computer players only answer with common nouns which follow the rules of
+    botto.utils.kana.check_word, in an order shuffled once when loaded.
+    Readings which are not kana are skipped.
+    """
+
+    def __init__(self, path: str) -> None:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Shiritori wordbase {path!r} does not exist.")
+        self.path: str = path
+        self.words: Dict[str, Word] = {}
+        self._answers: Dict[str, List[Word]] = {}
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                reading, writing, common = line.rstrip("\n").split("\t")
+                parsed: Optional[kana.KanaWord] = kana.parse_word(reading)
+                if parsed is None:
+                    continue
+                word: Word = Word.from_kana_word(parsed, writing or None)
+                self.words.setdefault(word.key, word)
+                if common == "1" and kana.check_word(parsed) is None:
+                    self._answers.setdefault(word.first_mora, []).append(word)
+        for answers in self._answers.values():
+            random.shuffle(answers)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, reading: str) -> bool:
+        return kana.fold_to_hiragana(reading) in self.words
+
+    def lookup(self, reading: str) -> Optional[Word]:
+        """Return the noun read as reading in either kana script, or None if there is none."""
+        return self.words.get(kana.fold_to_hiragana(reading))
+
+    def answers(self, mora: str) -> Sequence[Word]:
+        """Return the words a computer player may answer after mora."""
+        return self._answers.get(mora, ())
+
+
+# ------ Building ------
+
+
+def _texts(element: ET.Element, tag: str) -> List[str]:
+    return [child.text or "" for child in element.iter(tag)]
+
+
+def parse_entry(entry: ET.Element) -> Iterator[Tuple[str, Optional[str], int]]:
+    """Iterate over the readings of a noun entry with their writing and priority.
+
+    Readings are normalized like the words of players, with iteration marks
+    applied, and those with other symbols are left out. Priorities below 100
+    are common words, lower values being more frequent.
+    """
+    if NOUN_PART_OF_SPEECH not in _texts(entry, "pos"):
+        return
+    writings: List[str] = _texts(entry, "keb")
+    for element in entry.findall("r_ele"):
+        word: Optional[kana.KanaWord] = kana.parse_word(element.findtext("reb") or "")
+        if word is None:
+            continue
+        restrictions: List[str] = _texts(element, "re_restr")
+        writing: Optional[str] = None
+        if element.find("re_nokanji") is None:
+            writing = next((w for w in writings if not restrictions or w in restrictions), None)
+        yield word.text, writing, _priority(_texts(element, "re_pri"))
+
+
+def build(xml_path: str, path: str) -> int:
+    """Build a wordbase file from a JMdict XML file and return the word count.
+
+    Readings of several nouns, such as みず (水) and ミズ (Ms.), are written like
+    the most frequent one.
+    """
+    words: Dict[str, Tuple[str, Optional[str], int]] = {}
+    for element in iter_entries(xml_path):
+        for reading, writing, priority in parse_entry(element):
+            key: str = kana.fold_to_hiragana(reading)
+            if key not in words or priority < words[key][2]:
+                words[key] = reading, writing, priority
+
+    temporary_path: str = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        for reading, writing, priority in words.values():
+            file.write(f"{reading}\t{writing or ''}\t{int(priority < 100)}\n")
+    os.replace(temporary_path, path)
+    return len(words)
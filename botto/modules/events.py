@@ -195,6 +195,10 @@ class Events(commands.Cog):
             await ctx.reply("This command is currently unavailable. Please try again later.")
             return
 
+        if isinstance(error, botto.ServiceBusy):
+            await ctx.reply("The bot is busy right now. Please try again in a moment.")
+            return
+
         ignored = (commands.CommandNotFound, discord.Forbidden)
 
         if isinstance(error, ignored):
@@ -1,105 +1,410 @@
-from typing import List
+import asyncio
+import functools
+from typing import Any, Callable, Coroutine, List, Optional, Sequence
 from urllib.parse import quote_plus
 
 import aiohttp
 import discord
-from kanaconv import KanaConv
 from discord.ext import commands
 
 import botto
+from botto.dictionaries import JMdict
 from botto.modules.help import HelpCommand
 
-romanizer = KanaConv()
+JISHO_API_URL = "https://jisho.org/api/v1/search/words?keyword={keyword}&page={page}"
+
+# Number of entries in a page of results of the Jisho API and the JMdict database
+RESULTS_PER_PAGE = 20
+
+# Lookups are cached by normalized keyword and page. Searches with no results are kept
+# for a shorter time in case the dictionary is updated.
+CACHE_MAX_ENTRIES = 1024
+CACHE_TTL = 6 * 60 * 60
+NEGATIVE_CACHE_TTL = 15 * 60
+
+# Seconds to stop requesting when Jisho throttles us without saying for how long
+THROTTLED_BACKOFF = 10
+
+# Requests to Jisho are abandoned after REQUEST_TIMEOUT seconds. After
+# CIRCUIT_FAILURE_THRESHOLD consecutive failed or slow requests, Jisho is not requested
+# for CIRCUIT_RECOVERY_TIME seconds and previously cached results are served instead.
+REQUEST_TIMEOUT = 10
+SLOW_REQUEST_THRESHOLD = 5
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RECOVERY_TIME = 30
+
+# Errors of the Jisho API for which stale results are served when there are some
+UPSTREAM_ERRORS = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    botto.ServiceBusy,
+    botto.utils.CircuitOpen,
+)
+
+# Rate limiter priority of requests warming the persistent cache, served after lookups
+WARM_PRIORITY = 1
+# Seconds to wait before retrying a warming request when the API is busy
+WARM_RETRY_DELAY = 30
 
 # This exists because otherwise mypy will go cranky.
 clean_content = commands.clean_content(fix_channel_mentions=True)
 
 
+decode_entry: Callable[[bytes], dict] = functools.lru_cache(maxsize=64)(
+    botto.utils.json_codec.loads
+)
+
+
 class JishoEntry:
-    def __init__(self, data):
-        self.is_common = data.get("is_common", None)
-        self.tags = data.get("tags", [])
-        self.japanese = [Japanese(jp) for jp in data.get("japanese", [])]
-        self.senses = [Sense(sense) for sense in data.get("senses", [])]
-        self.attribution = data.get("attribution", {})
+    """A view over the JSON of an entry of Jisho's search results.
+
+    Only the compact UTF-8 JSON of the entry is kept. Fields are decoded when
+    they are accessed and are not stored, so entries held by the cache and by
+    paginator sessions cost little more than their JSON. Recently decoded
+    entries are shared so formatting an entry only decodes it once.
+    """
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, raw: bytes) -> None:
+        self._raw: bytes = raw
+
+    @classmethod
+    def from_data(cls, data: dict) -> "JishoEntry":
+        return cls(botto.utils.json_codec.dumps_bytes(data))
+
+    def _decode(self) -> dict:
+        return decode_entry(self._raw)
+
+    @property
+    def is_common(self) -> Optional[bool]:
+        return self._decode().get("is_common", None)
+
+    @property
+    def tags(self) -> List[str]:
+        return self._decode().get("tags", [])
+
+    @property
+    def japanese(self) -> List["Japanese"]:
+        return [Japanese(jp) for jp in self._decode().get("japanese", [])]
+
+    @property
+    def senses(self) -> List["Sense"]:
+        return [Sense(sense) for sense in self._decode().get("senses", [])]
+
+    @property
+    def attribution(self) -> dict:
+        return self._decode().get("attribution", {})
 
 
 class Japanese:
-    def __init__(self, data):
-        self.word = data.get("word", None)
-        self.reading = data.get("reading", None)
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict) -> None:
+        self._data: dict = data
+
+    @property
+    def word(self) -> Optional[str]:
+        return self._data.get("word", None)
+
+    @property
+    def reading(self) -> Optional[str]:
+        return self._data.get("reading", None)
 
 
 class Sense:
-    def __init__(self, data):
-        self.english_definitions = data.get("english_definitions", [])
-        self.parts_of_speech = data.get("parts_of_speech", [])
-        self.links = [Link(link) for link in data.get("links", [])]
-        self.tags = data.get("tags", [])
-        self.restrictions = data.get("restrictions", [])
-        self.see_also = data.get("see_also", [])
-        self.antonyms = data.get("antonyms", [])
-        self.source = data.get("source", [])
-        self.info = data.get("info", [])
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict) -> None:
+        self._data: dict = data
+
+    @property
+    def english_definitions(self) -> List[str]:
+        return self._data.get("english_definitions", [])
+
+    @property
+    def parts_of_speech(self) -> List[str]:
+        return self._data.get("parts_of_speech", [])
+
+    @property
+    def links(self) -> List["Link"]:
+        return [Link(link) for link in self._data.get("links", [])]
+
+    @property
+    def tags(self) -> List[str]:
+        return self._data.get("tags", [])
+
+    @property
+    def restrictions(self) -> List[str]:
+        return self._data.get("restrictions", [])
+
+    @property
+    def see_also(self) -> List[str]:
+        return self._data.get("see_also", [])
+
+    @property
+    def antonyms(self) -> List[str]:
+        return self._data.get("antonyms", [])
+
+    @property
+    def source(self) -> List[dict]:
+        return self._data.get("source", [])
+
+    @property
+    def info(self) -> List[str]:
+        return self._data.get("info", [])
 
 
 class Link:
-    def __init__(self, data):
-        self.text = data.get("text", None)
-        self.url = data.get("url", None)
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict) -> None:
+        self._data: dict = data
+
+    @property
+    def text(self) -> Optional[str]:
+        return self._data.get("text", None)
+
+    @property
+    def url(self) -> Optional[str]:
+        return self._data.get("url", None)
 
 
 class Jisho(commands.Cog):
     def __init__(self, bot: botto.Botto) -> None:
         self.bot: botto.Botto = bot
+        self.cache: botto.utils.TTLCache = botto.utils.TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL)
+        self.in_flight: botto.utils.SingleFlight = botto.utils.SingleFlight()
+        self.rate_limiter: botto.utils.RateLimiter = botto.utils.RateLimiter(
+            botto.config["JISHO_RATE_LIMIT"],
+            botto.config["JISHO_RATE_BURST"],
+            queue_size=botto.config["JISHO_RATE_QUEUE_SIZE"],
+        )
+        self.jmdict: Optional[JMdict] = None
+        if botto.config["JMDICT_DATABASE_PATH"]:
+            self.jmdict = JMdict(botto.config["JMDICT_DATABASE_PATH"], limit=RESULTS_PER_PAGE)
+        self.persistent_cache: Optional[botto.utils.PersistentCache] = None
+        if botto.config["JISHO_CACHE_PATH"]:
+            self.persistent_cache = botto.utils.PersistentCache(
+                botto.config["JISHO_CACHE_PATH"],
+                max_size=botto.config["JISHO_CACHE_MAX_SIZE"] * 1024 * 1024,
+                ttl=botto.config["JISHO_CACHE_TTL"] * 24 * 60 * 60,
+            )
+        self.warm_task: Optional[asyncio.Task] = None
+        self.circuit_breaker: botto.utils.CircuitBreaker = botto.utils.CircuitBreaker(
+            CIRCUIT_FAILURE_THRESHOLD,
+            CIRCUIT_RECOVERY_TIME,
+            slow_call_threshold=SLOW_REQUEST_THRESHOLD,
+            exceptions=(aiohttp.ClientError, asyncio.TimeoutError),
+        )
+        self.stale_served: int = 0
+
+    def cog_unload(self) -> None:
+        self.in_flight.cancel_all()
+        if self.warm_task:
+            self.warm_task.cancel()
+        if self.jmdict:
+            self.jmdict.close()
+        if self.persistent_cache:
+            self.persistent_cache.close()
+
+    @staticmethod
+    def persistent_key(keyword: str, page: int) -> str:
+        return f"{page} {keyword}"
+
+    async def search(self, word: str, page: int = 1) -> List[JishoEntry]:
+        """Look up a page of results of a word, using the cache and local dictionary.
+
+        The Jisho API is only requested for keywords the local dictionary cannot
+        handle or has no entries for. Concurrent requests of the same page share
+        a single request. A full page means the next page may have more results.
 
-    async def search(self, word: str) -> List[JishoEntry]:
-        word = quote_plus(word)
-        response = await self.bot.session.get(
-            f"https://jisho.org/api/v1/search/words?keyword={word}"
+        Expired results still in memory are returned right away while they are
+        refreshed in the background. Other expired results are returned if Jisho
+        cannot be requested.
+        """
+        keyword: str = botto.utils.normalize_query(word)
+        entries: Optional[List[JishoEntry]] = self.cache.get((keyword, page))
+        if entries is not None:
+            return entries
+
+        entries = await self.search_local(keyword, page)
+        if entries is not None:
+            self.cache.set((keyword, page), entries)
+            return entries
+
+        entries = self.cache.get_stale((keyword, page))
+        if entries is not None:
+            self.stale_served += 1
+            self.bot.loop.create_task(self.revalidate(keyword, page))
+            return entries
+
+        try:
+            return await self.in_flight.run((keyword, page), self.request_entries, keyword, page)
+        except UPSTREAM_ERRORS:
+            entries = await self.search_stale(keyword, page)
+            if entries is None:
+                raise
+            self.stale_served += 1
+            return entries
+
+    async def revalidate(self, keyword: str, page: int) -> None:
+        """Refresh the cached results of a page, keeping the stale ones if it fails."""
+        try:
+            await self.in_flight.run((keyword, page), self.request_entries, keyword, page)
+        except UPSTREAM_ERRORS:
+            pass
+
+    async def search_stale(self, keyword: str, page: int) -> Optional[List[JishoEntry]]:
+        """Look up a page of results in the persistent cache, even if they expired."""
+        if not self.persistent_cache:
+            return None
+        body: Optional[bytes] = await self.persistent_cache.get_stale(
+            self.persistent_key(keyword, page)
+        )
+        if body is None:
+            return None
+        return [JishoEntry.from_data(e) for e in botto.utils.json_codec.loads(body)["data"]]
+
+    async def search_local(self, keyword: str, page: int) -> Optional[List[JishoEntry]]:
+        """Look up a page of results in the local dictionary.
+
+        Return None if the Jisho API should be requested instead. Once a keyword
+        has local results, its later pages are only looked up locally.
+        """
+        if not self.jmdict:
+            return None
+        data: Optional[List[str]] = await self.bot.loop.run_in_executor(
+            None, self.jmdict.search, keyword, page
         )
-        entries = await response.json()
-        return [JishoEntry(e) for e in entries["data"]]
+        if data:
+            return [JishoEntry(e.encode()) for e in data]
+        if data is not None and page > 1:
+            first_page: Optional[List[str]] = await self.bot.loop.run_in_executor(
+                None, self.jmdict.search, keyword
+            )
+            if first_page:
+                return []
+        return None
+
+    async def request_entries(self, keyword: str, page: int = 1) -> List[JishoEntry]:
+        """Get a page of entries of a normalized keyword from Jisho and cache them.
+
+        Responses kept by the persistent cache are used before requesting the API.
+        """
+        body: Optional[bytes] = None
+        if self.persistent_cache:
+            body = await self.persistent_cache.get(self.persistent_key(keyword, page))
+        if body is None:
+            body = await self.request_response(keyword, page)
+        entries = [JishoEntry.from_data(e) for e in botto.utils.json_codec.loads(body)["data"]]
+        self.cache.set((keyword, page), entries, ttl=None if entries else NEGATIVE_CACHE_TTL)
+        return entries
+
+    async def request_response(self, keyword: str, page: int = 1, *, priority: int = 0) -> bytes:
+        """Request a page of results of a normalized keyword from the Jisho API.
+
+        The raw response is stored in the persistent cache. Requests are paced by
+        the rate limiter. ServiceBusy is raised if too many requests are waiting
+        or Jisho throttles us, and CircuitOpen if Jisho is failing.
+        """
+        try:
+            await self.rate_limiter.acquire(priority)
+        except botto.utils.RateLimitExceeded as exc:
+            raise botto.ServiceBusy from exc
+        try:
+            body: bytes = await self.circuit_breaker.call(
+                self.get_response, JISHO_API_URL.format(keyword=quote_plus(keyword), page=page)
+            )
+        except aiohttp.ClientResponseError as exc:
+            if exc.status != 429:
+                raise
+            retry_after: Optional[str] = exc.headers.get("Retry-After") if exc.headers else None
+            self.rate_limiter.pause(
+                float(retry_after) if retry_after and retry_after.isdigit() else THROTTLED_BACKOFF
+            )
+            raise botto.ServiceBusy from exc
+        if self.persistent_cache:
+            empty: bool = not botto.utils.json_codec.loads(body)["data"]
+            await self.persistent_cache.set(
+                self.persistent_key(keyword, page),
+                body,
+                ttl=NEGATIVE_CACHE_TTL if empty else None,
+            )
+        return body
+
+    async def get_response(self, url: str) -> bytes:
+        async with self.bot.session.get(
+            url, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        ) as response:
+            return await response.read()
 
     @staticmethod
-    def parse_entries_into_pages(entries: List[JishoEntry]) -> List[str]:
-        pages = []
-        for entry in entries:
-            page = []
-
-            # Japanese and readings
-            for jap in entry.japanese:
-                if jap.reading:
-                    romaji = romanizer.to_romaji(jap.reading)
-                if jap.word and jap.reading:
-                    page.append(f"**{jap.word}（{jap.reading}）** *{romaji}*")
-                elif jap.reading:
-                    page.append(f"**{jap.reading}** *{romaji}*")
-                else:  # jap.word only
-                    page.append(f"**{jap.word}**")
-            if entry.is_common:
-                page.append("(common word)")
-            page.append("")
-
-            # Senses (definitions)
-            for i, sense in enumerate(entry.senses, 1):
-                if sense.parts_of_speech:
-                    parts = "(" + ", ".join(p.lower() for p in sense.parts_of_speech) + ") "
-                else:
-                    parts = ""
-                page.append(f"{i}. {parts}{'; '.join(sense.english_definitions)}")
-                for link in sense.links:
-                    page.append(f"[{link.text}]({link.url})")
+    def format_entry(entry: JishoEntry) -> str:
+        page = []
+
+        # Japanese and readings
+        for jap in entry.japanese:
+            if jap.reading:
+                romaji = botto.utils.kana.to_romaji(jap.reading)
+            if jap.word and jap.reading:
+                page.append(f"**{jap.word}（{jap.reading}）** *{romaji}*")
+            elif jap.reading:
+                page.append(f"**{jap.reading}** *{romaji}*")
+            else:  # jap.word only
+                page.append(f"**{jap.word}**")
+        if entry.is_common:
+            page.append("(common word)")
+        page.append("")
+
+        # Senses (definitions)
+        for i, sense in enumerate(entry.senses, 1):
+            if sense.parts_of_speech:
+                parts = "(" + ", ".join(p.lower() for p in sense.parts_of_speech) + ") "
+            else:
+                parts = ""
+            page.append(f"{i}. {parts}{'; '.join(sense.english_definitions)}")
+            for link in sense.links:
+                page.append(f"[{link.text}]({link.url})")
 
-            pages.append("\n".join(page))
-        return pages
+        return "\n".join(page)
+
+    @classmethod
+    def parse_entries_into_pages(cls, entries: List[JishoEntry]) -> Sequence[str]:
+        """Return pages of entries which are only formatted once they are viewed."""
+        return botto.utils.LazyPages(list(entries), cls.format_entry)
+
+    def next_pages_fetcher(
+        self, word: str
+    ) -> Callable[[], Coroutine[Any, Any, Optional[List[JishoEntry]]]]:
+        """Return a coroutine function fetching the following pages of results of word.
+
+        It returns an empty list once the results are exhausted, or None if a
+        page could not be fetched for now so that the paginator tries again later.
+        """
+        page: int = 1
+        exhausted: bool = False
+
+        async def fetch_next_page() -> Optional[List[JishoEntry]]:
+            nonlocal page, exhausted
+            if exhausted:
+                return []
+            try:
+                entries: List[JishoEntry] = await self.search(word, page + 1)
+            except UPSTREAM_ERRORS:
+                return None
+            page += 1
+            exhausted = len(entries) < RESULTS_PER_PAGE
+            return entries
+
+        return fetch_next_page
 
     @botto.command(aliases=["j", "じしょ", "辞書"])
     async def jisho(self, ctx: botto.Context, *, word: clean_content):  # type: ignore
         """Look up a Japanese or English word."""
         try:
             entries = await self.search(word)
-        except aiohttp.ClientResponseError:
+        except (aiohttp.ClientError, asyncio.TimeoutError, botto.utils.CircuitOpen):
             await ctx.reply("The dictionary is currently unavailable.")
             return
         if not entries:
@@ -107,8 +412,13 @@ class Jisho(commands.Cog):
             return
 
         pages = self.parse_entries_into_pages(entries)
+        more_entries = None
+        if len(entries) >= RESULTS_PER_PAGE:
+            more_entries = self.next_pages_fetcher(word)
 
-        paginator = botto.utils.EmbedPaginator(ctx, entries=pages, per_page=1)
+        paginator = botto.utils.EmbedPaginator(
+            ctx, entries=pages, per_page=1, more_entries=more_entries
+        )
         paginator.embed.set_author(name=f"Jisho entries related to {word}")
         await paginator.paginate()
 
@@ -138,6 +448,110 @@ class Jisho(commands.Cog):
         )
         return embed
 
+    @botto.group(name="jishocache", hidden=True, invoke_without_command=True)
+    @commands.is_owner()
+    async def jisho_cache(self, ctx: botto.Context) -> None:
+        """Manage the Jisho lookup cache."""
+        raise botto.SubcommandRequired
+
+    @jisho_cache.command(name="stats")
+    async def jisho_cache_stats(self, ctx: botto.Context) -> None:
+        """Show Jisho lookup cache statistics."""
+        stats = self.cache.stats()
+        limiter = self.rate_limiter.stats()
+        lookups: int = stats["hits"] + stats["misses"]
+        hit_rate: float = stats["hits"] / lookups * 100 if lookups else 0
+        disk: str = "Persistent cache: disabled\n"
+        if self.persistent_cache:
+            persistent = await self.persistent_cache.stats()
+            disk_lookups: int = persistent["hits"] + persistent["misses"]
+            disk_hit_rate: float = persistent["hits"] / disk_lookups * 100 if disk_lookups else 0
+            disk = (
+                f"Persistent cache: {persistent['size']} responses, "
+                f"{persistent['bytes'] / 1024 / 1024:.1f}/"
+                f"{persistent['max_bytes'] / 1024 / 1024:.0f} MiB, "
+                f"{persistent['hits']} hits ({disk_hit_rate:.1f}%), "
+                f"{persistent['misses']} misses, {persistent['evictions']} evictions\n"
+            )
+        circuit = self.circuit_breaker.stats()
+        await ctx.reply(
+            f"Entries: {stats['size']}/{stats['maxsize']}\n"
+            f"Hits: {stats['hits']} ({hit_rate:.1f}%)\n"
+            f"Misses: {stats['misses']}\n"
+            f"Evictions: {stats['evictions']}\n"
+            f"{disk}"
+            f"In-flight requests: {len(self.in_flight)} "
+            f"({self.in_flight.coalesced} lookups coalesced)\n"
+            f"Rate limiter: {limiter['tokens']:.1f}/{limiter['burst']} tokens "
+            f"at {limiter['rate']}/s\n"
+            f"Queue: {limiter['queued']}/{limiter['queue_size']} "
+            f"(peak {limiter['max_queued']}, {limiter['rejected']} rejected)\n"
+            f"Waits: {limiter['waited']}/{limiter['acquired']} requests, "
+            f"mean {limiter['mean_wait']:.2f} s, max {limiter['max_wait']:.2f} s\n"
+            f"Circuit: {circuit['state']} ({circuit['failures']} failures, "
+            f"opened {circuit['opened']} times, {circuit['rejected']} rejected, "
+            f"{circuit['slow_calls']} slow)\n"
+            f"Stale results served: {self.stale_served}"
+        )
+
+    @jisho_cache.command(name="clear")
+    async def jisho_cache_clear(self, ctx: botto.Context) -> None:
+        """Remove all entries from the Jisho lookup cache, including persisted responses."""
+        self.cache.clear()
+        if self.persistent_cache:
+            await self.persistent_cache.clear()
+        await ctx.reply("Cleared the Jisho lookup cache.")
+
+    @jisho_cache.command(name="warm")
+    async def jisho_cache_warm(self, ctx: botto.Context, *, words: str = "") -> None:
+        """Fill the persistent cache with the first page of results of words.
+
+        Words are separated by lines or spaces and may be given as an attached
+        text file, such as a JLPT vocabulary list. Requests are made in the
+        background one at a time, after any lookups waiting for the API.
+        """
+        if not self.persistent_cache:
+            await ctx.reply("The persistent cache is not configured.")
+            return
+        if self.warm_task and not self.warm_task.done():
+            await ctx.reply("The persistent cache is already being warmed.")
+            return
+        if ctx.message.attachments:
+            words = await ctx.get_as_text(ctx.message.attachments[0].url, encoding="utf-8")
+        keywords: List[str] = list(
+            dict.fromkeys(botto.utils.normalize_query(word) for word in words.split())
+        )
+        if not keywords:
+            await ctx.reply("No words were passed.")
+            return
+
+        await ctx.reply(f"Warming the persistent cache with {len(keywords)} words.")
+        self.warm_task = self.bot.loop.create_task(self.warm(ctx, keywords))
+
+    async def warm(self, ctx: botto.Context, keywords: List[str]) -> None:
+        """Request the keywords missing from the persistent cache and report when done."""
+        assert self.persistent_cache
+        fetched: int = 0
+        failed: int = 0
+        for keyword in keywords:
+            if await self.persistent_cache.contains(self.persistent_key(keyword, 1)):
+                continue
+            while True:
+                try:
+                    await self.request_response(keyword, priority=WARM_PRIORITY)
+                except (botto.ServiceBusy, botto.utils.CircuitOpen):
+                    await asyncio.sleep(WARM_RETRY_DELAY)
+                    continue
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    failed += 1
+                else:
+                    fetched += 1
+                break
+        await ctx.reply(
+            f"Warmed the persistent cache: {fetched} words requested, "
+            f"{len(keywords) - fetched - failed} already cached, {failed} failed."
+        )
+
 
 def setup(bot: botto.Botto) -> None:
     cog = Jisho(bot)
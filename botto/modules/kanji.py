@@ -1,58 +1,356 @@
-import unicodedata
+import asyncio
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 import discord  # type: ignore
 from discord.ext import commands  # type: ignore
 
 import botto
+from botto.dictionaries import KanjiVG, Kanjidic, KanjidicIndex, Kradfile, kanjivg
+from botto.dictionaries.kanjidic import frequency_key
 from botto.modules.help import HelpCommand
 
+logger: logging.Logger = logging.getLogger("botto.kanji")  # pylint: disable=invalid-name
+
+# Results are cached per character. Characters without results are kept for a
+# shorter time in case the data is updated.
+CACHE_MAX_ENTRIES = 4096
+CACHE_TTL = 24 * 60 * 60
+NEGATIVE_CACHE_TTL = 15 * 60
+
+# Most kanji looked up by a single command
+MAX_KANJI_PER_LOOKUP = 10
+# Seconds to wait for the restricted API to answer every kanji of a batch
+BATCH_LOOKUP_TIMEOUT = 60
+BATCH_LOOKUP_TIMEOUT_MESSAGE = "The kanji lookup took too long. Please try again later."
+
+# Kanji listed per page of a component, meaning or reading search
+RESULTS_PER_PAGE = 10
+# Most kanji listed for a meaning or reading
+MAX_SEARCH_RESULTS = 100
+# Characters separating components in a query besides whitespace
+COMPONENT_SEPARATORS = ",\N{IDEOGRAPHIC COMMA}\N{FULLWIDTH COMMA}"
+
+# How stroke order diagrams drawn from KanjiVG look
+STROKE_ORDER_OPTIONS = kanjivg.RenderOptions()
+
+
+class KanjiResult(NamedTuple):
+    """The kanji_search payload of a character and its rendered embed, None if not found."""
+
+    payload: Optional[dict]
+    embed: Optional[dict]
+
+
+class BatchLookup(NamedTuple):
+    """A lookup of several kanji waiting for the restricted API to answer each of them."""
+
+    ctx: botto.Context
+    characters: List[str]
+    results: Dict[str, KanjiResult]
+    expiry: asyncio.TimerHandle  # Replies that the lookup timed out
+
+
+def has_local_kanjidic(ctx: botto.Context) -> bool:
+    return ctx.cog is not None and ctx.cog.kanjidic is not None
+
+
+def has_local_kanjivg(ctx: botto.Context) -> bool:
+    return ctx.cog is not None and ctx.cog.kanjivg is not None
+
+
+def can_search_kanji_locally(ctx: botto.Context) -> bool:
+    """Check if the kanji command or its subcommand only needs local files.
+
+    Component searches only read the KRADFILE, so they run without the API.
+    """
+    if ctx.invoked_subcommand is not None and ctx.invoked_subcommand.name == "components":
+        return ctx.cog is not None and ctx.cog.kradfile is not None
+    return has_local_kanjidic(ctx)
+
 
 class KanjiSearch(commands.Cog):
     def __init__(self, bot: botto.Botto) -> None:
         self.bot: botto.Botto = bot
+        self.kanjidic: Optional[Kanjidic] = None
+        if botto.config["KANJIDIC_PATH"]:
+            self.kanjidic = Kanjidic(botto.config["KANJIDIC_PATH"])
+        self.kanji_index: Optional[KanjidicIndex] = None
+        if self.kanjidic:
+            self.kanji_index = KanjidicIndex(self.kanjidic)
+        self.kradfile: Optional[Kradfile] = None
+        if botto.config["KRADFILE_PATHS"]:
+            self.kradfile = Kradfile.load(
+                *botto.config["KRADFILE_PATHS"], key=self.kanji_frequency_key
+            )
+        self.kanji_cache: botto.utils.TTLCache = botto.utils.TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL)
+        # Character -> stroke order GIF URL, empty if there is none
+        self.stroke_order_cache: botto.utils.TTLCache = botto.utils.TTLCache(
+            CACHE_MAX_ENTRIES, CACHE_TTL
+        )
+        # Command message ID -> BatchLookup
+        self.batch_lookups: Dict[int, BatchLookup] = {}
+        self.kanjivg: Optional[KanjiVG] = None
+        if botto.config["KANJIVG_PATH"] and kanjivg.is_available():
+            self.kanjivg = KanjiVG(botto.config["KANJIVG_PATH"])
+            os.makedirs(botto.config["STROKE_ORDER_CACHE_PATH"], exist_ok=True)
+        elif botto.config["KANJIVG_PATH"]:
+            logger.warning("Pillow is not installed, stroke order diagrams will not be drawn.")
+        # Character -> (SVG path, diagram path) in KanjiVG, None if it has no file for it
+        self.stroke_order_files: Dict[str, Optional[Tuple[str, str]]] = {}
+        # Started with the first diagram to draw
+        self.render_pool: Optional[ProcessPoolExecutor] = None
+        # Diagram path -> render in progress
+        self.renders: botto.utils.SingleFlight = botto.utils.SingleFlight()
 
-    @botto.require_restricted_api()
-    @botto.command(name="kanji", aliases=["k", "かんじ", "漢字"])
-    async def kanji_search(self, ctx: botto.Context, kanji: str) -> None:
-        """Look up a kanji character."""
-        if len(kanji) > 1:
-            await ctx.send("Only one kanji can be queried at a time.")
-            return
+    def cog_unload(self) -> None:
+        if self.kanjidic:
+            self.kanjidic.close()
+        self.renders.cancel_all()
+        for lookup in self.batch_lookups.values():
+            lookup.expiry.cancel()
+        if self.render_pool:
+            self.render_pool.shutdown(wait=False)
 
-        legal_prefixes = ("CJK UNIFIED IDEOGRAPH", "CJK COMPATIBILITY IDEOGRAPH")
-        if not unicodedata.name(kanji, "").startswith(legal_prefixes):
+    def kanji_frequency_key(self, character: str) -> Tuple[int, int, int]:
+        """Sort kanji by frequency rank, then stroke count, then code point.
+
+        Kanji without a rank or missing from the local KANJIDIC2 file come last.
+        """
+        payload: Optional[dict] = self.kanjidic.lookup(character) if self.kanjidic else None
+        if not payload:
+            return sys.maxsize, sys.maxsize, ord(character)
+        return frequency_key(payload)
+
+    @botto.require_restricted_api(unless=can_search_kanji_locally)
+    @botto.group(name="kanji", aliases=["k", "かんじ", "漢字"], invoke_without_command=True)
+    async def kanji_search(self, ctx: botto.Context, *, kanji: str) -> None:
+        """Look up a kanji character, every kanji of a word, or kanji by meaning or reading."""
+        characters: List[str] = list(dict.fromkeys(filter(botto.utils.charclass.is_kanji, kanji)))
+        if not characters and self.kanji_index:
+            await self.search_kanji(ctx, kanji)
+            return
+        if not characters:
             await ctx.send(
                 "Kanji not found in the Japanese Industrial Standard (JIS) X kanji sets."
             )
             return
+        if len(characters) > MAX_KANJI_PER_LOOKUP:
+            await ctx.send(f"Only up to {MAX_KANJI_PER_LOOKUP} kanji can be queried at a time.")
+            return
+
+        results: Dict[str, KanjiResult] = self.lookup_known_kanji(characters)
+        missing: List[str] = [character for character in characters if character not in results]
+        if len(characters) == 1 and not missing:
+            await ctx.reply(**self.kanji_reply(characters[0], results[characters[0]]))
+        elif len(characters) == 1:
+            await self.bot.send_api_event_with_context("kanji_search", ctx, kanji=characters[0])
+        elif not missing:
+            await self.paginate_kanji(ctx, characters, results)
+        else:
+            await self.look_up_batch(ctx, characters, results, missing)
+
+    def lookup_known_kanji(self, characters: List[str]) -> Dict[str, KanjiResult]:
+        """Return the results of characters found in the cache or the local file.
+
+        Only kanji missing from the local file are looked up through the API, so
+        they are reported as not found if the API is disconnected. Those are not
+        cached, as the API may find them once it is connected again.
+        """
+        results: Dict[str, KanjiResult] = {}
+        for character in characters:
+            result: Optional[KanjiResult] = self.kanji_cache.get(character)
+            if result is not None:
+                results[character] = result
+            elif self.kanjidic:
+                data: Optional[dict] = self.kanjidic.lookup(character)
+                if data:
+                    results[character] = self.cache_kanji(character, data)
+                elif not botto.is_connected_to_restricted_api(self.bot):
+                    results[character] = KanjiResult(None, None)
+        return results
+
+    def cache_kanji(self, character: str, payload: Optional[dict]) -> KanjiResult:
+        """Render the embed of a kanji_search payload and cache both."""
+        if not payload:
+            result = KanjiResult(None, None)
+            self.kanji_cache.set(character, result, ttl=NEGATIVE_CACHE_TTL)
+        else:
+            result = KanjiResult(payload, self.make_kanji_embed(payload).to_dict())
+            self.kanji_cache.set(character, result)
+        return result
+
+    @staticmethod
+    def kanji_reply(character: str, result: KanjiResult) -> Dict[str, Any]:
+        """Return the arguments of the reply to a kanji lookup."""
+        if result.embed is None:
+            return {"content": f"Kanji {character} not found in KANJIDIC2."}
+        return {"embed": discord.Embed.from_dict(result.embed)}
 
-        await self.bot.send_api_event_with_context("kanji_search", ctx, kanji=kanji)
+    async def look_up_batch(
+        self,
+        ctx: botto.Context,
+        characters: List[str],
+        results: Dict[str, KanjiResult],
+        missing: List[str],
+    ) -> None:
+        """Send a kanji_search event per missing kanji and paginate once all are answered.
 
-    @commands.Cog.listener()  # noqa: C901
+        The restricted API has no event for several kanji, so each is looked up
+        on its own and the acks are gathered by the ID of the command message.
+        """
+        expiry: asyncio.TimerHandle = self.bot.loop.call_later(
+            BATCH_LOOKUP_TIMEOUT,
+            lambda: self.bot.loop.create_task(self.expire_batch_lookup(ctx.message.id)),
+        )
+        self.batch_lookups[ctx.message.id] = BatchLookup(ctx, characters, results, expiry)
+        try:
+            for character in missing:
+                await self.bot.send_api_event_with_context("kanji_search", ctx, kanji=character)
+        except botto.NotConnectedToRestrictedApi:
+            self.batch_lookups.pop(ctx.message.id)
+            expiry.cancel()
+            raise
+
+    async def expire_batch_lookup(self, message_id: int) -> None:
+        lookup: Optional[BatchLookup] = self.batch_lookups.pop(message_id, None)
+        if lookup is not None:
+            await lookup.ctx.reply(BATCH_LOOKUP_TIMEOUT_MESSAGE)
+
+    @commands.Cog.listener()
     async def on_restricted_api_ack_kanji_search(self, payload: dict) -> None:
+        character: str = payload["query_kanji"]
+        result: KanjiResult = self.cache_kanji(character, payload["kanji"])
+        lookup: Optional[BatchLookup] = self.batch_lookups.get(payload["ctx"]["message"]["id"])
+        if lookup is not None:
+            lookup.results[character] = result
+            if all(character in lookup.results for character in lookup.characters):
+                del self.batch_lookups[lookup.ctx.message.id]
+                lookup.expiry.cancel()
+                await self.paginate_kanji(lookup.ctx, lookup.characters, lookup.results)
+            return
         channel: botto.utils.OptionalChannel = self.bot.get_channel(payload["ctx"]["channel"]["id"])
         if not channel:
             return
         message: discord.PartialMessage = channel.get_partial_message(
             payload["ctx"]["message"]["id"]
         )
-        kanji = payload["kanji"]
-        if not kanji:
-            await message.reply(f"Kanji {payload['query_kanji']} not found in KANJIDIC2.")
+        await message.reply(**self.kanji_reply(character, result))
+
+    async def paginate_kanji(
+        self, ctx: botto.Context, characters: List[str], results: Dict[str, KanjiResult]
+    ) -> None:
+        """Reply with a page per kanji."""
+
+        def format_page(character: str) -> str:
+            result: Optional[KanjiResult] = results.get(character)
+            if result is None or result.payload is None:
+                return f"**{character}**\nNot found in KANJIDIC2."
+            return self.format_kanji_page(result.payload)
+
+        paginator = botto.utils.EmbedPaginator(
+            ctx, entries=botto.utils.LazyPages(characters, format_page), per_page=1
+        )
+        paginator.embed.set_author(name=f"Kanji Lookup - {''.join(characters)}")
+        await paginator.paginate()
+
+    async def search_kanji(self, ctx: botto.Context, query: str) -> None:
+        """Reply with the kanji whose meanings or readings start with the words of query.
+
+        Queries in romaji are matched against the readings as well as the meanings.
+        """
+        assert self.kanji_index is not None
+        results: List[str] = self.kanji_index.search(
+            query, reading=botto.utils.kana.to_hiragana(query.strip())
+        )
+        if not results:
+            await ctx.send(f"No kanji found for {query}.")
             return
+        paginator = botto.utils.EmbedPaginator(
+            ctx,
+            entries=botto.utils.LazyPages(results[:MAX_SEARCH_RESULTS], self.format_search_result),
+            per_page=RESULTS_PER_PAGE,
+            jump_option=True,
+        )
+        paginator.embed.set_author(name=f"Kanji Search - {query}")
+        await paginator.paginate()
 
-        embed: discord.Embed = discord.Embed(color=botto.config["MAIN_COLOR"])
+    @kanji_search.command(name="components", aliases=["部首"])
+    async def kanji_components(self, ctx: botto.Context, *, components: str) -> None:
+        """Find kanji made of all the given components."""
+        if self.kradfile is None:
+            await ctx.send("Component search is not available.")
+            return
+        query: List[str] = [
+            character
+            for character in dict.fromkeys(components)
+            if not character.isspace() and character not in COMPONENT_SEPARATORS
+        ]
+        unknown: List[str] = [c for c in query if not self.kradfile.has_component(c)]
+        if unknown:
+            await ctx.send(f"Unknown components: {' '.join(unknown)}")
+            return
 
-        embed.set_author(name=f"Kanji Lookup - {kanji['character']}")
+        results: List[str] = self.kradfile.search(query)
+        if not results:
+            await ctx.send(f"No kanji are made of all of {' '.join(query)}.")
+            return
+        paginator = botto.utils.EmbedPaginator(
+            ctx,
+            entries=botto.utils.LazyPages(results, self.format_component_result),
+            per_page=RESULTS_PER_PAGE,
+            jump_option=True,
+        )
+        paginator.embed.set_author(name=f"Kanji Components - {' '.join(query)}")
+        await paginator.paginate()
+
+    def format_component_result(self, character: str) -> str:
+        """Format a kanji of a component search with its components."""
+        assert self.kradfile is not None
+        return self.format_result(character, " ".join(self.kradfile.decompositions[character]))
+
+    def format_search_result(self, character: str) -> str:
+        """Format a kanji of a meaning or reading search with its first readings."""
+        assert self.kanjidic is not None
+        payload: Optional[dict] = self.kanjidic.lookup(character)
+        # Prefixes and suffixes are marked with dashes, such as みず- in 水着
+        readings: List[str] = list(
+            dict.fromkeys(
+                reading.strip("-")
+                for group in (payload["meanings_readings"] if payload else ())
+                for reading in group["kun_readings"] + group["on_readings"]
+            )
+        )
+        return self.format_result(character, "\N{IDEOGRAPHIC COMMA}".join(readings[:3]))
+
+    def format_result(self, character: str, details: str) -> str:
+        """Format a kanji of a search result with details and its first meanings."""
+        line: str = f"**{character}** {details}"
+        payload: Optional[dict] = self.kanjidic.lookup(character) if self.kanjidic else None
+        if payload:
+            meanings: List[str] = [
+                meaning for group in payload["meanings_readings"] for meaning in group["meanings"]
+            ]
+            if meanings:
+                line += " — " + ", ".join(meanings[:3])
+        return line
 
-        embed.description = f"Stroke count: {kanji['stroke_count']}"
+    @staticmethod
+    def format_kanji_details(kanji: dict) -> List[str]:
+        lines = [f"Stroke count: {kanji['stroke_count']}"]
         if kanji["grade"]:
-            embed.description += f"\nGrade: {kanji['grade']}"
+            lines.append(f"Grade: {kanji['grade']}")
         if kanji["frequency_rank"]:
-            embed.description += f"\nFrequency rank: #{kanji['frequency_rank']}"
+            lines.append(f"Frequency rank: #{kanji['frequency_rank']}")
         if kanji["old_jlpt_level"]:
-            embed.description += f"\nFormer JLPT level: {kanji['old_jlpt_level']}"
+            lines.append(f"Former JLPT level: {kanji['old_jlpt_level']}")
+        return lines
 
+    @staticmethod
+    def format_meanings_readings(kanji: dict) -> List[str]:
         lines = []
         for i, mr_object in enumerate(kanji["meanings_readings"], 1):
             if mr_object["meanings"]:
@@ -63,11 +361,40 @@ class KanjiSearch(commands.Cog):
                 lines.append("**kun:** " + "\N{IDEOGRAPHIC COMMA}".join(mr_object["kun_readings"]))
             if mr_object["on_readings"]:
                 lines.append("**on:** " + "\N{IDEOGRAPHIC COMMA}".join(mr_object["on_readings"]))
-            if i + 1 != len(kanji["meanings_readings"]):
+            if i != len(kanji["meanings_readings"]):
                 lines.append("\n")
+        return lines
+
+    @classmethod
+    def format_kanji_page(cls, kanji: dict) -> str:
+        """Format a kanji_search payload as the page of a kanji in a batch lookup."""
+        lines = [f"**{kanji['character']}**"]
+        lines.extend(cls.format_kanji_details(kanji))
+        if kanji["meanings_readings"]:
+            lines.append("")
+            lines.extend(cls.format_meanings_readings(kanji))
+        if kanji["nanori"]:
+            lines.append("")
+            lines.append("**Nanori:** " + "\N{IDEOGRAPHIC COMMA}".join(kanji["nanori"]))
+        if kanji["stroke_order_gif_url"]:
+            lines.append(f"[Stroke order]({kanji['stroke_order_gif_url']})")
+        return "\n".join(lines)
+
+    @classmethod
+    def make_kanji_embed(cls, kanji: dict) -> discord.Embed:
+        """Make the embed of a kanji from its kanji_search payload."""
+        embed: discord.Embed = discord.Embed(color=botto.config["MAIN_COLOR"])
+
+        embed.set_author(name=f"Kanji Lookup - {kanji['character']}")
+
+        embed.description = "\n".join(cls.format_kanji_details(kanji))
 
         if kanji["meanings_readings"]:
-            embed.add_field(name="Meanings and Readings", value="\n".join(lines), inline=False)
+            embed.add_field(
+                name="Meanings and Readings",
+                value="\n".join(cls.format_meanings_readings(kanji)),
+                inline=False,
+            )
 
         if kanji["nanori"]:
             embed.add_field(
@@ -79,7 +406,7 @@ class KanjiSearch(commands.Cog):
         if kanji["stroke_order_gif_url"]:
             embed.set_thumbnail(url=kanji["stroke_order_gif_url"])
 
-        await message.reply(embed=embed)
+        return embed
 
     @kanji_search.help_embed
     async def kanji_help_embed(self, help_command: HelpCommand) -> discord.Embed:
@@ -89,6 +416,12 @@ class KanjiSearch(commands.Cog):
         # pylint: enable=missing-format-attribute
         embed.description = (
             f"{self.kanji_search.short_doc}\n\n"  # pylint: disable=no-member
+            f"Pass a word to look up each of its kanji, up to {MAX_KANJI_PER_LOOKUP} at a "
+            f"time, and browse them page by page. Pass an English meaning or a reading in "
+            f"kana or romaji, such as `water` or `mizu`, to list the kanji matching it, "
+            f"the most common first. To find a kanji by its parts instead, "
+            f"type `{help_command.context.prefix}kanji components` followed by its "
+            f"radicals or other components, such as `氵 口`.\n\n"
             f"Kanji are the adopted logographic Chinese characters that are used in "
             f"the Japanese writing system. They are used alongside the Japanese "
             f"syllabic scripts hiragana and katakana. "
@@ -111,30 +444,89 @@ class KanjiSearch(commands.Cog):
         )
         return embed
 
-    @botto.require_restricted_api()
+    @botto.require_restricted_api(unless=has_local_kanjivg)
     @botto.command(aliases=["so", "ひつじゅん", "筆順", "かきじゅん", "書き順"])
     async def stroke_order(self, ctx: botto.Context, kanji: str) -> None:
         """View an animated stroke diagram of a Japanese character."""
         if len(kanji) > 1:
             await ctx.send("Only one Japanese character can be queried at a time.")
             return
+        if not botto.utils.charclass.flags(kanji) & (
+            botto.utils.charclass.KANJI | botto.utils.charclass.KANA
+        ):
+            await ctx.send("Stroke order diagrams are only available for kanji and kana.")
+            return
+
+        gif_url: Optional[str] = self.stroke_order_cache.get(kanji)
+        if gif_url is not None:
+            await ctx.reply(self.stroke_order_reply(kanji, gif_url))
+            return
+
+        path: Optional[str] = None
+        if self.kanjivg:
+            async with ctx.typing():
+                path = await self.render_stroke_order(kanji)
+        if path:
+            await ctx.reply(file=discord.File(path, filename=f"stroke_order_{ord(kanji):05x}.gif"))
+        elif not botto.is_connected_to_restricted_api(self.bot):
+            await ctx.reply(self.stroke_order_reply(kanji, ""))
+        else:
+            await self.bot.send_api_event_with_context("stroke_order", ctx, character=kanji)
+
+    async def render_stroke_order(self, character: str) -> Optional[str]:
+        """Return the path of the diagram of a character drawn from KanjiVG.
+
+        Diagrams are drawn in a process pool and kept on disk, and concurrent
+        requests for a diagram not drawn yet wait for the same render. Return
+        None if KanjiVG has no file for the character.
+        """
+        if character not in self.stroke_order_files:
+            self.stroke_order_files[character] = self.find_stroke_order_files(character)
+        files: Optional[Tuple[str, str]] = self.stroke_order_files[character]
+        if files is None:
+            return None
+        svg_path, path = files
+        if not os.path.isfile(path):
+            await self.renders.run(path, self.render_in_pool, svg_path, path)
+        return path
 
-        await self.bot.send_api_event_with_context("stroke_order", ctx, character=kanji)
+    def find_stroke_order_files(self, character: str) -> Optional[Tuple[str, str]]:
+        """Return the SVG path of a character and the path its diagram is kept in.
+
+        The diagram path hashes the SVG file, which is only read once per
+        character since KanjiVG files do not change while the bot runs.
+        """
+        assert self.kanjivg is not None
+        svg_path: Optional[str] = self.kanjivg.svg_path(character)
+        if svg_path is None:
+            return None
+        with open(svg_path, "rb") as file:
+            name: str = kanjivg.cache_name(character, file.read(), STROKE_ORDER_OPTIONS)
+        return svg_path, os.path.join(botto.config["STROKE_ORDER_CACHE_PATH"], name)
+
+    async def render_in_pool(self, svg_path: str, path: str) -> None:
+        if self.render_pool is None:
+            self.render_pool = ProcessPoolExecutor(botto.config["STROKE_ORDER_WORKERS"])
+        await asyncio.get_event_loop().run_in_executor(
+            self.render_pool, kanjivg.render_file, svg_path, path, STROKE_ORDER_OPTIONS
+        )
+
+    @staticmethod
+    def stroke_order_reply(character: str, gif_url: str) -> str:
+        return gif_url or f"Stroke order diagram for {character} was not found."
 
     @commands.Cog.listener()
     async def on_restricted_api_ack_stroke_order(self, payload: dict) -> None:
+        character: str = payload["query_character"]
+        gif_url: str = payload["gif_url"] or ""
+        self.stroke_order_cache.set(character, gif_url, ttl=None if gif_url else NEGATIVE_CACHE_TTL)
         channel: botto.utils.OptionalChannel = self.bot.get_channel(payload["ctx"]["channel"]["id"])
         if not channel:
             return
         message: discord.PartialMessage = channel.get_partial_message(
             payload["ctx"]["message"]["id"]
         )
-        if not payload["gif_url"]:
-            await message.reply(
-                f"Stroke order diagram for {payload['query_character']} was not found."
-            )
-        else:
-            await message.reply(payload["gif_url"])
+        await message.reply(self.stroke_order_reply(character, gif_url))
 
     @stroke_order.help_embed
     async def stroke_order_help_embed(self, help_command: HelpCommand) -> discord.Embed:
@@ -146,7 +538,8 @@ class KanjiSearch(commands.Cog):
             f"{self.stroke_order.short_doc}\n\n"  # pylint: disable=no-member
             f"Animated stroke diagrams are generated using data from "
             f"[KanjiVG](https://kanjivg.tagaini.net/) and "
-            f"[maurimo's Kanimaji script](https://github.com/maurimo/kanimaji)."
+            f"[maurimo's Kanimaji script](https://github.com/maurimo/kanimaji), "
+            f"or drawn by Tango from the same data."
         )
         embed.add_field(
             name="Command Aliases",
@@ -154,6 +547,35 @@ class KanjiSearch(commands.Cog):
         )
         return embed
 
+    @botto.group(name="kanjicache", hidden=True, invoke_without_command=True)
+    @commands.is_owner()
+    async def kanji_cache_group(self, ctx: botto.Context) -> None:
+        """Manage the kanji and stroke order caches."""
+        raise botto.SubcommandRequired
+
+    @kanji_cache_group.command(name="stats")
+    async def kanji_cache_stats(self, ctx: botto.Context) -> None:
+        """Show kanji and stroke order cache statistics."""
+        lines = []
+        for name, cache in (("Kanji", self.kanji_cache), ("Stroke order", self.stroke_order_cache)):
+            stats = cache.stats()
+            lookups: int = stats["hits"] + stats["misses"]
+            hit_rate: float = stats["hits"] / lookups * 100 if lookups else 0
+            lines.append(
+                f"{name}: {stats['size']}/{stats['maxsize']} characters, "
+                f"{stats['hits']} hits ({hit_rate:.1f}%), {stats['misses']} misses, "
+                f"{stats['evictions']} evictions"
+            )
+        await ctx.reply("\n".join(lines))
+
+    @kanji_cache_group.command(name="clear")
+    async def kanji_cache_clear(self, ctx: botto.Context) -> None:
+        """Remove all entries from the kanji and stroke order caches after a data update."""
+        self.kanji_cache.clear()
+        self.stroke_order_cache.clear()
+        self.stroke_order_files.clear()
+        await ctx.reply("Cleared the kanji and stroke order caches.")
+
 
 def setup(bot: botto.Botto) -> None:
     cog = KanjiSearch(bot)
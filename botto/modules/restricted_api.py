@@ -7,12 +7,7 @@ import aiohttp
 from discord.ext import commands, tasks
 
 import botto
-
-try:
-    import ujson as json
-except ImportError:
-    import json  # type: ignore
-
+from botto.utils import json_codec
 
 logger: logging.Logger = logging.getLogger("botto.restricted_api")  # pylint: disable=invalid-name
 
@@ -49,9 +44,10 @@ class RestrictedApi(commands.Cog):
                 continue
 
             logger.info("Connected to restricted API.")
+            self.bot.dispatch("restricted_api_connect")
             self.ping_and_get_latency.start()  # pylint: disable=no-member
             async for msg in self.websocket:
-                data: Dict[str, Any] = json.loads(msg.data)
+                data: Dict[str, Any] = json_codec.loads(msg.data)
                 self.bot.dispatch("restricted_api_" + data["type"], data)
             logger.info("Disconnected from restricted API.")
 
@@ -79,7 +75,7 @@ class RestrictedApi(commands.Cog):
         if not self.websocket:
             raise botto.NotConnectedToRestrictedApi
         try:
-            await self.websocket.send_str(json.dumps(dict(type=event, **data)))
+            await self.websocket.send_str(json_codec.dumps(dict(type=event, **data)))
         except (RuntimeError, ConnectionResetError) as exc:
             # RuntimeError: unable to perform operation on <TCPTransport closed=True reading=False
             # 0x??? >; the handler is closed
@@ -1,18 +1,307 @@
 import asyncio
-from typing import Any, Dict, Optional
+import logging
+import random
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
 
 import discord  # type: ignore
 from discord.ext import commands  # type: ignore
 
 import botto
+from botto.dictionaries import Wordbase
+from botto.dictionaries.wordbase import Word
 from botto.modules.help import HelpCommand
 
+logger: logging.Logger = logging.getLogger("botto.shiritori")  # pylint: disable=invalid-name
+
+BAD_WORD_MESSAGE = "That did not seem like proper Japanese with kana only."
+
+END_MESSAGES: Dict[str, str] = {
+    "timeout": "Time's up!",
+    "repeat": "You repeated that word!",
+    "bad_word": BAD_WORD_MESSAGE,
+    "bad_continuation": (
+        "The first syllable of that word did not match the last syllable of the previous word."
+    ),
+    "not_noun": "That is not a common noun!",
+    "n_ending": "Words that end with ん or ン end the game.",
+    "win_no_more_words": "Miraculously, you have beaten the CPU player!",
+}
+
+CHECK_MESSAGES: Dict[Optional[str], str] = {
+    "bad_word": BAD_WORD_MESSAGE,
+    "not_noun": "That is not a common noun.",
+    "n_ending": "Words that end with ん or ン end the game.",
+    None: "Looks good!",
+}
+
+# Results of words in the table replying to a check of several words
+CHECK_SUMMARIES: Dict[Optional[str], str] = {
+    "bad_word": "invalid",
+    "not_noun": "not a noun",
+    "n_ending": "ends with n",
+    None: "ok",
+}
+
+# The word games start with
+FIRST_WORD: Word = Word.from_reading("しりとり", "尻取り")
+
+# Most games in progress at once, the least recently played being forgotten beyond it
+MAX_SESSIONS = 4096
+# Seconds to wait for the restricted API to answer a turn before forgetting the game
+TURN_ACK_TIMEOUT = 60
+TURN_ACK_TIMEOUT_MESSAGE = (
+    "Your game of Shiritori has ended because Tango took too long to answer. "
+    "Please try again later."
+)
+
+# Seconds game snapshots wait to be written together
+SNAPSHOT_WRITE_INTERVAL = 1
+
+# Most words checked by a single command
+MAX_WORDS_PER_CHECK = 20
+# Seconds to wait for the restricted API to answer every word of a check
+BATCH_CHECK_TIMEOUT = 60
+BATCH_CHECK_TIMEOUT_MESSAGE = "The check took too long. Please try again later."
+# Longest word shown in the table of a check of several words
+MAX_CHECKED_WORD_LENGTH = 24
+
+
+def check_noun(
+    wordbase: Wordbase, word: Optional[botto.utils.kana.KanaWord]
+) -> Tuple[Optional[str], Optional[Word]]:
+    """Check a word against the rules which do not depend on the game.
+
+    Return the end type of the word, None if it is allowed, and the noun if it
+    is in the wordbase.
+    """
+    end_type: Optional[str] = botto.utils.kana.check_word(word)
+    if word is None or end_type == "bad_word":
+        return "bad_word", None
+    noun: Optional[Word] = wordbase.lookup(word.key)
+    if noun is None:
+        return "not_noun", None
+    return end_type, noun
+
+
+class UnackedTurn(NamedTuple):
+    """A turn sent to the restricted API which it has not acked yet."""
+
+    session: "ShiritoriSession"
+    expiry: asyncio.TimerHandle  # Ends the game if the ack does not come in time
+
+
+class BatchCheck(NamedTuple):
+    """A check of several words waiting for the restricted API to answer each of them."""
+
+    ctx: botto.Context
+    words: List[Tuple[str, Optional[botto.utils.kana.KanaWord]]]  # As typed and parsed
+    results: Dict[str, Optional[str]]  # Word as typed -> end type
+    pending: List[str]  # Normalized words sent to the restricted API, in order
+    expiry: asyncio.TimerHandle  # Replies that the check timed out
+
+
+def has_local_wordbase(ctx: botto.Context) -> bool:
+    return ctx.cog is not None and ctx.cog.wordbase is not None
+
+
+class ShiritoriGame:
+    """A game against the computer played with a local wordbase.
+
+    Turns return payloads shaped like the acks of the restricted API's
+    shiritori event. Each turn takes constant time: words are looked up by
+    reading and the computer reads its answer from the shuffled answers of
+    the last mora, starting at a random offset and skipping used words.
+    """
+
+    def __init__(self, wordbase: Wordbase, timeout: int) -> None:
+        self.wordbase: Wordbase = wordbase
+        self.timeout: int = timeout
+        self.score: int = 0
+        self.used: Set[str] = {FIRST_WORD.key}
+        self.last_mora: str = FIRST_WORD.last_mora
+        self.offset: int = random.randrange(len(wordbase) or 1)
+        # Mora -> answers already read for it
+        self.answers_read: Dict[str, int] = {}
+
+    def play(self, text: Optional[str]) -> Dict[str, Any]:
+        """Play the player's word, None if their time ran out, and answer it."""
+        if text is None:
+            return self.payload("timeout")
+        word: Optional[botto.utils.kana.KanaWord] = botto.utils.kana.parse_word(text)
+        end_type, _ = check_noun(self.wordbase, word)
+        if word is None or end_type == "bad_word":
+            return self.payload("bad_word")
+        if word.first_mora != self.last_mora:
+            return self.payload("bad_continuation")
+        if word.key in self.used:
+            return self.payload("repeat")
+        if end_type:
+            return self.payload(end_type)
+
+        self.used.add(word.key)
+        self.score += 1
+        answer: Optional[Word] = self.answer(word.last_mora)
+        if answer is None:
+            return self.payload("win_no_more_words")
+        self.used.add(answer.key)
+        self.last_mora = answer.last_mora
+        return self.payload(None, answer)
+
+    def answer(self, mora: str) -> Optional[Word]:
+        """Return an unused word starting with mora, or None if there is none left."""
+        answers = self.wordbase.answers(mora)
+        read: int = self.answers_read.get(mora, 0)
+        while read < len(answers):
+            word: Word = answers[(self.offset + read) % len(answers)]
+            read += 1
+            if word.key not in self.used:
+                self.answers_read[mora] = read
+                return word
+        self.answers_read[mora] = read
+        return None
+
+    def payload(self, end_type: Optional[str], next_word: Optional[Word] = None) -> Dict[str, Any]:
+        return {
+            "end_type": end_type,
+            "next_word": next_word and {"reading": next_word.reading, "writing": next_word.writing},
+            "score": self.score,
+            "timeout": self.timeout,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "used": list(self.used),
+            "last_mora": self.last_mora,
+            "score": self.score,
+            "offset": self.offset,
+        }
+
+    @classmethod
+    def from_snapshot(
+        cls, wordbase: Wordbase, timeout: int, snapshot: Dict[str, Any]
+    ) -> "ShiritoriGame":
+        """Restore a game, whose computer player reads its answers from the start again."""
+        game: ShiritoriGame = cls(wordbase, timeout)
+        game.used = set(snapshot["used"])
+        game.last_mora = snapshot["last_mora"]
+        game.score = snapshot["score"]
+        game.offset = snapshot["offset"]
+        return game
+
+
+class ShiritoriSession:
+    """A game in progress and the message its next reply answers.
+
+    Parameters
+    ------------
+    ctx: botto.Context
+        The context of the player's last word, or of the command if there is none yet.
+    timeout: int
+        The time limit of a turn in seconds.
+    game: Optional[ShiritoriGame]
+        The game if it is played locally, None if it is played with the restricted API.
+    """
+
+    def __init__(
+        self, ctx: botto.Context, timeout: int, game: Optional[ShiritoriGame] = None
+    ) -> None:
+        self.ctx: botto.Context = ctx
+        self.timeout: int = timeout
+        self.game: Optional[ShiritoriGame] = game
+        # The score the restricted API last acked
+        self.score: int = 0
+        # Timestamp the player's word is due by, None if the turn is not theirs
+        self.deadline: Optional[float] = None
+        # Whether the player's last word was sent to the restricted API without an ack yet
+        self.awaiting_ack: bool = False
+        # The word sent to the restricted API, None if the player ran out of time
+        self.word: Optional[str] = None
+        # Number of words sent to the restricted API, so that it can ignore a turn sent again
+        self.turn: int = 0
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.ctx.channel.id, self.ctx.author.id
+
+    @property
+    def snapshot_key(self) -> str:
+        return "{0}:{1}".format(*self.key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the state the game is resumed from after a restart."""
+        return {
+            "channel_id": self.ctx.channel.id,
+            "message_id": self.ctx.message.id,
+            "timeout": self.timeout,
+            "score": self.game.score if self.game else self.score,
+            "deadline": self.deadline,
+            "awaiting_ack": self.awaiting_ack,
+            "word": self.word,
+            "turn": self.turn,
+            "game": self.game and self.game.snapshot(),
+        }
+
+    @classmethod
+    def from_snapshot(
+        cls, ctx: botto.Context, snapshot: Dict[str, Any], wordbase: Optional[Wordbase]
+    ) -> "ShiritoriSession":
+        game: Optional[ShiritoriGame] = None
+        if snapshot["game"] is not None:
+            if wordbase is None:
+                raise ValueError("Local Shiritori games cannot be resumed without a wordbase.")
+            game = ShiritoriGame.from_snapshot(wordbase, snapshot["timeout"], snapshot["game"])
+        session: ShiritoriSession = cls(ctx, snapshot["timeout"], game)
+        session.score = snapshot["score"]
+        session.deadline = snapshot["deadline"]
+        session.awaiting_ack = snapshot["awaiting_ack"]
+        session.word = snapshot["word"]
+        session.turn = snapshot.get("turn", 0)
+        return session
+
 
 class Shiritori(commands.Cog):
     def __init__(self, bot: botto.Botto) -> None:
         self.bot: botto.Botto = bot
+        # Games are played with the restricted API if there is no local wordbase
+        self.wordbase: Optional[Wordbase] = None
+        engine: str = botto.config["SHIRITORI_ENGINE"]
+        if engine == "local":
+            if not botto.config["SHIRITORI_WORDBASE_PATH"]:
+                raise ValueError("SHIRITORI_ENGINE local requires SHIRITORI_WORDBASE_PATH.")
+            self.wordbase = Wordbase(botto.config["SHIRITORI_WORDBASE_PATH"])
+        elif engine != "restricted_api":
+            raise ValueError(f"Unknown SHIRITORI_ENGINE {engine!r}.")
+        # (Channel ID, player ID) -> the game waiting for the player's word
+        self.turns: botto.utils.WaiterRegistry = botto.utils.WaiterRegistry()
+        # (Channel ID, player ID) -> ShiritoriSession, forgotten if a turn is never answered
+        self.sessions: botto.utils.TTLCache = botto.utils.TTLCache(MAX_SESSIONS, TURN_ACK_TIMEOUT)
+        # (Channel ID, player ID) -> UnackedTurn, sent again when the restricted API reconnects
+        self.unacked: Dict[Tuple[int, int], UnackedTurn] = {}
+        # Command message ID -> BatchCheck
+        self.batch_checks: Dict[int, BatchCheck] = {}
+        # Games are resumed from their snapshots after a restart
+        self.snapshots: Optional[botto.utils.SnapshotStore] = None
+        self.resume_task: Optional[asyncio.Task] = None
+        if botto.config["SHIRITORI_SNAPSHOT_PATH"]:
+            self.snapshots = botto.utils.SnapshotStore(
+                botto.config["SHIRITORI_SNAPSHOT_PATH"], interval=SNAPSHOT_WRITE_INTERVAL
+            )
+            self.resume_task = self.bot.loop.create_task(self.resume_sessions())
 
-    @botto.require_restricted_api()
+    def cog_unload(self) -> None:
+        # Games keep their snapshots to be resumed when the cog is loaded again
+        self.turns.cancel_all()
+        for check in self.batch_checks.values():
+            check.expiry.cancel()
+        for turn in self.unacked.values():
+            turn.expiry.cancel()
+        if self.resume_task:
+            self.resume_task.cancel()
+        if self.snapshots:
+            self.snapshots.close()
+
+    @botto.require_restricted_api(unless=has_local_wordbase)
     @botto.group(aliases=["しりとり", "尻取り"], invoke_without_command=True)
     async def shiritori(self, ctx: botto.Context, time_limit: int = 20) -> None:
         """Play Shiritori with Tango!"""
@@ -40,41 +329,215 @@ class Shiritori(commands.Cog):
 
         await ctx.reply(f"{ctx.author.mention} Starting off, しりとり!")
 
-        await self.wait_for_and_query_next_word(ctx, time_limit)
-
-    async def wait_for_and_query_next_word(self, ctx: botto.Context, timeout: int) -> None:
-        def check(message: discord.Message) -> bool:
-            return (
-                ctx.author == message.author
-                and ctx.channel == message.channel
-                and message.content is not None
-                and not message.content.startswith("\\")
+        if self.wordbase is not None:
+            await self.play_locally(
+                ShiritoriSession(ctx, time_limit, ShiritoriGame(self.wordbase, time_limit))
             )
+        else:
+            await self.wait_for_and_query_next_word(ShiritoriSession(ctx, time_limit))
 
-        word: Optional[str]
+    async def wait_for_word(self, session: ShiritoriSession) -> Optional[str]:
+        """Wait for the player's word, None if the time limit of the turn runs out.
+
+        The session's context becomes that of the word. A resumed session keeps
+        the deadline of its turn.
+        """
+        if session.deadline is None:
+            session.deadline = time.time() + session.timeout
+        self.sessions.set(
+            session.key, session, ttl=session.deadline - time.time() + TURN_ACK_TIMEOUT
+        )
+        self.save_session(session)
+        word: Optional[str] = None
         try:
-            msg: discord.Message = await self.bot.wait_for("message", check=check, timeout=timeout)
+            msg: discord.Message = await self.turns.wait(
+                session.key, session.deadline - time.time()
+            )
         except asyncio.TimeoutError:
-            word = None
+            pass
         else:
-            word = msg.content.replace(" ", "").replace("\N{IDEOGRAPHIC SPACE}", "")
-            ctx = await self.bot.get_context(msg, cls=botto.Context)
-        await self.bot.send_api_event_with_context("shiritori", ctx, word=word, timeout=timeout)
+            word = msg.content
+            session.ctx = await self.bot.get_context(msg, cls=botto.Context)
+        session.deadline = None
+        return word
+
+    def save_session(self, session: ShiritoriSession) -> None:
+        """Stage the snapshot of a session, written with others off the turn's path."""
+        if self.snapshots is None:
+            return
+        expires_at: float = (session.deadline or time.time()) + TURN_ACK_TIMEOUT
+        self.snapshots.put(session.snapshot_key, session.snapshot(), expires_at)
+
+    def end_session(self, session: ShiritoriSession) -> None:
+        # The player may have started another game in the same channel since
+        if self.sessions.get_stale(session.key) is session:
+            self.sessions.pop(session.key)
+            self.forget_unacked(session.key)
+            if self.snapshots:
+                self.snapshots.delete(session.snapshot_key)
 
     @commands.Cog.listener()
-    async def on_restricted_api_ack_shiritori(self, payload: Dict[str, Any]) -> None:
-        channel: botto.utils.OptionalChannel = self.bot.get_channel(payload["ctx"]["channel"]["id"])
+    async def on_message(self, message: discord.Message) -> None:
+        """Hand a message to the game of its author in its channel, if they are playing."""
+        if message.content is not None and not message.content.startswith("\\"):
+            self.turns.deliver((message.channel.id, message.author.id), message)
+
+    async def wait_for_and_query_next_word(self, session: ShiritoriSession) -> None:
+        """Wait for the player's word and send it to the restricted API.
+
+        Words breaking the rules that need no dictionary end the game without
+        going over the socket.
+        """
+        text: Optional[str] = await self.wait_for_word(session)
+        word: Optional[botto.utils.kana.KanaWord] = None
+        end_type: Optional[str] = None
+        if text is not None:
+            word = botto.utils.kana.parse_word(text)
+            end_type = botto.utils.kana.check_word(word)
+        if end_type:
+            await self.reply_to_turn(session.ctx, {"end_type": end_type, "score": session.score})
+            self.end_session(session)
+            return
+        session.word = word and word.text
+        session.turn += 1
+        session.awaiting_ack = True
+        self.await_ack(session)
+        self.save_session(session)
+        await self.send_turn(session)
+
+    async def send_turn(self, session: ShiritoriSession) -> None:
+        """Send the player's word to the restricted API, or leave it to be sent on reconnect."""
         try:
-            message: discord.Message = discord.utils.get(
-                self.bot.cached_messages, id=payload["ctx"]["message"]["id"]
-            ) or await channel.fetch_message(  # type: ignore
-                payload["ctx"]["message"]["id"]
+            await self.bot.send_api_event_with_context(
+                "shiritori",
+                session.ctx,
+                word=session.word,
+                timeout=session.timeout,
+                turn=session.turn,
             )
-        except (AttributeError, discord.NotFound):
-            payload["end_type"] = "silent"
+        except botto.NotConnectedToRestrictedApi:
+            logger.info("Shiritori turn of %s waits for the restricted API.", session.key)
+
+    @commands.Cog.listener()
+    async def on_restricted_api_connect(self) -> None:
+        """Send the turns whose acks were lost with the previous connection again.
+
+        Turns keep their number, so the restricted API can ignore those it
+        already received and only the ack of which was lost.
+        """
+        for turn in tuple(self.unacked.values()):
+            session: ShiritoriSession = turn.session
+            if self.sessions.get_stale(session.key) is not session:
+                self.forget_unacked(session.key)
+                continue
+            self.sessions.set(session.key, session, ttl=TURN_ACK_TIMEOUT)
+            self.await_ack(session)
+            await self.send_turn(session)
+
+    def await_ack(self, session: ShiritoriSession) -> None:
+        """Keep a session whose turn was sent until it is acked, ending it if it is not in time."""
+        self.forget_unacked(session.key)
+        expiry: asyncio.TimerHandle = self.bot.loop.call_later(
+            TURN_ACK_TIMEOUT, lambda: self.bot.loop.create_task(self.expire_turn(session))
+        )
+        self.unacked[session.key] = UnackedTurn(session, expiry)
+
+    def forget_unacked(self, key: Tuple[int, int]) -> None:
+        turn: Optional[UnackedTurn] = self.unacked.pop(key, None)
+        if turn is not None:
+            turn.expiry.cancel()
+
+    async def expire_turn(self, session: ShiritoriSession) -> None:
+        turn: Optional[UnackedTurn] = self.unacked.get(session.key)
+        if turn is None or turn.session is not session:
+            return
+        del self.unacked[session.key]
+        if self.sessions.get_stale(session.key) is session:
+            self.end_session(session)
+            await session.ctx.reply(TURN_ACK_TIMEOUT_MESSAGE)
+
+    async def play_locally(self, session: ShiritoriSession) -> None:
+        """Play a game with the local wordbase until it ends."""
+        assert session.game is not None
+        payload: Dict[str, Any] = {"end_type": None}
+        while not payload["end_type"]:
+            payload = session.game.play(await self.wait_for_word(session))
+            await self.reply_to_turn(session.ctx, payload)
+        self.end_session(session)
+
+    async def resume_sessions(self) -> None:
+        """Resume the games of the snapshots left by the last run of the cog."""
+        assert self.snapshots is not None
+        await self.bot.wait_until_ready()
+        for key, snapshot in (await self.snapshots.load()).items():
+            ctx: Optional[botto.Context] = await self.fetch_context(
+                snapshot["channel_id"], snapshot["message_id"]
+            )
+            if ctx is None or (snapshot["game"] is not None and self.wordbase is None):
+                self.snapshots.delete(key)
+                continue
+            session: ShiritoriSession = ShiritoriSession.from_snapshot(ctx, snapshot, self.wordbase)
+            self.bot.loop.create_task(self.resume_session(session))
+        logger.info("Resumed Shiritori games.")
+
+    async def resume_session(self, session: ShiritoriSession) -> None:
+        if session.awaiting_ack:
+            self.sessions.set(session.key, session, ttl=TURN_ACK_TIMEOUT)
+            self.await_ack(session)
+            await self.send_turn(session)
+            return
+        assert session.deadline is not None
+        remaining: int = round(session.deadline - time.time())
+        if remaining > 0:
+            await session.ctx.reply(
+                f"{session.ctx.author.mention} Your game of Shiritori was interrupted, but it goes "
+                f"on! You have {remaining} seconds left."
+            )
+        if session.game is not None:
+            await self.play_locally(session)
+        else:
+            await self.wait_for_and_query_next_word(session)
+
+    async def fetch_context(self, channel_id: int, message_id: int) -> Optional[botto.Context]:
+        """Return the context of a message, None if it cannot be found."""
+        channel: botto.utils.OptionalChannel = self.bot.get_channel(channel_id)
+        if not isinstance(channel, (discord.DMChannel, discord.TextChannel)):
+            return None
+        try:
+            message: discord.Message = await channel.fetch_message(message_id)
+        except discord.HTTPException:
+            return None
+        return await self.bot.get_context(message, cls=botto.Context)
+
+    @commands.Cog.listener()
+    async def on_restricted_api_ack_shiritori(self, payload: Dict[str, Any]) -> None:
+        """Reply to a turn played with the restricted API, in the session of its game.
+
+        Acks of games forgotten since, of turns the player already moved on
+        from, or of turns sent again after a reconnect and already acked, are
+        ignored.
+        """
+        session: Optional[ShiritoriSession] = self.sessions.get(
+            (payload["ctx"]["channel"]["id"], payload["ctx"]["author"]["id"])
+        )
+        if (
+            session is None
+            or not session.awaiting_ack
+            or session.ctx.message.id != payload["ctx"]["message"]["id"]
+        ):
+            return
+        session.awaiting_ack = False
+        self.forget_unacked(session.key)
+        session.score = payload["score"]
+        await self.reply_to_turn(session.ctx, payload)
+        if payload["end_type"]:
+            self.end_session(session)
         else:
-            ctx: botto.Context = await self.bot.get_context(message, cls=botto.Context)
+            await self.wait_for_and_query_next_word(session)
 
+    @staticmethod
+    async def reply_to_turn(ctx: botto.Context, payload: Dict[str, Any]) -> None:
+        """Reply with the computer's word, or how the game ended if it did."""
         if not payload["end_type"]:
             reading: str = payload["next_word"]["reading"]
             writing: Optional[str] = payload["next_word"]["writing"]
@@ -84,24 +547,8 @@ class Shiritori(commands.Cog):
             else:
                 response = reading
             await ctx.reply(response)
-            await self.wait_for_and_query_next_word(ctx, payload["timeout"])
-            return
-        if payload["end_type"] == "silent":
             return
-
-        end_messages: Dict[str, str] = {
-            "timeout": "Time's up!",
-            "repeat": "You repeated that word!",
-            "bad_word": "That did not seem like proper Japanese with kana only.",
-            "bad_continuation": (
-                "The first syllable of that word did not match "
-                "the last syllable of the previous word."
-            ),
-            "not_noun": "That is not a common noun!",
-            "n_ending": "Words that end with ん or ン end the game.",
-            "win_no_more_words": "Miraculously, you have beaten the CPU player!",
-        }
-        await ctx.reply(end_messages[payload["end_type"]] + f" (Score: {payload['score']})")
+        await ctx.reply(END_MESSAGES[payload["end_type"]] + f" (Score: {payload['score']})")
 
     @shiritori.help_embed
     async def shiritori_help_embed(self, help_command: HelpCommand) -> discord.Embed:
@@ -139,27 +586,122 @@ class Shiritori(commands.Cog):
         embed.set_image(url="http://www.619.io/assets/img/shiritori/shiritori.png")
         return embed
 
-    @botto.require_restricted_api()
+    @botto.require_restricted_api(unless=has_local_wordbase)
     @shiritori.command(name="check", aliases=["かくにん", "確認"])
-    async def shiritori_check(self, ctx: botto.Context, word: str) -> None:
-        """Check if your word is Shiritori-compliant."""
-        await self.bot.send_api_event_with_context("shiritori_check", ctx, word=word)
+    async def shiritori_check(self, ctx: botto.Context, *, words: str) -> None:
+        """Check if your words are Shiritori-compliant."""
+        typed: List[str] = list(dict.fromkeys(words.split()))
+        if len(typed) > MAX_WORDS_PER_CHECK:
+            await ctx.reply(f"Only up to {MAX_WORDS_PER_CHECK} words can be checked at a time.")
+            return
+        parsed: List[Tuple[str, Optional[botto.utils.kana.KanaWord]]] = [
+            (word, botto.utils.kana.parse_word(word)) for word in typed
+        ]
+        if len(parsed) == 1:
+            await self.check_word(ctx, parsed[0][1])
+            return
+
+        results: Dict[str, Optional[str]] = {}
+        unchecked: List[str] = []
+        for word, kana_word in parsed:
+            if self.wordbase is not None:
+                results[word] = check_noun(self.wordbase, kana_word)[0]
+                continue
+            end_type: Optional[str] = botto.utils.kana.check_word(kana_word)
+            if kana_word is None or end_type:
+                results[word] = end_type
+            else:
+                unchecked.append(kana_word.text)
+        if not unchecked:
+            await ctx.reply(self.format_checks(parsed, results))
+            return
+        await self.check_batch(ctx, parsed, results, list(dict.fromkeys(unchecked)))
+
+    async def check_batch(
+        self,
+        ctx: botto.Context,
+        words: List[Tuple[str, Optional[botto.utils.kana.KanaWord]]],
+        results: Dict[str, Optional[str]],
+        unchecked: List[str],
+    ) -> None:
+        """Send a shiritori_check event per unchecked word and reply once all are answered.
+
+        The restricted API has no event for several words, so each is checked
+        on its own and the acks are gathered by the ID of the command message.
+        """
+        expiry: asyncio.TimerHandle = self.bot.loop.call_later(
+            BATCH_CHECK_TIMEOUT,
+            lambda: self.bot.loop.create_task(self.expire_batch_check(ctx.message.id)),
+        )
+        self.batch_checks[ctx.message.id] = BatchCheck(ctx, words, results, unchecked, expiry)
+        try:
+            for word in unchecked:
+                await self.bot.send_api_event_with_context("shiritori_check", ctx, word=word)
+        except botto.NotConnectedToRestrictedApi:
+            self.batch_checks.pop(ctx.message.id)
+            expiry.cancel()
+            raise
+
+    async def expire_batch_check(self, message_id: int) -> None:
+        check: Optional[BatchCheck] = self.batch_checks.pop(message_id, None)
+        if check is not None:
+            await check.ctx.reply(BATCH_CHECK_TIMEOUT_MESSAGE)
+
+    async def check_word(
+        self, ctx: botto.Context, kana_word: Optional[botto.utils.kana.KanaWord]
+    ) -> None:
+        """Reply to the check of a single word."""
+        if self.wordbase is not None:
+            await ctx.reply(CHECK_MESSAGES[check_noun(self.wordbase, kana_word)[0]])
+            return
+        end_type: Optional[str] = botto.utils.kana.check_word(kana_word)
+        if kana_word is None or end_type:
+            await ctx.reply(CHECK_MESSAGES[end_type])
+            return
+        await self.bot.send_api_event_with_context("shiritori_check", ctx, word=kana_word.text)
 
     @commands.Cog.listener()
     async def on_restricted_api_ack_shiritori_check(self, payload: Dict[str, Any]) -> None:
+        check: Optional[BatchCheck] = self.batch_checks.get(payload["ctx"]["message"]["id"])
+        if check is not None:
+            await self.record_batch_check(check, payload)
+            return
         channel: botto.utils.OptionalChannel = self.bot.get_channel(payload["ctx"]["channel"]["id"])
         if not channel:
             return
         message: discord.PartialMessage = channel.get_partial_message(
             payload["ctx"]["message"]["id"]
         )
-        end_messages: Dict[Optional[str], str] = {
-            "bad_word": "That did not seem like proper Japanese with kana only.",
-            "not_noun": "That is not a common noun.",
-            "n_ending": "Words that end with ん or ン end the game.",
-            None: "Looks good!",
-        }
-        await message.reply(end_messages[payload["end_type"]])
+        await message.reply(CHECK_MESSAGES[payload["end_type"]])
+
+    async def record_batch_check(self, check: BatchCheck, payload: Dict[str, Any]) -> None:
+        """Record the ack of a word of a batch check, and reply once every word is answered."""
+        # Acks echo the word as query_word, or else arrive in the order sent
+        word: Optional[str] = payload.get("query_word")
+        if word not in check.pending:
+            word = check.pending[0]
+        check.pending.remove(word)
+        for typed, kana_word in check.words:
+            if kana_word is not None and kana_word.text == word:
+                check.results[typed] = payload["end_type"]
+        if not check.pending:
+            del self.batch_checks[check.ctx.message.id]
+            check.expiry.cancel()
+            await check.ctx.reply(self.format_checks(check.words, check.results))
+
+    @staticmethod
+    def format_checks(
+        words: List[Tuple[str, Optional[botto.utils.kana.KanaWord]]],
+        results: Dict[str, Optional[str]],
+    ) -> str:
+        """Format the results of several words as a table, a row per word."""
+        width: int = max(map(len, CHECK_SUMMARIES.values()))
+        rows: List[str] = [
+            f"{CHECK_SUMMARIES[results[word]]:<{width}}  "
+            + botto.utils.limit_str(word, MAX_CHECKED_WORD_LENGTH)
+            for word, _ in words
+        ]
+        return "```\n" + "\n".join(rows) + "\n```"
 
     @shiritori_check.help_embed
     async def shiritori_check_help_embed(self, help_command: HelpCommand) -> discord.Embed:
@@ -172,6 +714,8 @@ class Shiritori(commands.Cog):
             "The current implementation of Tango's Shiritori only allows hiragana and katakana to "
             "be used. Shiritori with kanji will be added in the future, with kana-only Shiritori "
             "being a game option.\n\n"
+            f"Separate words with spaces or new lines to check up to {MAX_WORDS_PER_CHECK} of "
+            "them at once.\n\n"
             "To learn how to play the game with Tango, type "
             f"`{help_command.context.prefix} help shiritori`."
         )
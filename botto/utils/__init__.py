@@ -2,13 +2,19 @@ import random
 import re
 import sys
 import traceback
+import unicodedata
 from typing import Any, Dict, List, Match, Optional, Tuple, Union
 
 import aiohttp
 import discord
 
 from botto import config
-from .paginator import EmbedPaginator
+from . import charclass, json_codec, kana
+from .cache import PersistentCache, TTLCache
+from .circuit import CircuitBreaker, CircuitOpen
+from .concurrency import RateLimiter, RateLimitExceeded, SingleFlight, WaiterRegistry
+from .paginator import EmbedPaginator, LazyPages
+from .snapshots import SnapshotStore
 
 AnyChannel = Union[
     discord.TextChannel,
@@ -29,6 +35,15 @@ def limit_str(string: Any, limit: int) -> str:
     return _string
 
 
+def normalize_query(query: str) -> str:
+    """Normalize a search query so equivalent spellings compare equal.
+
+    Width variants are folded with NFKC, case is folded and runs of whitespace
+    are collapsed into single spaces.
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
 def is_too_long_err(error: Exception) -> Optional[Tuple[str, int]]:
     """Check if error is caused by message body too long.
 
@@ -77,7 +92,7 @@ async def hastebin(
         raise ValueError("No Hastebin-like URL provided.")
     session = session or aiohttp.ClientSession()
     async with session.post(create_url, data=content.encode("utf-8")) as resp:
-        response = await resp.json()
+        response = await json_codec.read_json(resp)
         return paste_url.format(key=response["key"])
 
 
@@ -102,7 +117,7 @@ async def gist(
 
     session = session or aiohttp.ClientSession()
     async with session.post(url, headers=headers, json=data) as resp:
-        response = await resp.json()
+        response = await json_codec.read_json(resp)
         return response["html_url"]
 
 
@@ -0,0 +1,277 @@
+import asyncio
+import collections
+import concurrent.futures
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """A bounded mapping with least-recently-used eviction and per-entry expiry.
+
+    Expired entries are kept until they are replaced or evicted, so that they
+    can still be served with :meth:`get_stale` when fresh values are unavailable.
+
+    Parameters
+    ------------
+    maxsize: int
+        The maximum number of entries held before the least recently used is evicted.
+    ttl: float
+        The default time-to-live of an entry in seconds.
+    timer: Callable[[], float]
+        The monotonic clock used to timestamp entries.
+
+    Attributes
+    -----------
+    hits: int
+        Number of lookups that returned a live entry.
+    misses: int
+        Number of lookups that found no entry or an expired one.
+    evictions: int
+        Number of entries dropped to stay within maxsize.
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: float, *, timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer.")
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self.timer: Callable[[], float] = timer
+        # key -> (expiry timestamp, value), ordered from least to most recently used
+        self._data: "collections.OrderedDict[Hashable, Tuple[float, Any]]" = (
+            collections.OrderedDict()
+        )
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        item: Optional[Tuple[float, Any]] = self._data.get(key)
+        return item is not None and item[0] > self.timer()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value of key and mark it as recently used."""
+        item: Optional[Tuple[float, Any]] = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        if item[0] <= self.timer():
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value of key even if it expired, without counting a lookup."""
+        item: Optional[Tuple[float, Any]] = self._data.get(key)
+        return default if item is None else item[1]
+
+    def set(self, key: Hashable, value: Any, *, ttl: Optional[float] = None) -> None:
+        """Store value under key, evicting the least recently used entries if full."""
+        expires_at: float = self.timer() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value regardless of expiry."""
+        item: Optional[Tuple[float, Any]] = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        """Remove all entries. Counters are left untouched."""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the size and counters of the cache."""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class PersistentCache:
+    """A SQLite store of bytes values with per-entry expiry and a total size cap.
+
+    Entries survive restarts. When the values take more than max_size bytes,
+    expired entries are removed first, then the least recently used ones.
+    The database is only accessed from a dedicated worker thread, so awaiting
+    the methods never blocks the event loop.
+
+    Parameters
+    ------------
+    path: str
+        The path of the SQLite database, created if it does not exist.
+    max_size: int
+        The maximum total size of the values in bytes.
+    ttl: float
+        The default time-to-live of an entry in seconds.
+    timer: Callable[[], float]
+        The wall clock used to timestamp entries, which must be comparable
+        across restarts.
+
+    Attributes
+    -----------
+    hits: int
+        Number of lookups that returned a live entry.
+    misses: int
+        Number of lookups that found no entry or an expired one.
+    evictions: int
+        Number of live entries dropped to stay within max_size.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at);
+    """
+
+    def __init__(
+        self, path: str, *, max_size: int, ttl: float, timer: Callable[[], float] = time.time
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer.")
+        self.path: str = path
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.timer: Callable[[], float] = timer
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._executor: concurrent.futures.ThreadPoolExecutor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache")
+        )
+        self._connection: Optional[sqlite3.Connection] = None
+        self._size: int = 0
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The connection to the database, opened on first use in the worker thread."""
+        if self._connection is None:
+            connection: sqlite3.Connection = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.SCHEMA)
+            self._size = connection.execute("SELECT total(size) FROM cache").fetchone()[0]
+            self._connection = connection
+        return self._connection
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the live value of key and mark it as recently used."""
+        return await self._run(self._get, key)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now: float = self.timer()
+        row: Optional[Tuple[bytes, float]] = self.connection.execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            self.misses += 1
+            return None
+        self.connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return row[0]
+
+    async def get_stale(self, key: str) -> Optional[bytes]:
+        """Return the value of key even if it expired, without counting a lookup.
+
+        Expired entries are only kept until the cache runs out of space.
+        """
+        return await self._run(self._get_stale, key)
+
+    def _get_stale(self, key: str) -> Optional[bytes]:
+        row: Optional[Tuple[bytes]] = self.connection.execute(
+            "SELECT value FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    async def contains(self, key: str) -> bool:
+        """Check if key has a live value without marking it as used."""
+        return await self._run(self._contains, key)
+
+    def _contains(self, key: str) -> bool:
+        row: Optional[Tuple[int]] = self.connection.execute(
+            "SELECT 1 FROM cache WHERE key = ? AND expires_at > ?", (key, self.timer())
+        ).fetchone()
+        return row is not None
+
+    async def set(self, key: str, value: bytes, *, ttl: Optional[float] = None) -> None:
+        """Store value under key, evicting entries if the cache grows too large."""
+        await self._run(self._set, key, value, self.ttl if ttl is None else ttl)
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        now: float = self.timer()
+        with self.connection:
+            row: Optional[Tuple[int]] = self.connection.execute(
+                "SELECT size FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now + ttl, now),
+            )
+            self._size += len(value) - (row[0] if row else 0)
+            if self._size > self.max_size:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._size -= self.connection.execute(
+            "SELECT total(size) FROM cache WHERE expires_at <= ?", (now,)
+        ).fetchone()[0]
+        self.connection.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        while self._size > self.max_size:
+            key, size = self.connection.execute(
+                "SELECT key, size FROM cache ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            self.connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._size -= size
+            self.evictions += 1
+
+    async def clear(self) -> None:
+        """Remove all entries. Counters are left untouched."""
+        await self._run(self._clear)
+
+    def _clear(self) -> None:
+        self.connection.execute("DELETE FROM cache")
+        self._size = 0
+
+    async def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the size and counters of the cache."""
+        return await self._run(self._stats)
+
+    def _stats(self) -> Dict[str, int]:
+        count: int = self.connection.execute("SELECT count(*) FROM cache").fetchone()[0]
+        return {
+            "size": count,
+            "bytes": int(self._size),
+            "max_bytes": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """Close the database once pending operations are done."""
+        if self._connection is not None:
+            self._executor.submit(self._connection.close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,133 @@
+"""Character classes of Japanese text with constant time lookups.
+
+Every code point of the BMP and the CJK extension planes has a byte of flags
+in a table built once on first use, so importing the module costs nothing.
+The JIS kanji sets are read from the euc_jp and euc_jis_2004 codecs, so they
+need no data file.
+"""
+
+import codecs
+import functools
+from typing import List, Tuple
+
+# Flags of a code point
+JIS_X_0208 = 1  # Kanji of JIS X 0208, the common set of Japanese encodings
+JIS_X_0212 = 2  # Supplementary kanji of JIS X 0212
+JIS_X_0213 = 4  # Kanji of JIS X 0213, which extends JIS X 0208
+HIRAGANA = 8
+KATAKANA = 16
+IDEOGRAPH = 32  # Any CJK ideograph, including those of no JIS set
+MARK = 64  # Prolonged sound, iteration and voicing marks such as ー, 々 and ゛
+
+KANJI = JIS_X_0208 | JIS_X_0212 | JIS_X_0213
+KANA = HIRAGANA | KATAKANA
+# Characters of words written in Japanese, as dictionaries list them
+JAPANESE = KANA | IDEOGRAPH | MARK
+
+# Code points past the CJK extension planes have no flags
+TABLE_SIZE = 0x31350
+
+# Inclusive ranges of CJK ideographs, which leave out the non-kanji of the JIS sets
+IDEOGRAPH_RANGES: Tuple[Tuple[int, int], ...] = (
+    (0x3400, 0x4DBF),  # CJK unified ideographs extension A
+    (0x4E00, 0x9FFF),  # CJK unified ideographs
+    (0xF900, 0xFAFF),  # CJK compatibility ideographs
+    (0x20000, 0x2FFFF),  # CJK unified ideographs extension B onwards and supplement
+    (0x30000, 0x3134F),  # CJK unified ideographs extension G
+)
+
+# Inclusive ranges of each kana class
+KANA_RANGES: Tuple[Tuple[int, int, int], ...] = (
+    (0x3041, 0x3096, HIRAGANA),  # ぁ to ゖ
+    (0x309D, 0x309F, HIRAGANA),  # ゝ, ゞ and ゟ
+    (0x30A1, 0x30FA, KATAKANA),  # ァ to ヺ
+    (0x30FD, 0x30FF, KATAKANA),  # ヽ, ヾ and ヿ
+    (0x31F0, 0x31FF, KATAKANA),  # Small katakana for Ainu such as ㇰ
+    (0xFF66, 0xFF6F, KATAKANA),  # Halfwidth ｦ to ｯ
+    (0xFF71, 0xFF9D, KATAKANA),  # Halfwidth ｱ to ﾝ
+)
+MARKS = "々〆\u3099\u309a゛゜゠・ーｰ"
+
+
+def _skip_cell(error: UnicodeError) -> Tuple[str, int]:
+    # Replace an unmapped cell of a row with a single character so that the
+    # rest of the row stays aligned, cells being 2 bytes or 3 with a prefix.
+    assert isinstance(error, UnicodeDecodeError)
+    width: int = 3 if error.object[0] == 0x8F else 2
+    return "\N{REPLACEMENT CHARACTER}", error.start - error.start % width + width
+
+
+codecs.register_error("botto.charclass", _skip_cell)
+
+
+def _jis_characters(encoding: str, prefix: bytes = b"") -> List[str]:
+    """Return the characters of the 94x94 cells of a JIS plane in an EUC encoding."""
+    characters: List[str] = []
+    cells: bytes = bytes(range(0xA1, 0xFF))
+    width: int = len(prefix) + 2
+    encoded: bytearray = bytearray(len(cells) * width)
+    if prefix:
+        encoded[0::width] = prefix * len(cells)
+    encoded[width - 1 :: width] = cells
+    for row in cells:
+        encoded[width - 2 :: width] = bytes((row,)) * len(cells)
+        decoded: str = encoded.decode(encoding, "botto.charclass")
+        if len(decoded) == len(cells):
+            characters.extend(decoded)
+            continue
+        # Some cells decode to a kana and a combining mark
+        for start in range(0, len(encoded), width):
+            characters.append(encoded[start : start + width].decode(encoding, "botto.charclass"))
+    return characters
+
+
+@functools.lru_cache(maxsize=None)
+def table() -> bytearray:
+    """Return the table of flags, indexed by code point, building it on the first call."""
+    built: bytearray = bytearray(TABLE_SIZE)
+    # The ranges do not overlap, so they are filled with slices
+    for start, end in IDEOGRAPH_RANGES:
+        built[start : end + 1] = bytes((IDEOGRAPH,)) * (end + 1 - start)
+    for start, end, kana_flags in KANA_RANGES:
+        built[start : end + 1] = bytes((kana_flags,)) * (end + 1 - start)
+    for flag, encoding, prefix in (
+        (JIS_X_0208, "euc_jp", b""),
+        (JIS_X_0212, "euc_jp", b"\x8f"),
+        (JIS_X_0213, "euc_jis_2004", b""),
+        (JIS_X_0213, "euc_jis_2004", b"\x8f"),
+    ):
+        # Cells decoding to several characters are not kanji
+        for character in _jis_characters(encoding, prefix):
+            if len(character) == 1 and built[ord(character)] & IDEOGRAPH:
+                built[ord(character)] |= flag
+    for character in MARKS:
+        built[ord(character)] |= MARK
+    return built
+
+
+def flags(character: str) -> int:
+    """Return the flags of a single character."""
+    code_point: int = ord(character)
+    return table()[code_point] if code_point < TABLE_SIZE else 0
+
+
+def is_kanji(character: str) -> bool:
+    """Check if character is a kanji of JIS X 0208, JIS X 0212 or JIS X 0213."""
+    return bool(flags(character) & KANJI)
+
+
+def is_kana(character: str) -> bool:
+    return bool(flags(character) & KANA)
+
+
+def all_of(text: str, mask: int) -> bool:
+    """Check if every character of text has at least one of the flags of mask."""
+    flags_of: bytearray = table()
+    return all(
+        ord(character) < TABLE_SIZE and flags_of[ord(character)] & mask for character in text
+    )
+
+
+def is_japanese(text: str) -> bool:
+    """Check if text is non-empty and only made of kana, ideographs and Japanese marks."""
+    return bool(text) and all_of(text, JAPANESE)
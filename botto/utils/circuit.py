@@ -0,0 +1,129 @@
+import time
+from typing import Any, Callable, Coroutine, Dict, Optional, Tuple, Type
+
+
+class CircuitOpen(Exception):
+    """Raised when a :class:`CircuitBreaker` does not let a call through."""
+
+
+class CircuitBreaker:
+    """Stops calling a failing service for a while so that callers fail fast.
+
+    The circuit starts closed and lets every call through. After
+    failure_threshold consecutive failures it opens and rejects calls with
+    CircuitOpen for recovery_time seconds. It is then half-open and lets one
+    trial call through at a time: a success closes the circuit again, while a
+    failure opens it for another recovery_time.
+
+    A call fails when it raises one of exceptions or, if slow_call_threshold is
+    set, when it takes longer than that many seconds. The result of a slow call
+    is still returned to its caller. Other exceptions neither count as a
+    failure nor as a success.
+
+    Parameters
+    ------------
+    failure_threshold: int
+        The number of consecutive failures opening the circuit.
+    recovery_time: float
+        The seconds the circuit stays open before letting a trial call through.
+    slow_call_threshold: Optional[float]
+        The seconds after which a call counts as failed.
+    exceptions: Tuple[Type[BaseException], ...]
+        The exceptions counting as failures.
+    timer: Callable[[], float]
+        The monotonic clock used to time calls.
+
+    Attributes
+    -----------
+    opened: int
+        Number of times the circuit opened.
+    rejected: int
+        Number of calls rejected while the circuit was open.
+    slow_calls: int
+        Number of calls counted as failed for being too slow.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_time: float,
+        *,
+        slow_call_threshold: Optional[float] = None,
+        exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+        self.failure_threshold: int = failure_threshold
+        self.recovery_time: float = recovery_time
+        self.slow_call_threshold: Optional[float] = slow_call_threshold
+        self.exceptions: Tuple[Type[BaseException], ...] = exceptions
+        self.timer: Callable[[], float] = timer
+        self._failures: int = 0
+        self._opened_at: Optional[float] = None
+        self._trial: bool = False
+        self.opened: int = 0
+        self.rejected: int = 0
+        self.slow_calls: int = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.timer() - self._opened_at < self.recovery_time:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    async def call(self, func: Callable[..., Coroutine[Any, Any, Any]], *args: Any) -> Any:
+        """Await func(*args) if the circuit lets it through, else raise CircuitOpen."""
+        state: str = self.state
+        if state == self.OPEN or state == self.HALF_OPEN and self._trial:
+            self.rejected += 1
+            raise CircuitOpen(f"The circuit is {state}.")
+        trial: bool = state == self.HALF_OPEN
+        self._trial = self._trial or trial
+
+        start: float = self.timer()
+        try:
+            result: Any = await func(*args)
+        except self.exceptions:
+            self._record_failure()
+            raise
+        finally:
+            if trial:
+                self._trial = False
+
+        if self.slow_call_threshold is not None and (
+            self.timer() - start > self.slow_call_threshold
+        ):
+            self.slow_calls += 1
+            self._record_failure()
+        else:
+            self._failures = 0
+            self._opened_at = None
+        return result
+
+    def _record_failure(self) -> None:
+        state: str = self.state
+        self._failures += 1
+        # A failed trial call opens the circuit again right away
+        if state == self.HALF_OPEN or (
+            state == self.CLOSED and self._failures >= self.failure_threshold
+        ):
+            self._opened_at = self.timer()
+            self._failures = 0
+            self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the state and counters of the circuit."""
+        return {
+            "state": self.state,
+            "failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "slow_calls": self.slow_calls,
+        }
@@ -0,0 +1,299 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Coroutine, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a key into one in-flight task.
+
+    The first caller for a key starts the task, later callers await the same task
+    until it finishes. Its result or exception is delivered to every waiter.
+    A waiter being cancelled only cancels that waiter, while the task itself
+    being cancelled cancels every waiter.
+
+    Attributes
+    -----------
+    coalesced: int
+        Number of calls that joined an already in-flight task.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced: int = 0
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def run(
+        self,
+        key: Hashable,
+        func: Callable[..., Coroutine[Any, Any, Any]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Await func(*args, **kwargs), sharing the call with concurrent callers of key."""
+        task: asyncio.Future
+        if key in self._tasks:
+            task = self._tasks[key]
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Retrieve the exception so it is not reported as never retrieved
+        # when every waiter was cancelled before the task finished.
+        if not task.cancelled():
+            task.exception()
+
+    def cancel_all(self) -> None:
+        """Cancel every in-flight task, which cancels all of their waiters."""
+        for task in tuple(self._tasks.values()):
+            task.cancel()
+
+
+class WaiterRegistry:
+    """Futures waiting for a value by key, with one timer for all of their deadlines.
+
+    Handing a value to a key is a dict lookup however many calls are waiting,
+    unlike discord.py's wait_for, which runs the check of every waiter on
+    every event. Deadlines are kept in a heap and a single timer handle of the
+    event loop fires at the earliest one, instead of one per waiter.
+    """
+
+    def __init__(self) -> None:
+        self._waiters: Dict[Hashable, asyncio.Future] = {}
+        # Heap of (deadline, arrival, future) of waiters, kept until their deadline
+        # passes even if they got their value before
+        self._deadlines: List[Tuple[float, int, asyncio.Future]] = []
+        self._arrivals: Iterator[int] = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._waiters
+
+    async def wait(self, key: Hashable, timeout: float) -> Any:
+        """Wait for the value delivered to key, raising asyncio.TimeoutError after timeout.
+
+        A new call for a key that is already waited for cancels the previous one.
+        """
+        previous: Optional[asyncio.Future] = self._waiters.get(key)
+        if previous is not None:
+            previous.cancel()
+        loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
+        future: asyncio.Future = loop.create_future()
+        self._waiters[key] = future
+        heapq.heappush(self._deadlines, (loop.time() + timeout, next(self._arrivals), future))
+        self._schedule()
+        try:
+            return await future
+        finally:
+            if self._waiters.get(key) is future:
+                del self._waiters[key]
+
+    def deliver(self, key: Hashable, value: Any) -> bool:
+        """Hand value to the call waiting for key and return whether there was one."""
+        future: Optional[asyncio.Future] = self._waiters.pop(key, None)
+        if future is None or future.done():
+            return False
+        future.set_result(value)
+        return True
+
+    def cancel_all(self) -> None:
+        """Cancel every waiting call."""
+        for future in tuple(self._waiters.values()):
+            future.cancel()
+        self._deadlines.clear()
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+    def _schedule(self) -> None:
+        if not self._deadlines:
+            return
+        deadline: float = self._deadlines[0][0]
+        if self._wakeup is not None:
+            if self._wakeup.when() <= deadline:
+                return
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_event_loop().call_at(deadline, self._expire)
+
+    def _expire(self) -> None:
+        self._wakeup = None
+        now: float = asyncio.get_event_loop().time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            future: asyncio.Future = heapq.heappop(self._deadlines)[2]
+            if not future.done():
+                future.set_exception(asyncio.TimeoutError())
+        self._schedule()
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the wait queue of a :class:`RateLimiter` is full."""
+
+
+class RateLimiter:
+    """A token bucket pacing calls, with a bounded priority queue of waiters.
+
+    Tokens are added at rate per second, up to burst tokens. Each acquire takes
+    a token, waiting for one if none are left. Waiters are served by lowest
+    priority value first, then in order of arrival. Once queue_size calls are
+    waiting, further calls fail fast with RateLimitExceeded.
+
+    Parameters
+    ------------
+    rate: float
+        The sustained number of calls allowed per second.
+    burst: int
+        The number of calls allowed at once after being idle.
+    queue_size: int
+        The maximum number of calls waiting for a token.
+    timer: Callable[[], float]
+        The monotonic clock used to add tokens.
+
+    Attributes
+    -----------
+    acquired: int
+        Number of tokens handed out.
+    waited: int
+        Number of calls that had to wait for their token.
+    rejected: int
+        Number of calls rejected because the queue was full.
+    total_wait: float
+        Seconds spent waiting by all calls that waited.
+    max_wait: float
+        The longest wait of a call in seconds.
+    max_queued: int
+        The most calls waiting at once.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        *,
+        queue_size: int,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        if burst < 1:
+            raise ValueError("burst must be at least 1.")
+        if queue_size < 0:
+            raise ValueError("queue_size must not be negative.")
+        self.rate: float = rate
+        self.burst: int = burst
+        self.queue_size: int = queue_size
+        self.timer: Callable[[], float] = timer
+        self._tokens: float = burst
+        self._updated: float = timer()
+        self._paused_until: float = 0
+        # Heap of (priority, arrival, future) of waiting calls
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals: Iterator[int] = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.acquired: int = 0
+        self.waited: int = 0
+        self.rejected: int = 0
+        self.total_wait: float = 0
+        self.max_wait: float = 0
+        self.max_queued: int = 0
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    def _refill(self) -> None:
+        now: float = self.timer()
+        # No tokens are added while paused
+        start: float = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self.rate)
+        self._updated = max(now, self._updated)
+
+    async def acquire(self, priority: int = 0) -> float:
+        """Take a token, waiting for one if needed, and return the seconds waited."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self.acquired += 1
+            return 0
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise RateLimitExceeded(f"{len(self._waiters)} calls are already waiting.")
+
+        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        waiter: Tuple[int, int, asyncio.Future] = (priority, next(self._arrivals), future)
+        heapq.heappush(self._waiters, waiter)
+        self.max_queued = max(self.max_queued, len(self._waiters))
+        self._schedule()
+
+        start: float = self.timer()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            else:  # The token was handed over just before cancelling
+                self._tokens += 1
+                self.acquired -= 1
+            self._schedule()
+            raise
+
+        delta: float = self.timer() - start
+        self.waited += 1
+        self.total_wait += delta
+        self.max_wait = max(self.max_wait, delta)
+        return delta
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for seconds, such as when upstream asks to back off."""
+        self._refill()
+        self._tokens = 0
+        self._paused_until = max(self._paused_until, self.timer() + seconds)
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._wakeup is not None or not self._waiters:
+            return
+        delay: float = max(self._paused_until - self.timer(), (1 - self._tokens) / self.rate, 0)
+        self._wakeup = asyncio.get_event_loop().call_later(delay, self._release)
+
+    def _release(self) -> None:
+        self._wakeup = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            future: asyncio.Future = heapq.heappop(self._waiters)[2]
+            self._tokens -= 1
+            self.acquired += 1
+            future.set_result(None)
+        self._schedule()
+
+    def stats(self) -> Dict[str, float]:
+        """Return a snapshot of the queue depth, wait times and counters."""
+        self._refill()
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": self._tokens,
+            "queued": len(self._waiters),
+            "queue_size": self.queue_size,
+            "max_queued": self.max_queued,
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "mean_wait": self.total_wait / self.waited if self.waited else 0,
+            "max_wait": self.max_wait,
+        }
@@ -0,0 +1,84 @@
+"""JSON encoding and decoding with the fastest available library.
+
+orjson is preferred, then ujson, then the standard library. Every codec
+decodes from bytes as well as str, so HTTP bodies and websocket frames are
+decoded without creating an intermediate str first. Encoded JSON is compact
+and keeps non-ASCII characters as they are.
+"""
+
+import json
+from typing import Any, Callable, Dict, NamedTuple, Optional, Union
+
+import aiohttp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+try:
+    import ujson
+except ImportError:
+    ujson = None  # type: ignore
+
+
+class Codec(NamedTuple):
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    dumps: Callable[[Any], str]
+    dumps_bytes: Callable[[Any], bytes]
+
+
+def _json_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _ujson_dumps(obj: Any) -> str:
+    return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+
+# Available codecs from most to least preferred
+CODECS: Dict[str, Codec] = {}
+if orjson is not None:
+    CODECS["orjson"] = Codec(
+        "orjson", orjson.loads, lambda obj: orjson.dumps(obj).decode(), orjson.dumps
+    )
+if ujson is not None:
+    CODECS["ujson"] = Codec(
+        "ujson", ujson.loads, _ujson_dumps, lambda obj: _ujson_dumps(obj).encode()
+    )
+CODECS["json"] = Codec("json", json.loads, _json_dumps, lambda obj: _json_dumps(obj).encode())
+
+codec: Codec = next(iter(CODECS.values()))
+
+loads: Callable[[Union[bytes, str]], Any] = codec.loads
+dumps: Callable[[Any], str] = codec.dumps
+dumps_bytes: Callable[[Any], bytes] = codec.dumps_bytes
+
+
+async def read_json(
+    response: aiohttp.ClientResponse,
+    *,
+    encoding: Optional[str] = None,
+    loads: Callable[[Any], Any] = loads,  # pylint: disable=redefined-outer-name
+    content_type: Optional[str] = "application/json",
+) -> Any:
+    """Read and decode the JSON body of a response like ClientResponse.json.
+
+    The body is decoded straight from bytes unless an encoding is given.
+    """
+    if content_type and not (
+        response.content_type == content_type
+        or content_type == "application/json"
+        and response.content_type.endswith("+json")
+    ):
+        raise aiohttp.ContentTypeError(
+            response.request_info,
+            response.history,
+            message=f"Attempt to decode JSON with unexpected mimetype: {response.content_type}",
+            headers=response.headers,
+        )
+    body: Union[bytes, str] = await response.read()
+    if encoding is not None:
+        body = body.decode(encoding)  # type: ignore
+    return loads(body)
@@ -0,0 +1,719 @@
+"""Kana to romaji conversion using precompiled lookup tables.
+
+The output follows the same Modified Hepburn rules as kanaconv's KanaConv,
+which this replaces in the hot path of page rendering: long vowels use macrons
+(がっこう → gakkō), sokuon doubles the following consonant (まっちゃ → matcha)
+and ん is followed by an apostrophe before vowels and y (きんえん → kin'en).
+
+Searches typed in romaji are converted back to hiragana with the same tables.
+Words played in Shiritori are normalized and split into morae with
+translation tables as well, so checking a word needs no round trip.
+"""
+
+import functools
+import re
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+MACRONS: Dict[str, str] = {"a": "ā", "i": "ī", "u": "ū", "e": "ē", "o": "ō"}
+
+# Pairs of vowels which merge into a long vowel, e.g. おう → ō (but not えい → ē)
+LONG_VOWEL_PAIRS = {("a", "a"), ("u", "u"), ("e", "e"), ("o", "o"), ("o", "u")}
+
+# Consonants after ん which require an apostrophe, e.g. ほんや → hon'ya
+N_APOSTROPHE_TRIGGERS = {"a", "i", "u", "e", "o", "y"}
+
+# Katakana with a consonant and a vowel: (romaji, geminate consonant, consonant, vowel)
+_KATAKANA_CONSONANT_VOWELS: Dict[str, Tuple[str, str, str, str]] = {
+    "カ": ("ka", "k", "k", "a"), "キ": ("ki", "k", "k", "i"), "ク": ("ku", "k", "k", "u"),
+    "ケ": ("ke", "k", "k", "e"), "コ": ("ko", "k", "k", "o"), "サ": ("sa", "s", "s", "a"),
+    "シ": ("shi", "s", "sh", "i"), "ス": ("su", "s", "s", "u"), "セ": ("se", "s", "s", "e"),
+    "ソ": ("so", "s", "s", "o"), "タ": ("ta", "t", "t", "a"), "チ": ("chi", "t", "ch", "i"),
+    "ツ": ("tsu", "t", "ts", "u"), "テ": ("te", "t", "t", "e"), "ト": ("to", "t", "t", "o"),
+    "ナ": ("na", "n", "n", "a"), "ニ": ("ni", "n", "n", "i"), "ヌ": ("nu", "n", "n", "u"),
+    "ネ": ("ne", "n", "n", "e"), "ノ": ("no", "n", "n", "o"), "ハ": ("ha", "h", "h", "a"),
+    "ヒ": ("hi", "h", "h", "i"), "フ": ("fu", "f", "f", "u"), "ヘ": ("he", "h", "h", "e"),
+    "ホ": ("ho", "h", "h", "o"), "マ": ("ma", "m", "m", "a"), "ミ": ("mi", "m", "m", "i"),
+    "ム": ("mu", "m", "m", "u"), "メ": ("me", "m", "m", "e"), "モ": ("mo", "m", "m", "o"),
+    "ヤ": ("ya", "y", "y", "a"), "ユ": ("yu", "y", "y", "u"), "ヨ": ("yo", "y", "y", "o"),
+    "ラ": ("ra", "r", "r", "a"), "リ": ("ri", "r", "r", "i"), "ル": ("ru", "r", "r", "u"),
+    "レ": ("re", "r", "r", "e"), "ロ": ("ro", "r", "r", "o"), "ワ": ("wa", "w", "w", "a"),
+    "ヲ": ("wo", "w", "w", "o"), "ヰ": ("i", "", "", "i"), "ヱ": ("e", "", "", "e"),
+    "ン": ("n", "n", "n", "n"), "ヵ": ("ka", "k", "k", "a"), "ヶ": ("ka", "k", "k", "a"),
+    "ガ": ("ga", "g", "g", "a"), "ギ": ("gi", "g", "g", "i"), "グ": ("gu", "g", "g", "u"),
+    "ゲ": ("ge", "g", "g", "e"), "ゴ": ("go", "g", "g", "o"), "ザ": ("za", "z", "z", "a"),
+    "ジ": ("ji", "j", "j", "i"), "ズ": ("zu", "z", "z", "u"), "ゼ": ("ze", "z", "z", "e"),
+    "ゾ": ("zo", "z", "z", "o"), "ダ": ("da", "d", "d", "a"), "ヂ": ("ji", "j", "j", "i"),
+    "ヅ": ("zu", "z", "z", "u"), "デ": ("de", "d", "d", "e"), "ド": ("do", "d", "d", "o"),
+    "バ": ("ba", "b", "b", "a"), "ビ": ("bi", "b", "b", "i"), "ブ": ("bu", "b", "b", "u"),
+    "ベ": ("be", "b", "b", "e"), "ボ": ("bo", "b", "b", "o"), "パ": ("pa", "p", "p", "a"),
+    "ピ": ("pi", "p", "p", "i"), "プ": ("pu", "p", "p", "u"), "ペ": ("pe", "p", "p", "e"),
+    "ポ": ("po", "p", "p", "o"), "ヹ": ("ve", "v", "v", "e"), "ヴ": ("vu", "v", "v", "u"),
+    "ヷ": ("va", "v", "v", "a"), "ヺ": ("vo", "v", "v", "o"), "ヸ": ("vi", "v", "v", "i"),
+    "ヮ": ("wa", "w", "w", "a"),
+}  # fmt: skip
+
+# Consonants of digraphs formed with a small ャ, ュ or ョ, e.g. キャ → kya
+_KATAKANA_DIGRAPH_CONSONANTS: Dict[str, str] = {
+    "キ": "ky", "シ": "sh", "チ": "ch", "ヒ": "hy", "ミ": "my", "リ": "ry", "ニ": "ny",
+    "ギ": "gy", "ジ": "j", "ヂ": "dy", "ビ": "by", "ピ": "py",
+}  # fmt: skip
+
+_KATAKANA_DIGRAPH_VOWELS: Dict[str, str] = {"ャ": "a", "ュ": "u", "ョ": "o"}
+_KATAKANA_VOWELS: Dict[str, str] = {"ア": "a", "イ": "i", "ウ": "u", "エ": "e", "オ": "o"}
+_KATAKANA_SMALL_VOWELS: Dict[str, str] = {"ァ": "a", "ィ": "i", "ゥ": "u", "ェ": "e", "ォ": "o"}
+
+# ウ followed by a small vowel is read as a consonant, e.g. ウィ → wi, ウァ → va
+U_CONSONANTS: Dict[str, str] = {"a": "v", "i": "w", "e": "w", "o": "w"}
+
+
+# Katakana with a hiragana counterpart, which searches and words are compared in
+KATAKANA_TO_HIRAGANA: Dict[int, int] = {
+    **{code: code - 0x60 for code in range(ord("ァ"), ord("ヶ") + 1)},
+    ord("ヽ"): ord("ゝ"),
+    ord("ヾ"): ord("ゞ"),
+}
+HIRAGANA_TO_KATAKANA: Dict[int, int] = {value: key for key, value in KATAKANA_TO_HIRAGANA.items()}
+
+
+def fold_to_hiragana(text: str) -> str:
+    """Convert the katakana of text with a hiragana counterpart to hiragana."""
+    return text.translate(KATAKANA_TO_HIRAGANA)
+
+
+def fold_to_katakana(text: str) -> str:
+    return text.translate(HIRAGANA_TO_KATAKANA)
+
+
+# ------ Precompiled tables ------
+
+# Kinds of units matched in the input
+(
+    CONSONANT_VOWEL,
+    VOWEL,
+    SMALL_VOWEL,
+    DIGRAPH_VOWEL,
+    SOKUON,
+    CHOONPU,
+    WORD_BORDER,
+) = range(7)
+
+# (kind, romaji, geminate consonant, consonant, vowel, digraph consonant, digraph vowel)
+Unit = Tuple[int, str, str, str, str, str, str]
+
+_katakana_units: Dict[str, Unit] = {}
+for _kana, (_romaji, _geminate, _consonant, _vowel) in _KATAKANA_CONSONANT_VOWELS.items():
+    _digraph_consonant: str = _KATAKANA_DIGRAPH_CONSONANTS.get(_kana, "")
+    _katakana_units[_kana] = (
+        CONSONANT_VOWEL, _romaji, _geminate, _consonant, _vowel, _digraph_consonant, ""
+    )  # fmt: skip
+    if _digraph_consonant:
+        for _second, _digraph_vowel in _KATAKANA_DIGRAPH_VOWELS.items():
+            _katakana_units[_kana + _second] = (
+                CONSONANT_VOWEL, _romaji, _geminate, _consonant, _vowel, _digraph_consonant,
+                _digraph_vowel,
+            )  # fmt: skip
+for _kana, _vowel in _KATAKANA_VOWELS.items():
+    _katakana_units[_kana] = (VOWEL, _vowel, "", "", _vowel, "", "")
+for _kana, _vowel in _KATAKANA_SMALL_VOWELS.items():
+    _katakana_units[_kana] = (SMALL_VOWEL, _vowel, "", "", _vowel, "", "")
+for _kana, _vowel in _KATAKANA_DIGRAPH_VOWELS.items():
+    _katakana_units[_kana] = (DIGRAPH_VOWEL, "", "", "", _vowel, "", "")
+_katakana_units["ッ"] = (SOKUON, "", "", "", "", "", "")
+
+SMALL_VOWELS_BY_ROMAJI: Dict[str, str] = {
+    vowel: kana for kana, vowel in _KATAKANA_SMALL_VOWELS.items()
+}
+
+UNITS: Dict[str, Unit] = {
+    **_katakana_units,
+    **{fold_to_hiragana(key): unit for key, unit in _katakana_units.items()},
+    "ー": (CHOONPU, "", "", "", "", "", ""),
+    "|": (WORD_BORDER, "", "", "", "", "", ""),
+}
+
+# Units which _fast_romaji handles without the full state machine
+FAST_UNITS: Dict[str, Unit] = {
+    key: unit for key, unit in UNITS.items() if unit[0] in (CONSONANT_VOWEL, VOWEL, SOKUON, CHOONPU)
+}
+
+# Longest match first, so digraphs such as きゃ are matched before き
+UNIT_PATTERN = re.compile(
+    "|".join(re.escape(key) for key in sorted(UNITS, key=len, reverse=True)) + "|.", re.DOTALL
+)
+
+# Voiced counterparts for dakuten, handakuten and the voiced repetition marks
+_KATAKANA_VOICED: Dict[str, str] = {
+    "カ": "ガ", "キ": "ギ", "ク": "グ", "ケ": "ゲ", "コ": "ゴ", "サ": "ザ", "シ": "ジ",
+    "ス": "ズ", "セ": "ゼ", "ソ": "ゾ", "タ": "ダ", "チ": "ヂ", "ツ": "ヅ", "テ": "デ",
+    "ト": "ド", "ハ": "バ", "ヒ": "ビ", "フ": "ブ", "ヘ": "ベ", "ホ": "ボ", "ウ": "ヴ",
+}  # fmt: skip
+_KATAKANA_SEMI_VOICED: Dict[str, str] = {"ハ": "パ", "ヒ": "ピ", "フ": "プ", "ヘ": "ペ", "ホ": "ポ"}
+VOICED: Dict[str, str] = {
+    "ヱ": "ヹ",
+    **_KATAKANA_VOICED,
+    **{fold_to_hiragana(key): fold_to_hiragana(value) for key, value in _KATAKANA_VOICED.items()},
+}
+SEMI_VOICED: Dict[str, str] = {
+    **_KATAKANA_SEMI_VOICED,
+    **{fold_to_hiragana(key): fold_to_hiragana(val) for key, val in _KATAKANA_SEMI_VOICED.items()},
+}
+DAKUTEN_MARKS = "゙゛"
+HANDAKUTEN_MARKS = "゚゜"
+REPETITION_MARKS = "ゝヽ"
+VOICED_REPETITION_MARKS = "ゞヾ"
+MARKS = DAKUTEN_MARKS + HANDAKUTEN_MARKS + REPETITION_MARKS + VOICED_REPETITION_MARKS
+
+# Punctuation and full width characters replaced before conversion
+REPLACEMENTS: Dict[int, str] = str.maketrans(
+    {
+        "ヿ": "コト", "゠": "-", "ゟ": "より", "｛": " {", "｝": "} ", "（": " (", "）": ") ",
+        "〔": " [", "〕": "] ", "［": " [", "］": "] ", "【": " [", "】": "] ", "〈": " <",
+        "〉": "> ", "《": " «", "》": "» ", "「": " [", "」": "] ", "『": " [", "』": "] ",
+        "、": ", ", "＜": "<", "＞": ">", "＝": "=", "＂": '"', "＇": "'", "，": ", ",
+        "　": " ", "｀": "`", "＾": "^", "＿": "_", "／": "/", "￤": "¦", "￢": "¬", "￣": "¯",
+        "＼": "\\", "〜": "~", "：": ":", "；": ";", "！": "!", "？": "?", "。": ".", "．": ".",
+        "‥": "..", "・": " ",
+        **dict(
+            zip(
+                "ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺ"
+                "ａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ"
+                "￠￡￥￦＠＃＄％＆＊＋－０１２３４５６７８９",
+                "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz¢£¥₩@#$%&*+-0123456789",
+            )
+        ),
+    }
+)  # fmt: skip
+
+PUNCTUATION_SPACING: Tuple[Tuple[Pattern, str], ...] = (
+    (re.compile("([？！。．；：]+)"), "\\1 "),
+    (re.compile("([＂＇])(.+?)([＂＇])"), " \\1\\2\\3 "),
+    (re.compile("(\\S)([＂＇])(\\S)"), "\\1 \\2 \\3"),
+)
+SPACED_PUNCTUATION = re.compile("[！？。．；：＂＇]")
+
+
+# ------ Conversion ------
+
+
+def _apply_marks(text: str) -> str:
+    """Voice kana followed by a standalone (han)dakuten and expand repetition marks."""
+    chars: List[str] = []
+    previous: str = ""
+    for char in text:
+        if char in DAKUTEN_MARKS:
+            if previous in VOICED:
+                chars[-1] = VOICED[previous]
+        elif char in HANDAKUTEN_MARKS:
+            if previous in SEMI_VOICED:
+                chars[-1] = SEMI_VOICED[previous]
+        else:
+            chars.append(char)
+        previous = char
+
+    previous = ""
+    for i, char in enumerate(chars):
+        if char in REPETITION_MARKS:
+            chars[i] = previous
+        elif char in VOICED_REPETITION_MARKS:
+            chars[i] = VOICED.get(previous, previous)
+        previous = char
+    return "".join(chars)
+
+
+def _preprocess(text: str) -> str:
+    """Space out punctuation, apply voicing and repetition marks and replace symbols."""
+    if SPACED_PUNCTUATION.search(text):
+        for pattern, replacement in PUNCTUATION_SPACING:
+            text = pattern.sub(replacement, text)
+    if any(char in MARKS for char in text):
+        text = _apply_marks(text)
+    return text.translate(REPLACEMENTS)
+
+
+class _Romanizer:
+    """A state machine writing romaji for a sequence of matched units.
+
+    The active unit is kept along with its modifiers (small vowels, long vowel
+    and sokuon counts) until the next unit shows how it is to be written.
+    """
+
+    __slots__ = (
+        "output",
+        "unit",
+        "vowel",
+        "small_vowel",
+        "has_small_vowel",
+        "digraph_consonant",
+        "digraph_vowel",
+        "last_vowel_unit",
+        "u_lengthened",
+        "long_count",
+        "geminate_count",
+        "next_unit",
+        "unknown",
+    )
+
+    def __init__(self) -> None:
+        self.output: List[str] = []
+        self.clear()
+
+    def clear(self) -> None:
+        self.unit: Optional[Unit] = None
+        self.vowel: Optional[str] = None  # vowel which following vowels may lengthen
+        self.small_vowel: Optional[str] = None
+        self.has_small_vowel: bool = False
+        self.digraph_consonant: Optional[str] = None
+        self.digraph_vowel: Optional[str] = None
+        self.last_vowel_unit: Optional[Unit] = None
+        self.u_lengthened: bool = False  # whether the last lengthening vowel was ウ
+        self.long_count: int = 0
+        self.geminate_count: int = 0
+        self.next_unit: Optional[Unit] = None
+        self.unknown: Optional[str] = None
+
+    def flush(self) -> None:
+        """Write the active unit with its modifiers to the output."""
+        unit: Optional[Unit] = self.unit
+        if unit is None:
+            if self.unknown is not None:
+                self.output.append(self.unknown)
+                self.unknown = None
+            return
+
+        kind: int = unit[0]
+        romaji: str = unit[1]
+        small_vowel: Optional[str] = self.small_vowel
+        digraph_vowel: Optional[str] = self.digraph_vowel
+        long_count: int = self.long_count
+
+        if kind == VOWEL and small_vowel in U_CONSONANTS and romaji == "u":
+            romaji = U_CONSONANTS[small_vowel]  # type: ignore
+
+        if (
+            small_vowel is None
+            and digraph_vowel is None
+            and not self.geminate_count
+            and not long_count
+            and romaji != "n"
+        ):
+            self.output.append(romaji)
+        elif kind == CONSONANT_VOWEL:
+            self.output.append(self._write_consonant_vowel(unit))
+        elif small_vowel is not None:
+            self.output.append(
+                romaji + (MACRONS[small_vowel] * long_count if long_count else small_vowel)
+            )
+        else:
+            self.output.append(MACRONS[romaji] * long_count if long_count else romaji)
+
+        if self.unknown is not None:
+            self.output.append(self.unknown)
+        self.clear()
+
+    def _write_consonant_vowel(self, unit: Unit) -> str:
+        _, romaji, geminate, consonant, vowel, _, _ = unit
+        long_count: int = self.long_count
+
+        apostrophe: str = ""
+        if romaji == "n" and self.next_unit is not None:
+            next_kind, _, next_geminate, _, next_vowel, _, _ = self.next_unit
+            next_sound: str = next_geminate if next_kind == CONSONANT_VOWEL else next_vowel
+            if next_sound in N_APOSTROPHE_TRIGGERS:
+                apostrophe = "'"
+
+        if self.digraph_consonant is not None and self.digraph_vowel is not None:
+            consonant = self.digraph_consonant
+
+        ending: Optional[str] = self.small_vowel or self.digraph_vowel
+        if ending:
+            written: str = (
+                consonant + apostrophe + (MACRONS[ending] * long_count if long_count else ending)
+            )
+        elif long_count:
+            long_vowel: str = "n" if vowel == "n" else MACRONS[vowel]
+            written = consonant + apostrophe + long_vowel * long_count
+        else:
+            written = romaji + apostrophe
+        return geminate * self.geminate_count + written
+
+    def set_unit(self, unit: Unit) -> None:
+        """Flush the active unit and make unit the active one."""
+        self.next_unit = unit
+        self.flush()
+        self.unit = unit
+        self.vowel = unit[4]
+        if unit[5]:
+            self.digraph_consonant = unit[5]
+        if unit[6]:
+            self.set_digraph_vowel(unit[6])
+
+    def set_digraph_vowel(self, vowel: str) -> None:
+        self.vowel = vowel
+        self.digraph_vowel = vowel
+
+    def set_vowel(self, unit: Unit) -> None:
+        if (self.vowel, unit[4]) in LONG_VOWEL_PAIRS:
+            if self.vowel == "u":
+                self.u_lengthened = True
+            self.lengthen()
+        else:
+            self.set_unit(unit)
+        self.last_vowel_unit = unit
+
+    def set_small_vowel(self, unit: Unit) -> None:
+        small_vowel: str = unit[4]
+        is_after_n: bool = self.vowel == "n"
+
+        if (
+            self.u_lengthened
+            and self.last_vowel_unit is not None
+            and self.last_vowel_unit[1] == "u"
+            and small_vowel in U_CONSONANTS
+        ):
+            # The ウ lengthening the active unit is a w or v sound instead, e.g. クウィ
+            if self.long_count:
+                self.long_count -= 1
+            last_vowel_unit: Unit = self.last_vowel_unit
+            self.last_vowel_unit = None
+            self.flush()
+            self.set_unit(last_vowel_unit)
+
+        lengthens_digraph: bool = False
+        if self.vowel == small_vowel:
+            self.lengthen()
+        elif self.has_small_vowel:
+            self.flush()
+            self.set_unit(unit)
+            return
+        elif self.digraph_vowel is not None:
+            lengthens_digraph = True
+
+        if is_after_n:
+            self.set_unit(unit)
+            return
+        if lengthens_digraph:
+            self.lengthen()
+        else:
+            self.small_vowel = small_vowel
+        self.has_small_vowel = True
+
+    def lengthen(self) -> None:
+        if self.unit is not None:
+            self.long_count += 1
+
+    def add_geminate(self) -> None:
+        if self.unit is not None:
+            self.flush()
+        self.geminate_count += 1
+
+    def promote_small_vowel(self) -> None:
+        """Write a small vowel which is not attached to any kana as a regular vowel."""
+        if self.small_vowel is None or (
+            self.unit is not None and self.unit[0] in (VOWEL, CONSONANT_VOWEL)
+        ):
+            return
+        self.set_unit(UNITS[SMALL_VOWELS_BY_ROMAJI[self.small_vowel]])
+        self.small_vowel = None
+
+    def add_unknown(self, char: str) -> None:
+        if self.has_small_vowel:
+            self.promote_small_vowel()
+        self.unknown = char
+        self.flush()
+
+    def convert(self, text: str) -> str:
+        for match in UNIT_PATTERN.finditer(text):
+            key: str = match.group()
+            unit: Optional[Unit] = UNITS.get(key)
+            if unit is None:
+                self.add_unknown(key)
+                continue
+            kind: int = unit[0]
+            if kind == CONSONANT_VOWEL:
+                self.set_unit(unit)
+            elif kind == VOWEL:
+                self.set_vowel(unit)
+            elif kind == SMALL_VOWEL:
+                self.set_small_vowel(unit)
+            elif kind == DIGRAPH_VOWEL:
+                self.set_digraph_vowel(unit[4])
+            elif kind == SOKUON:
+                self.add_geminate()
+            elif kind == CHOONPU:
+                self.lengthen()
+            else:  # WORD_BORDER
+                self.flush()
+        self.promote_small_vowel()
+        self.flush()
+        return "".join(self.output)
+
+
+def _write_syllable(
+    unit: Unit, long_count: int, geminate_count: int, next_unit: Optional[Unit]
+) -> str:
+    """Write a syllable without small vowels, as _Romanizer.flush would."""
+    kind, romaji, geminate, consonant, vowel, _, digraph_vowel = unit
+    if kind == VOWEL:
+        return MACRONS[romaji] * long_count if long_count else romaji
+    if not (long_count or geminate_count or digraph_vowel) and romaji != "n":
+        return romaji
+
+    apostrophe: str = ""
+    if romaji == "n" and next_unit is not None:
+        next_sound: str = next_unit[2] if next_unit[0] == CONSONANT_VOWEL else next_unit[4]
+        if next_sound in N_APOSTROPHE_TRIGGERS:
+            apostrophe = "'"
+    if digraph_vowel:
+        written: str = (
+            unit[5]
+            + apostrophe
+            + (MACRONS[digraph_vowel] * long_count if long_count else digraph_vowel)
+        )
+    elif long_count:
+        written = consonant + apostrophe + ("n" if vowel == "n" else MACRONS[vowel]) * long_count
+    else:
+        written = romaji + apostrophe
+    return geminate * geminate_count + written
+
+
+def _fast_romaji(text: str) -> Optional[str]:
+    """Convert text made only of syllables, digraphs, sokuon and long vowel marks.
+
+    Return None if text has anything else, such as small vowels or non-kana,
+    which need the full state machine.
+    """
+    output: List[str] = []
+    unit: Optional[Unit] = None
+    vowel: str = ""
+    long_count: int = 0
+    geminate_count: int = 0
+    i: int = 0
+    length: int = len(text)
+    while i < length:
+        token: Optional[Unit] = FAST_UNITS.get(text[i : i + 2])
+        if token is None:
+            token = FAST_UNITS.get(text[i])
+            if token is None:
+                return None
+            i += 1
+        else:
+            i += 2
+
+        kind: int = token[0]
+        if kind == CHOONPU or (kind == VOWEL and (vowel, token[4]) in LONG_VOWEL_PAIRS):
+            if unit is not None:
+                long_count += 1
+        elif kind == SOKUON:
+            if unit is not None:
+                output.append(_write_syllable(unit, long_count, geminate_count, None))
+                unit, vowel, long_count, geminate_count = None, "", 0, 0
+            geminate_count += 1
+        else:
+            if unit is not None:
+                output.append(_write_syllable(unit, long_count, geminate_count, token))
+                long_count = geminate_count = 0
+            unit = token
+            vowel = token[6] or token[4]
+
+    if unit is not None:
+        output.append(_write_syllable(unit, long_count, geminate_count, None))
+    return "".join(output)
+
+
+@functools.lru_cache(maxsize=8192)
+def to_romaji(text: str) -> str:
+    """Convert the kana in text to Modified Hepburn romaji.
+
+    Characters which are not kana are kept as they are. Results are memoized
+    since the same readings are converted over and over again.
+    """
+    romaji: Optional[str] = _fast_romaji(text)
+    if romaji is None:
+        romaji = _Romanizer().convert(_preprocess(text))
+    return romaji
+
+
+# ------ Romaji to kana ------
+
+# Long vowels with macrons or circumflexes, written as the kana usually behind them
+ROMAJI_LONG_VOWELS: Dict[int, str] = str.maketrans(
+    {"ā": "aa", "ī": "ii", "ū": "uu", "ē": "ee", "ō": "ou", "â": "aa", "î": "ii", "û": "uu",
+     "ê": "ee", "ô": "ou"}
+)  # fmt: skip
+
+# Spellings of other romanizations and of typing with an IME, e.g. si → し
+ROMAJI_ALIASES: Dict[str, str] = {
+    "si": "し", "ti": "ち", "tu": "つ", "hu": "ふ", "zi": "じ", "di": "ぢ", "du": "づ",
+    "sya": "しゃ", "syu": "しゅ", "syo": "しょ", "tya": "ちゃ", "tyu": "ちゅ", "tyo": "ちょ",
+    "zya": "じゃ", "zyu": "じゅ", "zyo": "じょ", "jya": "じゃ", "jyu": "じゅ", "jyo": "じょ",
+    "cya": "ちゃ", "cyu": "ちゅ", "cyo": "ちょ", "wi": "うぃ", "we": "うぇ", "xtu": "っ",
+    "ltu": "っ", "xtsu": "っ",
+}  # fmt: skip
+
+ROMAJI_VOWELS = "aiueo"
+
+
+def _romaji_table() -> Dict[str, str]:
+    # Vowels come first so that ゐ and ゑ do not take i and e, and single kana
+    # before digraphs and pairs spelled alike, such as ji for じ.
+    kana: List[str] = [fold_to_hiragana(key) for key in _KATAKANA_VOWELS]
+    kana.extend(fold_to_hiragana(key) for key in _KATAKANA_CONSONANT_VOWELS)
+    kana.extend(key for key, unit in UNITS.items() if len(key) == 2 and unit[6])
+    # Pairs with small vowels spell other syllables, such as ふぁ → fa
+    kana.extend(
+        fold_to_hiragana(first + second)
+        for first in _KATAKANA_CONSONANT_VOWELS
+        if first not in "ヤユヨワヲンヮヵヶ"
+        for second in _KATAKANA_SMALL_VOWELS
+    )
+    table: Dict[str, str] = {}
+    for key in kana:
+        if not 0x3041 <= ord(key[0]) <= 0x3096:
+            continue
+        romaji: str = to_romaji(key)
+        if romaji.isascii() and romaji.isalpha() and romaji[-1] in ROMAJI_VOWELS + "n":
+            table.setdefault(romaji, key)
+    table.update(ROMAJI_ALIASES)
+    return table
+
+
+ROMAJI_TO_HIRAGANA: Dict[str, str] = _romaji_table()
+ROMAJI_MAX_LENGTH: int = max(map(len, ROMAJI_TO_HIRAGANA))
+
+
+@functools.lru_cache(maxsize=1024)
+def to_hiragana(romaji: str) -> Optional[str]:
+    """Convert Hepburn or wāpuro romaji to hiragana, or return None if it is not romaji.
+
+    Doubled consonants are written with っ and n with ん unless a vowel or y
+    follows it, nn standing for a single ん before other letters as when typing
+    with an IME (kannji → かんじ). Long vowels with macrons are read as the
+    most common kana pair, such as ō as おう.
+    """
+    text: str = romaji.lower().translate(ROMAJI_LONG_VOWELS)
+    output: List[str] = []
+    i: int = 0
+    while i < len(text):
+        char: str = text[i]
+        following: str = text[i + 1 : i + 2]
+        if char == "n" and (not following or following not in ROMAJI_VOWELS + "y"):
+            output.append("ん")
+            after: str = text[i + 2 : i + 3]
+            if following == "'" or following == "n" and not (after and after in ROMAJI_VOWELS):
+                i += 2
+            else:
+                i += 1
+            continue
+        if char == following and char.isalpha() and char not in ROMAJI_VOWELS:
+            output.append("っ")
+            i += 1
+            continue
+        if text.startswith("tch", i):
+            output.append("っ")
+            i += 1
+            continue
+        if char == "-":
+            output.append("ー")
+            i += 1
+            continue
+        for length in range(min(ROMAJI_MAX_LENGTH, len(text) - i), 0, -1):
+            kana: Optional[str] = ROMAJI_TO_HIRAGANA.get(text[i : i + length])
+            if kana is not None:
+                output.append(kana)
+                i += length
+                break
+        else:
+            return None
+    return "".join(output)
+
+
+# ------ Shiritori words ------
+
+# Spaces are removed and halfwidth katakana widened, with their voicing marks
+# applied afterwards like standalone ones
+WIDTH_FOLDING: Dict[int, Optional[int]] = str.maketrans(
+    "ｦｧｨｩｪｫｬｭｮｯｰｱｲｳｴｵｶｷｸｹｺｻｼｽｾｿﾀﾁﾂﾃﾄﾅﾆﾇﾈﾉﾊﾋﾌﾍﾎﾏﾐﾑﾒﾓﾔﾕﾖﾗﾘﾙﾚﾛﾜﾝﾞﾟ",
+    "ヲァィゥェォャュョッーアイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン゛゜",
+    " \N{IDEOGRAPHIC SPACE}",
+)
+
+# Small kana which join the kana before them into one mora, e.g. きゃ and ふぁ
+SMALL_KANA = "ぁぃぅぇぉゃゅょゎゕゖ"
+SMALL_KANA_DELETION: Dict[int, Optional[int]] = str.maketrans("", "", SMALL_KANA)
+# Deletes every other character allowed in a word once folded to hiragana, so
+# what is left of a word is its small kana and the characters it may not have
+FULL_SIZE_KANA_DELETION: Dict[int, Optional[int]] = str.maketrans(
+    "",
+    "",
+    "".join(chr(code) for code in range(ord("ぁ"), ord("ゖ") + 1) if chr(code) not in SMALL_KANA)
+    + "ー",
+)
+# Small kana not following a full-size kana, which are morae of their own
+MISPLACED_SMALL_KANA_PATTERN: Pattern[str] = re.compile(f"^[{SMALL_KANA}]|[{SMALL_KANA}]{{2}}")
+# Marks ignored at the end of a word when finding its last mora
+TRAILING_MARKS = "っー"
+
+SHIRITORI_MIN_MORAE = 2
+
+
+class KanaWord(NamedTuple):
+    """A word in kana, normalized for Shiritori."""
+
+    text: str  # Without spaces and with halfwidth katakana widened
+    key: str  # In hiragana, which words are compared by
+    first_mora: str
+    last_mora: str  # Leaves out a final っ or ー, e.g. ひ for コーヒー
+    mora_count: int  # Also leaves out a final っ or ー
+
+
+def split_morae(text: str) -> List[str]:
+    """Split kana into morae in hiragana, a small kana joining the kana before it."""
+    morae: List[str] = []
+    for char in fold_to_hiragana(text):
+        if char in SMALL_KANA and morae and len(morae[-1]) == 1:
+            morae[-1] += char
+        else:
+            morae.append(char)
+    return morae
+
+
+def parse_word(text: str) -> Optional[KanaWord]:
+    """Normalize a word typed by a player, or return None if it is not only kana.
+
+    Spaces are removed, halfwidth katakana widened and voicing and repetition
+    marks applied. Words take two or three passes of str.translate, and
+    another pass of _apply_marks or a regex search for the few with marks or
+    small kana out of place.
+    """
+    normalized: str = text.translate(WIDTH_FOLDING)
+    key: str = normalized.translate(KATAKANA_TO_HIRAGANA)
+    small: str = key.translate(FULL_SIZE_KANA_DELETION)
+    if small:
+        others: str = small.translate(SMALL_KANA_DELETION)
+        if others:
+            if others.strip(MARKS):
+                return None
+            return parse_word(_apply_marks(normalized))
+    stem: str = key.rstrip(TRAILING_MARKS)
+    if not stem:
+        return None
+    first: str = key[:2] if len(key) > 1 and key[1] in SMALL_KANA else key[:1]
+    last: str = stem[-2:] if len(stem) > 1 and stem[-1] in SMALL_KANA else stem[-1]
+    # A final っ or ー is not a small kana, so every small kana is in the stem
+    count: int = len(stem) - len(small)
+    if small and MISPLACED_SMALL_KANA_PATTERN.search(key):
+        count = len(split_morae(stem))
+    return KanaWord(normalized, key, first, last, count)
+
+
+def check_word(word: Optional[KanaWord]) -> Optional[str]:
+    """Return why a word breaks the rules of Shiritori that need no dictionary, if it does.
+
+    This is "bad_word" for a word not in kana or shorter than two morae, and
+    "n_ending" for a word ending with ん, like the restricted API answers.
+    """
+    if word is None or word.mora_count < SHIRITORI_MIN_MORAE:
+        return "bad_word"
+    if word.last_mora == "ん":
+        return "n_ending"
+    return None
@@ -7,11 +7,15 @@ GitHub source: https://github.com/Rapptz/RoboDanny/blob/rewrite/cogs/utils/pagin
 """
 
 import asyncio
+import collections.abc
+import logging
 
 import discord
 
 from botto import config  # pylint: disable=cyclic-import
 
+logger = logging.getLogger("botto.paginator")  # pylint: disable=invalid-name
+
 FIRST_PAGE = "\N{BLACK LEFT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}"
 PREVIOUS_PAGE = "\N{BLACK LEFT-POINTING TRIANGLE}"
 NEXT_PAGE = "\N{BLACK RIGHT-POINTING TRIANGLE}"
@@ -21,6 +25,44 @@ STOP_PAGINATION = "\N{BLACK SQUARE FOR STOP}"
 GOTO_HELP = "\N{WHITE QUESTION MARK ORNAMENT}"
 
 
+class LazyPages(collections.abc.Sequence):
+    """A sequence of pages that are rendered on first access and then memoized.
+
+    This allows a paginator to only pay for formatting the pages that are
+    actually visited.
+
+    Parameters
+    ------------
+    items: Sequence[Any]
+        The items to be rendered into pages.
+    render: Callable[[Any], str]
+        A function that renders an item into a page.
+    """
+
+    def __init__(self, items, render):
+        self.items = items
+        self.render = render
+        self._rendered = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.items)))]
+        if index < 0:
+            index += len(self.items)
+        if not 0 <= index < len(self.items):
+            raise IndexError("page index out of range")
+        if index not in self._rendered:
+            self._rendered[index] = self.render(self.items[index])
+        return self._rendered[index]
+
+    def extend(self, items):
+        """Append more items to be rendered into pages."""
+        self.items.extend(items)
+
+
 class EmbedPaginator:
     """Implements a paginator that queries the user for the pagination interface.
 
@@ -32,8 +74,9 @@ class EmbedPaginator:
     ------------
     ctx: Context
         The context of the command.
-    entries: List[str]
-        A list of entries to paginate.
+    entries: Sequence[str]
+        A sequence of entries to paginate. Use LazyPages to only render entries
+        when their page is shown.
     per_page: int
         How many entries show up per page.
     message_content: Optional[str]
@@ -46,6 +89,13 @@ class EmbedPaginator:
         Whether the jump option should be available.
     help_option: bool
         Whether the usage help option should be available.
+    more_entries: Optional[Callable[[], Awaitable[Optional[Sequence[Any]]]]]
+        A coroutine function returning more entries to extend entries with.
+        It is called in the background once the user nears the last page.
+        It should return an empty sequence when there are no more entries, or
+        None to be called again later.
+    prefetch_distance: int
+        How many pages before the last page more entries are requested.
 
     Attributes
     -----------
@@ -65,6 +115,8 @@ class EmbedPaginator:
         numbered=False,
         jump_option=False,
         help_option=False,
+        more_entries=None,
+        prefetch_distance=3,
     ):
         self.ctx = ctx
         self.bot = ctx.bot
@@ -78,10 +130,11 @@ class EmbedPaginator:
         self.show_entry_count = show_entry_count
         self.numbered = numbered
         self.help_option = help_option
-        pages, left_over = divmod(len(self.entries), self.per_page)
-        pages += bool(left_over)
+        self.more_entries = more_entries
+        self.prefetch_distance = prefetch_distance
+        self.fetching_more = False
         self.current_page = 0
-        self.maximum_pages = pages
+        self.maximum_pages = self.count_pages()
         self.embed = discord.Embed(color=config["MAIN_COLOR"])
         self.paginating = len(entries) > per_page
         self.match = None
@@ -99,6 +152,10 @@ class EmbedPaginator:
         if not help_option:
             self.reaction_emojis.remove((GOTO_HELP, self.show_help))
 
+    def count_pages(self):
+        pages, left_over = divmod(len(self.entries), self.per_page)
+        return pages + bool(left_over)
+
     def get_page(self, page):
         base = (page - 1) * self.per_page
         return self.entries[base : base + self.per_page]
@@ -115,7 +172,8 @@ class EmbedPaginator:
 
         if self.maximum_pages > 1:
             if self.show_entry_count:
-                text = f"Page {page}/{self.maximum_pages} ({len(self.entries)} entries)"
+                more = "+" if self.more_entries else ""
+                text = f"Page {page}/{self.maximum_pages} ({len(self.entries)}{more} entries)"
             else:
                 text = f"Page {page}/{self.maximum_pages}"
 
@@ -128,6 +186,7 @@ class EmbedPaginator:
         if not first:
             self.embed.description = "\n".join(lines)
             await self.message.edit(content=self.message_content, embed=self.embed)
+            self.prefetch(page)
             return
 
         if self.help_option:
@@ -136,6 +195,8 @@ class EmbedPaginator:
 
         self.embed.description = "\n".join(lines)
         self.message = await self.ctx.send(self.message_content, embed=self.embed)
+        # Only once the message is sent, as new entries update it
+        self.prefetch(page)
 
         for (reaction, _) in self.reaction_emojis:
             if self.maximum_pages == 2 and reaction in (FIRST_PAGE, LAST_PAGE):
@@ -144,6 +205,37 @@ class EmbedPaginator:
                 continue
             await self.message.add_reaction(reaction)
 
+    def prefetch(self, page):
+        """Request more entries in the background if page is near the last page."""
+        if self.maximum_pages - page >= self.prefetch_distance:
+            return
+        if self.more_entries and not self.fetching_more:
+            self.fetching_more = True
+            self.bot.loop.create_task(self.fetch_more())
+
+    async def fetch_more(self):
+        """Extend the entries and show the new page count on the current page.
+
+        Errors are logged and more entries are requested again later, as
+        nothing awaits this task.
+        """
+        try:
+            entries = await self.more_entries()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to fetch more entries for %s.", self.ctx.command)
+            return
+        finally:
+            self.fetching_more = False
+        if entries is None:
+            return
+        if not entries:
+            self.more_entries = None
+        else:
+            self.entries.extend(entries)
+            self.maximum_pages = self.count_pages()
+        # The footer shows the page and entry counts, and whether more may come
+        await self.show_current_page()
+
     async def checked_show_page(self, page):
         if page != 0 and page <= self.maximum_pages:
             await self.show_page(page)
@@ -0,0 +1,145 @@
+import asyncio
+import concurrent.futures
+import sqlite3
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import json_codec
+
+
+class SnapshotStore:
+    """A SQLite store of JSON snapshots which are written behind in batches.
+
+    Staging a snapshot with :meth:`put` or :meth:`delete` only updates a dict,
+    and the staged snapshots are written together in a single transaction at
+    most every interval seconds. A key staged several times in between is
+    written once. Snapshots are encoded and written in a dedicated worker
+    thread, so neither staging nor awaiting writes blocks the event loop.
+
+    Parameters
+    ------------
+    path: str
+        The path of the SQLite database, created if it does not exist.
+    interval: float
+        The seconds staged snapshots wait to be written.
+    timer: Callable[[], float]
+        The wall clock snapshots expire by, which must be comparable across
+        restarts.
+
+    Attributes
+    -----------
+    writes: int
+        Number of batches written.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    """
+
+    def __init__(
+        self, path: str, *, interval: float = 1.0, timer: Callable[[], float] = time.time
+    ) -> None:
+        self.path: str = path
+        self.interval: float = interval
+        self.timer: Callable[[], float] = timer
+        self.writes: int = 0
+        self._executor: concurrent.futures.ThreadPoolExecutor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshots")
+        )
+        self._connection: Optional[sqlite3.Connection] = None
+        # Key -> (snapshot, expiry timestamp), or None to delete it
+        self._staged: Dict[str, Optional[Tuple[Any, float]]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        """Number of staged snapshots waiting to be written."""
+        return len(self._staged)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The connection to the database, opened on first use in the worker thread."""
+        if self._connection is None:
+            connection: sqlite3.Connection = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def put(self, key: str, snapshot: Any, expires_at: float) -> None:
+        """Stage a JSON serializable snapshot, kept until the expires_at timestamp."""
+        self._staged[key] = (snapshot, expires_at)
+        self._schedule()
+
+    def delete(self, key: str) -> None:
+        """Stage the removal of the snapshot of key."""
+        self._staged[key] = None
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_later(
+                self.interval, lambda: asyncio.ensure_future(self.flush())
+            )
+
+    async def flush(self) -> None:
+        """Write the staged snapshots now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        staged, self._staged = self._staged, {}
+        if staged:
+            await self._run(self._write, staged)
+
+    def _write(self, staged: Dict[str, Optional[Tuple[Any, float]]]) -> None:
+        rows: List[Tuple[str, bytes, float]] = [
+            (key, json_codec.dumps_bytes(item[0]), item[1])
+            for key, item in staged.items()
+            if item is not None
+        ]
+        deleted: List[Tuple[str]] = [(key,) for key, item in staged.items() if item is None]
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)", rows)
+            self.connection.executemany("DELETE FROM snapshots WHERE key = ?", deleted)
+        self.writes += 1
+
+    async def load(self) -> Dict[str, Any]:
+        """Return the snapshots which have not expired, removing the others."""
+        return await self._run(self._load)
+
+    def _load(self) -> Dict[str, Any]:
+        with self.connection:
+            self.connection.execute("DELETE FROM snapshots WHERE expires_at <= ?", (self.timer(),))
+            rows: List[Tuple[str, bytes]] = self.connection.execute(
+                "SELECT key, value FROM snapshots"
+            ).fetchall()
+        return {key: json_codec.loads(value) for key, value in rows}
+
+    def close(self) -> None:
+        """Write the staged snapshots and close the database.
+
+        This blocks until pending operations are done, so that a store opened
+        on the same path right after, such as by a reloaded cog, reads them.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._staged:
+            self._executor.submit(self._write, self._staged)
+            self._staged = {}
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=True)
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None